@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import inspect
+import time
+from abc import ABC, abstractmethod
+
+from lexer import *
+from parser import *
+from interpreter import *
+
+DEFAULT_YIELD_STATEMENTS = 100
+DEFAULT_YIELD_MICROSECONDS = 1000
+DEFAULT_GATE_SLOTS = 4
+
+
+class AsyncOutputSink(OutputSink):
+    async def write(self, result):
+        if result is None:
+            return
+        text = f"{result}\n"
+        self.pieces.append(text)
+        self.size += len(text)
+        if self.size >= self.flush_size:
+            await self.flush()
+
+    async def flush(self):
+        if self.pieces:
+            text = "".join(self.pieces)
+            self.pieces = []
+            self.size = 0
+            await self.emit(text)
+
+    @abstractmethod
+    async def emit(self, text):
+        pass
+
+    async def close(self):
+        await self.flush()
+
+
+class AsyncCallbackSink(AsyncOutputSink):
+    def __init__(self, callback, flush_size=DEFAULT_FLUSH_SIZE):
+        super().__init__(flush_size)
+        self.callback = callback
+
+    async def emit(self, text):
+        await self.callback(text)
+
+
+# asyncio.StreamWriter и все, у чего есть write и drain: drain дает писателю притормозить скрипт.
+class AsyncStreamSink(AsyncOutputSink):
+    def __init__(self, writer, flush_size=DEFAULT_FLUSH_SIZE):
+        super().__init__(flush_size)
+        self.writer = writer
+
+    async def emit(self, text):
+        self.writer.write(text.encode("utf-8"))
+        await self.writer.drain()
+
+
+class QueueSink(AsyncOutputSink):
+    def __init__(self, queue, flush_size=DEFAULT_FLUSH_SIZE):
+        super().__init__(flush_size)
+        self.queue = queue
+
+    async def emit(self, text):
+        await self.queue.put(text)
+
+
+# Обычный синхронный приемник из sinks.py за асинхронным интерфейсом.
+class SyncSinkAdapter(AsyncOutputSink):
+    def __init__(self, sink):
+        super().__init__(sink.flush_size)
+        self.sink = sink
+
+    async def write(self, result):
+        self.sink.write(result)
+
+    async def flush(self):
+        self.sink.flush()
+
+    async def emit(self, text):
+        self.sink.emit(text)
+
+
+def make_async_sink(target, flush_size=DEFAULT_FLUSH_SIZE):
+    if isinstance(target, AsyncOutputSink):
+        return target
+    if isinstance(target, asyncio.Queue):
+        return QueueSink(target, flush_size)
+    if hasattr(target, "write") and hasattr(target, "drain"):
+        return AsyncStreamSink(target, flush_size)
+    if inspect.iscoroutinefunction(target):
+        return AsyncCallbackSink(target, flush_size)
+    return SyncSinkAdapter(make_sink(target, flush_size))
+
+
+# Источники ввода для будущей инструкции stdin: read_line возвращает строку без '\n' или None в конце ввода.
+# Парсер пока не разбирает stdin, поэтому исполнение их не принимает; make_input приводит к ним очереди,
+# потоки и корутины.
+class InputProvider(ABC):
+    @abstractmethod
+    async def read_line(self):
+        pass
+
+
+class LinesInput(InputProvider):
+    def __init__(self, lines):
+        self.lines = iter(lines)
+
+    async def read_line(self):
+        return next(self.lines, None)
+
+
+class QueueInput(InputProvider):
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def read_line(self):
+        return await self.queue.get()
+
+
+class StreamInput(InputProvider):
+    def __init__(self, reader):
+        self.reader = reader
+
+    async def read_line(self):
+        line = await self.reader.readline()
+        if not line:
+            return None
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        return line.rstrip("\n")
+
+
+class CallbackInput(InputProvider):
+    def __init__(self, callback):
+        self.callback = callback
+
+    async def read_line(self):
+        return await self.callback()
+
+
+def make_input(source):
+    if source is None or isinstance(source, InputProvider):
+        return source
+    if isinstance(source, asyncio.Queue):
+        return QueueInput(source)
+    if hasattr(source, "readline"):
+        return StreamInput(source)
+    if inspect.iscoroutinefunction(source):
+        return CallbackInput(source)
+    if isinstance(source, str):
+        return LinesInput(source.splitlines())
+    return LinesInput(source)
+
+
+# Исполняет шаги create_steps, по одному на инструкцию, тем же движком, что и interpret, но отдает
+# управление циклу событий каждые yield_every инструкций или yield_microseconds микросекунд. Отмена и таймаут срабатывают в эти моменты;
+# одна инструкция не прерывается, поэтому длинная конкатенация задерживает цикл на свое время.
+# Цикл событий исполняет все готовые задачи подряд и только потом смотрит таймеры и сокеты, так что
+# при тысяче скриптов задержка равна тысяче отрезков. Общий gate (asyncio.Semaphore, см. make_gate)
+# пускает исполняться между двумя отдачами управления только несколько скриптов, остальные ждут по очереди.
+class AsyncExecution:
+    def __init__(self, steps, sink=None, flush_size=DEFAULT_FLUSH_SIZE,
+                 yield_every=DEFAULT_YIELD_STATEMENTS, yield_microseconds=DEFAULT_YIELD_MICROSECONDS, gate=None):
+        self.steps = steps
+        self.sink = None if sink is None else make_async_sink(sink, flush_size)
+        self.yield_every = max(yield_every, 1)
+        self.yield_interval = yield_microseconds * 1000
+        self.gate = gate
+        self.holds_gate = False
+        self.statements = 0
+        self.yields = 0
+        self.written = 0
+
+    async def acquire_gate(self):
+        if self.gate is not None:
+            await self.gate.acquire()
+            self.holds_gate = True
+
+    def release_gate(self):
+        if self.holds_gate:
+            self.holds_gate = False
+            self.gate.release()
+
+    async def pause(self):
+        self.yields += 1
+        # место в gate держится, пока цикл обходит остальные готовые задачи, иначе их отрезки
+        # исполнились бы в этой же итерации; потом оно переходит к следующему в очереди
+        await asyncio.sleep(0)
+        if self.holds_gate:
+            self.release_gate()
+            await self.acquire_gate()
+
+    async def run(self):
+        sink = self.sink
+        results = [] if sink is None else None
+        yield_every = self.yield_every
+        interval = self.yield_interval
+        pending = 0
+        try:
+            await self.acquire_gate()
+            deadline = time.perf_counter_ns() + interval
+            for step, is_stdout in self.steps:
+                result = step()
+                if is_stdout:
+                    if sink is None:
+                        results.append(result)
+                    elif result is not None:
+                        await sink.write(result)
+                        self.written += 1
+                pending += 1
+                if pending >= yield_every or time.perf_counter_ns() >= deadline:
+                    self.statements += pending
+                    pending = 0
+                    await self.pause()
+                    deadline = time.perf_counter_ns() + interval
+        finally:
+            self.statements += pending
+            self.release_gate()
+            if sink is not None:
+                await sink.flush()
+        return self.written if sink is not None else results
+
+
+def make_gate(slots=DEFAULT_GATE_SLOTS):
+    return asyncio.Semaphore(slots)
+
+
+async def with_timeout(coroutine, timeout):
+    if timeout is None:
+        return await coroutine
+    return await asyncio.wait_for(coroutine, timeout)
+
+
+def parse_source(source):
+    return parse(run(source))
+
+
+# Подготовка движка (компиляция vm и closure, typecheck для checked, resolve для slots) идет в потоке,
+# чтобы не останавливать цикл событий; tree ничего не готовит заранее, поток обошелся бы дороже.
+async def prepare_steps(ast, engine):
+    if engine == "tree":
+        return create_steps(ast, engine)
+    return await asyncio.to_thread(create_steps, ast, engine)
+
+
+# Асинхронный interpret: возвращает список результатов stdout или, с sink, число записанных строк.
+# По таймауту поднимается asyncio.TimeoutError, при отмене задачи - CancelledError;
+# в обоих случаях уже напечатанное успевает попасть в sink. Таймаут включает подготовку движка.
+async def interpret_async(ast, engine="tree", sink=None, timeout=None, flush_size=DEFAULT_FLUSH_SIZE,
+                          yield_every=DEFAULT_YIELD_STATEMENTS, yield_microseconds=DEFAULT_YIELD_MICROSECONDS, gate=None):
+    async def prepare_and_run():
+        steps = await prepare_steps(ast, engine)
+        execution = AsyncExecution(steps, sink, flush_size, yield_every, yield_microseconds, gate)
+        return await execution.run()
+    return await with_timeout(prepare_and_run(), timeout)
+
+
+# Лексер и парсер тоже работают в потоке и укладываются в таймаут. Поток нельзя прервать: по таймауту
+# ожидание заканчивается сразу, а разбор дорабатывает в фоне и его результат отбрасывается.
+async def run_async(source, engine="tree", sink=None, timeout=None, **options):
+    async def parse_and_run():
+        ast = await asyncio.to_thread(parse_source, source)
+        return await interpret_async(ast, engine, sink, None, **options)
+    return await with_timeout(parse_and_run(), timeout)
+
+
+def benchmark_source(statements, seed):
+    lines = [f"var v0 := {seed};"]
+    for index in range(1, statements):
+        if index % 50 == 0:
+            lines.append(f"stdout \"s{seed}: \" + v{index - 1};")
+        lines.append(f"var v{index} := v{index - 1} * 2 - v{index - 1} + {index % 7};")
+    return "\n".join(lines)
+
+
+# Самая большая задержка цикла событий, пока идут скрипты: таймер просыпается каждую миллисекунду.
+async def measure_lag(stop, interval=0.001):
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run_benchmark(asts, yield_every, yield_microseconds, gate_slots):
+    gate = make_gate(gate_slots) if gate_slots else None
+    stop = asyncio.Event()
+    lag = asyncio.ensure_future(measure_lag(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    results = await asyncio.gather(*[interpret_async(ast, yield_every=yield_every, yield_microseconds=yield_microseconds,
+                                                     gate=gate) for ast in asts])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return elapsed, await lag, results
+
+
+def benchmark(scripts=1000, statements=500):
+    asts = [parse(run(benchmark_source(statements, seed))) for seed in range(scripts)]
+    expected = [interpret(ast) for ast in asts]
+    print(f"{scripts} scripts x {statements} statements")
+    print(f"{'mode':<12}{'total ms':>10}{'stmts/s':>12}{'max lag ms':>12}")
+    modes = [
+        ("blocking", 1 << 62, 1 << 40, None),
+        ("cooperative", DEFAULT_YIELD_STATEMENTS, DEFAULT_YIELD_MICROSECONDS, None),
+        ("gated", DEFAULT_YIELD_STATEMENTS, DEFAULT_YIELD_MICROSECONDS, DEFAULT_GATE_SLOTS),
+    ]
+    for mode, yield_every, yield_microseconds, gate_slots in modes:
+        elapsed, lag, results = asyncio.run(run_benchmark(asts, yield_every, yield_microseconds, gate_slots))
+        if results != expected:
+            raise AssertionError(f"{mode} results differ from interpret")
+        print(f"{mode:<12}{elapsed * 1000:>10.1f}{scripts * statements / elapsed:>12.0f}{lag * 1000:>12.2f}")
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Run many QuarkScript programs in one event loop.")
+    argument_parser.add_argument("--scripts", type=int, default=1000)
+    argument_parser.add_argument("--statements", type=int, default=500)
+    arguments = argument_parser.parse_args()
+    benchmark(arguments.scripts, arguments.statements)
@@ -0,0 +1,102 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import *
+from parser import *
+from exception import *
+from interpreter import *
+
+
+class FileResult:
+    def __init__(self, path, status, output, error=None, error_kind=None, statements=0):
+        self.path = path
+        self.status = status
+        self.output = output
+        self.error = error
+        self.error_kind = error_kind
+        self.statements = statements
+
+    def __repr__(self):
+        return f"FileResult(path={self.path}, status={self.status}, error_kind={self.error_kind})"
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "**", "*.qs"), recursive=True))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        paths.extend(matches)
+    # пересекающиеся шаблоны (каталог и маска в нем) не должны запускать файл дважды
+    return list(dict.fromkeys(paths))
+
+
+def run_file(path, engine="tree"):
+    statements = 0
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            content = file.read()
+        ast = parse(run(content))
+        statements = len(ast)
+        results = interpret(ast, engine=engine)
+    except Error as e:
+        return FileResult(path, 1, "", str(e), "Error", statements)
+    except InterpreterErrors as e:
+        return FileResult(path, 1, "", str(e), "InterpreterErrors", statements)
+    except Exception as e:
+        return FileResult(path, 1, "", f"{type(e).__name__}: {e}", "Exception", statements)
+
+    output = "".join(f"{result}\n" for result in results if result is not None)
+    return FileResult(path, 0, output, statements=statements)
+
+
+def run_batch(paths, engine="tree", workers=None, chunksize=16):
+    if workers == 1:
+        yield from (run_file(path, engine) for path in paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map отдает результаты в порядке входных файлов, даже если процессы закончили в другом порядке
+        yield from executor.map(run_file, paths, [engine] * len(paths), chunksize=chunksize)
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Run many QuarkScript files in parallel.")
+    argument_parser.add_argument("paths", nargs="+", help="files, directories or glob patterns")
+    argument_parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    argument_parser.add_argument("--engine", default="tree", help="tree, checked, slots, vm or closure")
+    argument_parser.add_argument("--chunksize", type=int, default=16, help="files sent to a worker at once")
+    argument_parser.add_argument("--quiet", action="store_true", help="do not print script output")
+    arguments = argument_parser.parse_args(argv)
+
+    paths = expand_paths(arguments.paths)
+    failed = 0
+    statements = 0
+    started = time.perf_counter()
+
+    for result in run_batch(paths, arguments.engine, arguments.workers, arguments.chunksize):
+        statements += result.statements
+        if result.status == 0:
+            if not arguments.quiet:
+                print(f"== {result.path}")
+                sys.stdout.write(result.output)
+        else:
+            failed += 1
+            print(f"== {result.path} [{result.error_kind}] {result.error}")
+
+    elapsed = time.perf_counter() - started
+    files_per_second = len(paths) / elapsed if elapsed > 0 else 0.0
+    statements_per_second = statements / elapsed if elapsed > 0 else 0.0
+    print(f"{len(paths)} files, {len(paths) - failed} passed, {failed} failed in {elapsed:.3f}s "
+          f"({files_per_second:.1f} files/s, {statements_per_second:.1f} statements/s)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+from benchmarks.generator import *
+from benchmarks.runner import *
+from benchmarks.compare import *
+from benchmarks.memory import *
@@ -0,0 +1,74 @@
+import argparse
+import sys
+
+from benchmarks import *
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(prog="python -m benchmarks", description="QuarkScript benchmarks.")
+    commands = argument_parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a synthetic program")
+    generate.add_argument("shape", choices=SHAPES)
+    generate.add_argument("--statements", type=int, default=1000)
+    generate.add_argument("--size", type=int, default=None, help="width, depth or chain length of the shape")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--output", default=None)
+
+    run_command = commands.add_parser("run", help="time lexer, parser and interpreter")
+    run_command.add_argument("--shapes", default=",".join(SHAPES))
+    run_command.add_argument("--statements", type=int, default=1000)
+    run_command.add_argument("--size", type=int, default=None)
+    run_command.add_argument("--repeat", type=int, default=5)
+    run_command.add_argument("--seed", type=int, default=0)
+    run_command.add_argument("--lexer", default="table", help="table or legacy")
+    run_command.add_argument("--engine", default="tree", help="tree, checked, slots, vm or closure")
+    run_command.add_argument("--output", default=None, help="save results as JSON")
+
+    memory = commands.add_parser("memory", help="measure bytes per AST node and per pooled node")
+    memory.add_argument("--shapes", default=",".join(SHAPES))
+    memory.add_argument("--statements", type=int, default=1000)
+    memory.add_argument("--size", type=int, default=None)
+    memory.add_argument("--seed", type=int, default=0)
+
+    compare = commands.add_parser("compare", help="flag regressions against a stored baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.1 = 10%%")
+
+    arguments = argument_parser.parse_args(argv)
+
+    if arguments.command == "generate":
+        source = generate_program(arguments.shape, arguments.statements, arguments.size, arguments.seed)
+        if arguments.output is None:
+            sys.stdout.write(source)
+        else:
+            with open(arguments.output, "w", encoding="utf-8") as file:
+                file.write(source)
+        return 0
+
+    if arguments.command == "run":
+        shapes = [shape for shape in arguments.shapes.split(",") if shape]
+        report = run_benchmarks(shapes, arguments.statements, arguments.size, arguments.repeat,
+                                arguments.seed, arguments.lexer, arguments.engine)
+        print_results(report)
+        if arguments.output is not None:
+            save_results(report, arguments.output)
+        return 0
+
+    if arguments.command == "memory":
+        shapes = [shape for shape in arguments.shapes.split(",") if shape]
+        print_memory(run_memory(shapes, arguments.statements, arguments.size, arguments.seed))
+        return 0
+
+    rows, regressions = compare_results(load_results(arguments.baseline), load_results(arguments.current),
+                                        arguments.threshold)
+    print_comparison(rows, regressions)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {arguments.threshold * 100:.0f}%")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+from benchmarks.runner import PHASES
+
+DEFAULT_THRESHOLD = 0.10
+
+
+class Regression:
+    def __init__(self, shape, phase, baseline, current):
+        self.shape = shape
+        self.phase = phase
+        self.baseline = baseline
+        self.current = current
+
+    @property
+    def ratio(self):
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+    def __repr__(self):
+        return f"Regression(shape={self.shape}, phase={self.phase}, ratio={self.ratio:.2f})"
+
+
+# Сравниваются только фигуры, которые есть в обоих отчетах; время берется лучшее из повторов.
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    rows = []
+    regressions = []
+    for shape, result in current["results"].items():
+        if shape not in baseline["results"]:
+            continue
+        for phase in PHASES:
+            before = baseline["results"][shape][phase]["seconds"]
+            after = result[phase]["seconds"]
+            rows.append((shape, phase, before, after))
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append(Regression(shape, phase, before, after))
+    return rows, regressions
+
+
+def print_comparison(rows, regressions):
+    flagged = {(regression.shape, regression.phase) for regression in regressions}
+    print(f"{'shape':<14}{'phase':<11}{'baseline ms':>13}{'current ms':>13}{'change':>9}")
+    for shape, phase, before, after in rows:
+        change = (after / before - 1) * 100 if before > 0 else 0.0
+        mark = "  REGRESSION" if (shape, phase) in flagged else ""
+        print(f"{shape:<14}{phase:<11}{before * 1000:>13.3f}{after * 1000:>13.3f}{change:>+8.1f}%{mark}")
@@ -0,0 +1,107 @@
+import random
+
+SHAPES = ("declarations", "parens", "concat", "chains", "stdout", "mixed")
+
+
+def declarations(statements, rng, width=4):
+    lines = []
+    for index in range(statements):
+        kind = index % 4
+        if kind == 0 or index < 4:
+            lines.append(f"var i{index} : int = {rng.randrange(1000)};")
+        elif kind == 1:
+            lines.append(f"var f{index} : float = {rng.randrange(100)}.{rng.randrange(100)};")
+        elif kind == 2:
+            lines.append(f"var s{index} : string = \"value {index}\";")
+        else:
+            terms = " + ".join(f"i{rng.randrange(0, index, 4)}" for _ in range(width))
+            lines.append(f"var d{index} := {terms};")
+    return lines
+
+
+def nested_parens(depth, rng):
+    expression = str(rng.randrange(1, 10))
+    for level in range(depth):
+        operator = "+-*"[level % 3]
+        expression = f"({expression} {operator} {rng.randrange(1, 10)})"
+    return expression
+
+
+def parens(statements, rng, depth=40):
+    return [f"var p{index} := {nested_parens(depth, rng)};" for index in range(statements)]
+
+
+def concat(statements, rng, width=40):
+    lines = ["var name := \"quark\";", "var count := 7;"]
+    for index in range(statements):
+        pieces = []
+        for piece in range(width):
+            choice = rng.randrange(3)
+            if choice == 0:
+                pieces.append(f"\"p{piece}\"")
+            elif choice == 1:
+                pieces.append("name")
+            else:
+                pieces.append(str(rng.randrange(100)))
+        pieces[0] = "\"start\""
+        lines.append(f"var c{index} := {' + '.join(pieces)};")
+    return lines
+
+
+# Несколько очень длинных цепочек: на них видно, растет ли время сборки строки линейно от числа частей
+def chains(statements, rng, width=10000):
+    count = max(statements // 200, 1)
+    lines = concat(count, rng, width)
+    lines.append(f"var text := \"{'quark ' * 16}\";")
+    for index in range(count):
+        pieces = [rng.choice(("name", "count", "text", "\"-\"")) for _ in range(width - 1)]
+        lines.append(f"stdout \"out\" + {' + '.join(pieces)};")
+    return lines
+
+
+def stdout_values(statements, rng, width=8):
+    lines = ["var x := 3;", "var y := 2.5;", "var label := \"v\";"]
+    for index in range(statements):
+        values = []
+        for value in range(width):
+            choice = rng.randrange(4)
+            if choice == 0:
+                values.append(f"x * {rng.randrange(1, 10)}")
+            elif choice == 1:
+                values.append("y")
+            elif choice == 2:
+                values.append(f"label + \"_\" + {value}")
+            else:
+                values.append(f"\"text {index}\"")
+        lines.append(f"stdout {', '.join(values)};")
+    return lines
+
+
+def mixed(statements, rng, width=6):
+    parts = max(statements // 4, 1)
+    lines = declarations(parts, rng, width)
+    lines += parens(parts, rng, width * 4)
+    lines += concat(parts, rng, width * 4)
+    lines += stdout_values(parts, rng, width)
+    return lines
+
+
+GENERATORS = {
+    "declarations": declarations,
+    "parens": parens,
+    "concat": concat,
+    "chains": chains,
+    "stdout": stdout_values,
+    "mixed": mixed,
+}
+
+
+def generate_program(shape, statements=1000, size=None, seed=0):
+    if shape not in GENERATORS:
+        raise ValueError(f"Unknown shape: {shape}. Expected one of {', '.join(SHAPES)}")
+    rng = random.Random(seed)
+    if size is None:
+        lines = GENERATORS[shape](statements, rng)
+    else:
+        lines = GENERATORS[shape](statements, rng, size)
+    return "\n".join(lines) + "\n"
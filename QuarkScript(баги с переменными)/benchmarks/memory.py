@@ -0,0 +1,47 @@
+import gc
+import tracemalloc
+
+from lexer import *
+from parser import *
+from nodepool import *
+from benchmarks.generator import *
+from benchmarks.runner import count_nodes
+
+
+def traced_size(function):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+
+# Память дерева меряется как все, что выделил парсер на уже готовых токенах; узлы считаются
+# по вхождениям, поэтому общие литералы и переменные уменьшают число байт на узел.
+def measure_memory(source):
+    tokens = run(source)
+    ast_size, ast = traced_size(lambda: parse(tokens))
+    pool_size, pool = traced_size(lambda: NodePool.from_ast(ast))
+    nodes = count_nodes(ast)
+    return {
+        "nodes": nodes,
+        "ast_bytes": ast_size,
+        "ast_bytes_per_node": ast_size / nodes if nodes else 0.0,
+        "pool_nodes": len(pool),
+        "pool_bytes": pool_size,
+        "pool_bytes_per_node": pool_size / nodes if nodes else 0.0,
+    }
+
+
+def run_memory(shapes=SHAPES, statements=1000, size=None, seed=0):
+    return {shape: measure_memory(generate_program(shape, statements, size, seed)) for shape in shapes}
+
+
+def print_memory(results):
+    print(f"{'shape':<14}{'nodes':>10}{'AST MB':>10}{'B/node':>9}{'pool nodes':>12}{'pool MB':>10}{'B/node':>9}")
+    for shape, result in results.items():
+        print(f"{shape:<14}{result['nodes']:>10}{result['ast_bytes'] / 1e6:>10.2f}{result['ast_bytes_per_node']:>9.1f}"
+              f"{result['pool_nodes']:>12}{result['pool_bytes'] / 1e6:>10.2f}{result['pool_bytes_per_node']:>9.1f}")
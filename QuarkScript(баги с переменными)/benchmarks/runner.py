@@ -0,0 +1,95 @@
+import json
+import platform
+import sys
+import time
+
+from lexer import *
+from parser import *
+from interpreter import *
+from benchmarks.generator import *
+
+PHASES = ("lex", "parse", "interpret")
+
+
+def count_nodes(ast):
+    count = 0
+    stack = list(ast)
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        count += 1
+        stack.extend(node_children(node))
+    return count
+
+
+def best_time(function, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def rate(count, seconds):
+    return count / seconds if seconds > 0 else 0.0
+
+
+# Каждая фаза меряется отдельно на уже готовом результате предыдущей.
+def benchmark_source(source, repeat=5, backend="table", engine="tree"):
+    lex_time, tokens = best_time(lambda: LEXERS[backend](source).tokenize(), repeat)
+    parse_time, ast = best_time(lambda: Parser(tokens).parse(), repeat)
+    interpret_time, _ = best_time(lambda: list(execute(ast, engine)), repeat)
+    nodes = count_nodes(ast)
+    return {
+        "characters": len(source),
+        "tokens": len(tokens),
+        "nodes": nodes,
+        "statements": len(ast),
+        "lex": {"seconds": lex_time, "tokens_per_second": rate(len(tokens), lex_time)},
+        "parse": {"seconds": parse_time, "nodes_per_second": rate(nodes, parse_time)},
+        "interpret": {"seconds": interpret_time, "statements_per_second": rate(len(ast), interpret_time)},
+    }
+
+
+def run_benchmarks(shapes=SHAPES, statements=1000, size=None, repeat=5, seed=0, backend="table", engine="tree"):
+    results = {}
+    for shape in shapes:
+        source = generate_program(shape, statements, size, seed)
+        results[shape] = benchmark_source(source, repeat, backend, engine)
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "statements": statements,
+            "size": size,
+            "repeat": repeat,
+            "seed": seed,
+            "lexer": backend,
+            "engine": engine,
+        },
+        "results": results,
+    }
+
+
+def print_results(report):
+    print(f"{'shape':<14}{'tokens':>10}{'tokens/s':>14}{'nodes':>10}{'nodes/s':>14}{'stmts':>8}{'stmts/s':>14}")
+    for shape, result in report["results"].items():
+        print(f"{shape:<14}{result['tokens']:>10}{result['lex']['tokens_per_second']:>14.0f}"
+              f"{result['nodes']:>10}{result['parse']['nodes_per_second']:>14.0f}"
+              f"{result['statements']:>8}{result['interpret']['statements_per_second']:>14.0f}")
+
+
+def save_results(report, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
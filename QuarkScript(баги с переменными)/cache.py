@@ -0,0 +1,210 @@
+import hashlib
+import marshal
+import os
+import struct
+from parser import *
+
+CACHE_DIRECTORY = "__qscache__"
+CACHE_SUFFIX = ".qsc"
+FORMAT_VERSION = 2
+MAGIC = b"QSC"
+# magic, версия формата, флаг оптимизации, sha256 исходника
+HEADER = struct.Struct("<3sBB32s")
+
+TAG_NONE = 0
+TAG_STDOUT = 1
+TAG_STRING = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_BINOP = 5
+TAG_UNARY = 6
+TAG_CONCATENATION = 7
+TAG_VARIABLE = 8
+TAG_DECLARATION = 9
+TAG_MULTI_VALUE = 10
+TAG_ASSIGNMENT = 11
+TAG_BOOLEAN = 12
+
+LITERAL_TAGS = {
+    StringNode: TAG_STRING,
+    IntNumberNode: TAG_INT,
+    FloatNumberNode: TAG_FLOAT,
+    BooleanNode: TAG_BOOLEAN,
+}
+
+
+def source_hash(source):
+    return hashlib.sha256(source.encode("utf-8")).digest()
+
+
+def node_fields(node):
+    if node is None:
+        return (TAG_NONE,)
+    elif type(node) in LITERAL_TAGS:
+        return (LITERAL_TAGS[type(node)], node.value)
+    elif type(node) is StdoutNode:
+        return (TAG_STDOUT,)
+    elif type(node) is BinOpNode:
+        return (TAG_BINOP, node.op)
+    elif type(node) is UnaryOpNode:
+        return (TAG_UNARY, node.op)
+    elif type(node) is ConcatenationNode:
+        return (TAG_CONCATENATION, len(node.values))
+    elif type(node) is VariableNode:
+        return (TAG_VARIABLE, node.name)
+    elif type(node) is VariableDeclarationNode:
+        return (TAG_DECLARATION, node.name, node.type)
+    elif type(node) is MultiValueNode:
+        return (TAG_MULTI_VALUE, len(node.values), node.separator)
+    elif type(node) is AssignmentNode:
+        return (TAG_ASSIGNMENT, node.variable_name)
+    raise ValueError(f"Cannot serialize {type(node).__name__}")
+
+
+# Дерево записывается в обратном польском порядке плоским кортежем, поэтому глубина
+# выражений не упирается ни в рекурсию, ни в ограничения marshal.
+def encode_ast(ast):
+    flat = [len(ast)]
+    for statement in ast:
+        stack = [(statement, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                flat.extend(node_fields(node))
+                continue
+            stack.append((node, True))
+            for child in reversed(node_children(node)):
+                stack.append((child, False))
+    return marshal.dumps(tuple(flat))
+
+
+def decode_ast(data):
+    flat = marshal.loads(data)
+    stack = []
+    position = 1
+    length = len(flat)
+    while position < length:
+        tag = flat[position]
+        position += 1
+        if tag == TAG_NONE:
+            stack.append(None)
+        elif tag == TAG_STRING:
+            stack.append(StringNode(flat[position]))
+            position += 1
+        elif tag == TAG_INT:
+            stack.append(IntNumberNode(flat[position]))
+            position += 1
+        elif tag == TAG_FLOAT:
+            stack.append(FloatNumberNode(flat[position]))
+            position += 1
+        elif tag == TAG_BOOLEAN:
+            stack.append(BooleanNode(flat[position]))
+            position += 1
+        elif tag == TAG_VARIABLE:
+            stack.append(VariableNode(flat[position]))
+            position += 1
+        elif tag == TAG_BINOP:
+            right = stack.pop()
+            stack[-1] = BinOpNode(flat[position], stack[-1], right)
+            position += 1
+        elif tag == TAG_CONCATENATION:
+            count = flat[position]
+            values = stack[-count:]
+            del stack[-count:]
+            stack.append(ConcatenationNode(values))
+            position += 1
+        elif tag == TAG_UNARY:
+            stack[-1] = UnaryOpNode(flat[position], stack[-1])
+            position += 1
+        elif tag == TAG_STDOUT:
+            stack[-1] = StdoutNode(stack[-1])
+        elif tag == TAG_DECLARATION:
+            stack[-1] = VariableDeclarationNode(flat[position], flat[position + 1], stack[-1])
+            position += 2
+        elif tag == TAG_ASSIGNMENT:
+            stack[-1] = AssignmentNode(flat[position], stack[-1])
+            position += 1
+        elif tag == TAG_MULTI_VALUE:
+            count, separator = flat[position], flat[position + 1]
+            values = stack[-count:]
+            del stack[-count:]
+            stack.append(MultiValueNode(values, separator))
+            position += 2
+        else:
+            raise ValueError(f"Unknown node tag: {tag}")
+    if len(stack) != flat[0]:
+        raise ValueError("Corrupted compiled script")
+    return stack
+
+
+class ScriptCache:
+    def __init__(self, directory, max_entries=256, optimized=False):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.optimized = optimized
+
+    def entry_path(self, digest):
+        suffix = "-O" if self.optimized else ""
+        return os.path.join(self.directory, digest.hex() + suffix + CACHE_SUFFIX)
+
+    def load(self, source):
+        digest = source_hash(source)
+        path = self.entry_path(digest)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        if len(data) < HEADER.size:
+            self.discard(path)
+            return None
+        magic, version, optimized, stored_digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or optimized != self.optimized or stored_digest != digest:
+            self.discard(path)
+            return None
+
+        try:
+            ast = decode_ast(data[HEADER.size:])
+        except (ValueError, EOFError, TypeError, IndexError):
+            self.discard(path)
+            return None
+        # время изменения файла служит меткой последнего использования для LRU
+        os.utime(path)
+        return ast
+
+    def store(self, source, ast):
+        try:
+            payload = encode_ast(ast)
+        except ValueError:
+            return False
+        digest = source_hash(source)
+        path = self.entry_path(digest)
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, int(self.optimized), digest))
+            file.write(payload)
+        os.replace(temporary_path, path)
+        self.evict()
+        return True
+
+    def discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_SUFFIX):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            self.discard(path)
@@ -0,0 +1,291 @@
+import operator
+
+from parser import *
+from values import *
+
+
+def type_check(python_types, message):
+    def check(value):
+        if not isinstance(value, python_types):
+            raise TypeError(message.format(type(value)))
+    return check
+
+
+DECLARATION_CHECKS = {var_type: type_check(python_types, DECLARATION_ERRORS[var_type])
+                      for var_type, python_types in VALUE_TYPES.items()}
+
+ASSIGNMENT_CHECKS = {var_type: type_check(python_types, ASSIGNMENT_ERRORS[var_type])
+                     for var_type, python_types in VALUE_TYPES.items()}
+
+
+def no_check(value):
+    pass
+
+
+def divide_values(left_value, right_value):
+    if right_value != 0:
+        return left_value / right_value
+    raise ZeroDivisionError("Division by zero")
+
+
+BINARY_OPERATIONS = {
+    "PLUS": operator.add,
+    "MINUS": operator.sub,
+    "MULTIPLY": operator.mul,
+    "DIVIDE": divide_values,
+}
+
+
+def raise_error(message):
+    def fail(*values):
+        raise Exception(message)
+    return fail
+
+
+# шаги compile_deep
+DEEP_VALUE = 0
+DEEP_BINARY = 1
+DEEP_UNARY = 2
+DEEP_JOIN = 3
+
+
+def constant(value):
+    def literal(variables, variable_types):
+        return value
+    return literal
+
+
+class ClosureProgram:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def run(self):
+        return list(self.execute())
+
+    def execute(self):
+        variables = {}
+        variable_types = {}
+        for statement, is_stdout in self.statements:
+            result = statement(variables, variable_types)
+            if is_stdout:
+                yield result
+
+    def __repr__(self):
+        return f"ClosureProgram(statements={len(self.statements)})"
+
+
+# Каждый узел один раз превращается в замыкание с уже выбранными оператором, операндами и проверками.
+# Замыкания получают словари переменных и типов, поэтому одну программу можно исполнять много раз.
+class ClosureCompiler:
+    def compile(self, ast):
+        return ClosureProgram([(self.compile_node(node), isinstance(node, StdoutNode)) for node in ast])
+
+    # depth - глубина узла в выражении. Вложенные замыкания вызывают друг друга при исполнении,
+    # поэтому поддерево глубже RECURSION_BUDGET собирается compile_deep в одно замыкание без вложенности.
+    def compile_node(self, node, depth=0):
+        if isinstance(node, LITERAL_NODES):
+            return constant(node.value)
+        elif depth >= RECURSION_BUDGET and isinstance(node, (BinOpNode, UnaryOpNode, ConcatenationNode)):
+            return self.compile_deep(node)
+        elif isinstance(node, BinOpNode):
+            return self.compile_binop(node, depth)
+        elif isinstance(node, VariableDeclarationNode):
+            return self.compile_declaration(node, depth)
+        elif isinstance(node, VariableNode):
+            return self.compile_variable(node)
+        elif isinstance(node, ConcatenationNode):
+            return self.compile_join(node, depth)
+        elif isinstance(node, StdoutNode):
+            return self.compile_stdout(node, depth)
+        elif isinstance(node, UnaryOpNode):
+            return self.compile_unary(node, depth)
+        elif isinstance(node, AssignmentNode):
+            return self.compile_assignment(node, depth)
+        return self.compile_error(f"No visit_{type(node).__name__} method defined.")
+
+    # Поддерево раскладывается в обратную польскую запись, которую одно замыкание исполняет над
+    # явным стеком значений: листья и сложение двух переменных (оно смотрит на их типы) остаются
+    # обычными замыканиями, операции снимают со стека свои операнды. Порядок вычисления тот же.
+    def compile_deep(self, node):
+        steps = []
+        stack = [(node, False)]
+        while stack:
+            node, ready = stack.pop()
+            if ready:
+                if isinstance(node, BinOpNode):
+                    steps.append((DEEP_BINARY, BINARY_OPERATIONS.get(node.op) or
+                                  raise_error(f"Unknown binary operator: {node.op}")))
+                elif isinstance(node, UnaryOpNode):
+                    steps.append((DEEP_UNARY, operator.neg if node.op == "MINUS" else
+                                  raise_error(f"Unknown unary operator: {node.op}")))
+                else:
+                    steps.append((DEEP_JOIN, (len(node.values), node.separator)))
+            elif isinstance(node, BinOpNode):
+                if node.op == "PLUS" and isinstance(node.left, VariableNode) and isinstance(node.right, VariableNode):
+                    steps.append((DEEP_VALUE, self.compile_binop(node, 0)))
+                    continue
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, UnaryOpNode):
+                stack.append((node, True))
+                stack.append((node.node, False))
+            elif isinstance(node, ConcatenationNode):
+                stack.append((node, True))
+                for value in reversed(node.values):
+                    stack.append((value, False))
+            else:
+                steps.append((DEEP_VALUE, self.compile_node(node)))
+
+        def evaluate(variables, variable_types):
+            values = []
+            for kind, argument in steps:
+                if kind is DEEP_VALUE:
+                    values.append(argument(variables, variable_types))
+                elif kind is DEEP_BINARY:
+                    right_value = values.pop()
+                    values[-1] = argument(values[-1], right_value)
+                elif kind is DEEP_UNARY:
+                    values[-1] = argument(values[-1])
+                else:
+                    count, separator = argument
+                    pieces = values[-count:]
+                    del values[-count:]
+                    values.append(separator.join([str(value) for value in pieces]))
+            return values[0]
+        return evaluate
+
+    @staticmethod
+    def compile_error(message, *operands):
+        def fail(variables, variable_types):
+            for operand in operands:
+                operand(variables, variable_types)
+            raise Exception(message)
+        return fail
+
+    @staticmethod
+    def compile_variable(node):
+        name = node.name
+
+        def load(variables, variable_types):
+            if name in variables:
+                return variables[name]
+            raise Exception(f"Variable {name} is not defined")
+        return load
+
+    def compile_binop(self, node, depth):
+        left = self.compile_node(node.left, depth + 1)
+        right = self.compile_node(node.right, depth + 1)
+        op = node.op
+
+        if op == "PLUS" and isinstance(node.left, VariableNode) and isinstance(node.right, VariableNode):
+            left_name = node.left.name
+            right_name = node.right.name
+
+            def add_variables(variables, variable_types):
+                left_value = left(variables, variable_types)
+                right_value = right(variables, variable_types)
+                if variable_types.get(left_name) == "TYPE_BOOL" and variable_types.get(right_name) == "TYPE_BOOL":
+                    return left_value or right_value
+                return left_value + right_value
+            return add_variables
+
+        if op == "PLUS":
+            def add(variables, variable_types):
+                return left(variables, variable_types) + right(variables, variable_types)
+            return add
+        elif op == "MINUS":
+            def subtract(variables, variable_types):
+                return left(variables, variable_types) - right(variables, variable_types)
+            return subtract
+        elif op == "MULTIPLY":
+            def multiply(variables, variable_types):
+                return left(variables, variable_types) * right(variables, variable_types)
+            return multiply
+        elif op == "DIVIDE":
+            def divide(variables, variable_types):
+                return divide_values(left(variables, variable_types), right(variables, variable_types))
+            return divide
+        return self.compile_error(f"Unknown binary operator: {op}", left, right)
+
+    def compile_unary(self, node, depth):
+        operand = self.compile_node(node.node, depth + 1)
+        if node.op != "MINUS":
+            return self.compile_error(f"Unknown unary operator: {node.op}", operand)
+
+        def negate(variables, variable_types):
+            return -operand(variables, variable_types)
+        return negate
+
+    # Цепочки конкатенации и stdout через запятую собираются одним join
+    def compile_join(self, node, depth):
+        values = [self.compile_node(value, depth + 1) for value in node.values]
+        separator = node.separator
+
+        def join(variables, variable_types):
+            return separator.join([str(value(variables, variable_types)) for value in values])
+        return join
+
+    def compile_stdout(self, node, depth):
+        expression = node.expression
+        if expression is None:
+            return constant(None)
+
+        if isinstance(expression, MultiValueNode):
+            return self.compile_join(expression, depth)
+
+        if isinstance(expression, FloatNumberNode):
+            return constant(float(expression.value))
+
+        value = self.compile_node(expression, depth + 1)
+
+        def stdout(variables, variable_types):
+            return str(value(variables, variable_types))
+        return stdout
+
+    def compile_declaration(self, node, depth):
+        name = node.name
+        value = self.compile_node(node.value, depth + 1)
+
+        if node.type is None:
+            def declare_inferred(variables, variable_types):
+                var_value = value(variables, variable_types)
+                var_type = infer_type_from_value(var_value)
+                if var_type is None:
+                    raise Exception(f"InterpreterVarDecErr: Cannot infer type for variable '{name}'")
+                if name in variables:
+                    raise InterpreterErrors("Invalid Syntax", f"Variable '{name}' already exists")
+                variables[name] = var_value
+                variable_types[name] = var_type
+                return var_value
+            return declare_inferred
+
+        var_type = node.type
+        check = DECLARATION_CHECKS.get(var_type, no_check)
+
+        def declare(variables, variable_types):
+            var_value = value(variables, variable_types)
+            check(var_value)
+            if name in variables:
+                raise InterpreterErrors("Invalid Syntax", f"Variable '{name}' already exists")
+            variables[name] = var_value
+            variable_types[name] = var_type
+            return var_value
+        return declare
+
+    def compile_assignment(self, node, depth):
+        name = node.variable_name
+        value = self.compile_node(node.expression, depth + 1)
+
+        def assign(variables, variable_types):
+            var_value = value(variables, variable_types)
+            if name not in variables:
+                raise Exception(f"Name '{name}' is not defined")
+            ASSIGNMENT_CHECKS.get(variable_types[name], no_check)(var_value)
+            variables[name] = var_value
+            return var_value
+        return assign
+
+
+def compile_closures(ast):
+    return ClosureCompiler().compile(ast)
@@ -0,0 +1,30 @@
+import sys
+
+colors_state = {"enabled": None}
+
+
+def colors_enabled():
+    if colors_state["enabled"] is None:
+        colors_state["enabled"] = sys.stdout.isatty()
+        if colors_state["enabled"]:
+            import colorama
+            colorama.init()
+    return colors_state["enabled"]
+
+
+# colorama импортируется только при первом обращении к цвету и только если вывод идет в терминал
+class LazyPalette:
+    def __init__(self, palette):
+        self.palette = palette
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if not colors_enabled():
+            return ""
+        import colorama
+        return getattr(getattr(colorama, self.palette), name)
+
+
+Fore = LazyPalette("Fore")
+Style = LazyPalette("Style")
@@ -0,0 +1,134 @@
+from enum import IntEnum
+from parser import *
+
+
+class Opcode(IntEnum):
+    LOAD_CONST = 0
+    LOAD_VAR = 1
+    BINARY_ADD = 2
+    BINARY_ADD_VARS = 3
+    BINARY_SUBTRACT = 4
+    BINARY_MULTIPLY = 5
+    BINARY_DIVIDE = 6
+    UNARY_NEGATIVE = 7
+    TO_STR = 9
+    JOIN = 10
+    STDOUT = 11
+    DECLARE = 12
+    STORE = 13
+    POP_TOP = 14
+    RAISE = 15
+
+
+BINARY_OPCODES = {
+    "PLUS": Opcode.BINARY_ADD,
+    "MINUS": Opcode.BINARY_SUBTRACT,
+    "MULTIPLY": Opcode.BINARY_MULTIPLY,
+    "DIVIDE": Opcode.BINARY_DIVIDE,
+}
+
+
+class CodeObject:
+    def __init__(self, instructions):
+        self.instructions = instructions
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def __repr__(self):
+        return f"CodeObject(instructions={len(self.instructions)})"
+
+
+class Compiler:
+    def __init__(self):
+        self.instructions = []
+
+    def emit(self, opcode, argument=None):
+        self.instructions.append((opcode, argument))
+
+    def compile(self, ast):
+        for node in ast:
+            self.compile_statement(node)
+        return CodeObject(self.instructions)
+
+    # результат верхнеуровневого узла нужен только для stdout, остальное снимается со стека
+    def compile_statement(self, node):
+        if isinstance(node, StdoutNode):
+            self.compile_node(node)
+            self.emit(Opcode.STDOUT)
+        elif isinstance(node, VariableDeclarationNode):
+            self.compile_node(node.value)
+            self.emit(Opcode.DECLARE, (node.name, node.type))
+        elif isinstance(node, AssignmentNode):
+            self.compile_node(node.expression)
+            self.emit(Opcode.STORE, node.variable_name)
+        else:
+            self.compile_node(node)
+            self.emit(Opcode.POP_TOP)
+
+    # Обход без рекурсии: на стеке лежат узлы и готовые инструкции (кортежи), которые узел выпускает
+    # после своих детей, поэтому глубина выражения ограничена только памятью.
+    def compile_node(self, node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if type(node) is tuple:
+                self.emit(*node)
+            elif isinstance(node, (IntNumberNode, FloatNumberNode, StringNode, BooleanNode)):
+                self.emit(Opcode.LOAD_CONST, node.value)
+            elif isinstance(node, BinOpNode):
+                if node.op == "PLUS" and isinstance(node.left, VariableNode) and isinstance(node.right, VariableNode):
+                    stack.append((Opcode.BINARY_ADD_VARS, (node.left.name, node.right.name)))
+                elif node.op in BINARY_OPCODES:
+                    stack.append((BINARY_OPCODES[node.op],))
+                else:
+                    stack.append((Opcode.RAISE, f"Unknown binary operator: {node.op}"))
+                stack.append(node.right)
+                stack.append(node.left)
+            elif isinstance(node, VariableDeclarationNode):
+                stack.append((Opcode.LOAD_VAR, node.name))
+                stack.append((Opcode.DECLARE, (node.name, node.type)))
+                stack.append(node.value)
+            elif isinstance(node, VariableNode):
+                self.emit(Opcode.LOAD_VAR, node.name)
+            elif isinstance(node, ConcatenationNode):
+                stack.append((Opcode.JOIN, (len(node.values), node.separator)))
+                stack.extend(reversed(node.values))
+            elif isinstance(node, StdoutNode):
+                expression = node.expression
+                if expression is None:
+                    self.emit(Opcode.LOAD_CONST, None)
+                elif isinstance(expression, MultiValueNode):
+                    stack.append((Opcode.JOIN, (len(expression.values), expression.separator)))
+                    stack.extend(reversed(expression.values))
+                elif isinstance(expression, FloatNumberNode):
+                    self.emit(Opcode.LOAD_CONST, float(expression.value))
+                else:
+                    stack.append((Opcode.TO_STR,))
+                    stack.append(expression)
+            elif isinstance(node, UnaryOpNode):
+                if node.op == "MINUS":
+                    stack.append((Opcode.UNARY_NEGATIVE,))
+                else:
+                    stack.append((Opcode.RAISE, f"Unknown unary operator: {node.op}"))
+                stack.append(node.node)
+            elif isinstance(node, AssignmentNode):
+                stack.append((Opcode.LOAD_VAR, node.variable_name))
+                stack.append((Opcode.STORE, node.variable_name))
+                stack.append(node.expression)
+            else:
+                self.emit(Opcode.RAISE, f"No visit_{type(node).__name__} method defined.")
+
+
+def compile_program(ast):
+    return Compiler().compile(ast)
+
+
+def disassemble(code):
+    lines = []
+    for index, (opcode, argument) in enumerate(code.instructions):
+        if argument is None and opcode != Opcode.LOAD_CONST:
+            lines.append(f"{index:>6} {opcode.name}")
+        else:
+            lines.append(f"{index:>6} {opcode.name:<18} {argument!r}")
+    return "\n".join(lines)
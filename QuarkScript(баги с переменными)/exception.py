@@ -27,3 +27,9 @@ class InterpreterErrors(Exception):
         self.details = details
     def __str__(self):
         return f"{self.error_name}: {self.details}"
+
+class TypeCheckError(InterpreterErrors):
+    def __init__(self, details):
+        super().__init__("TypeCheckError", details)
+    def __str__(self):
+        return super().__str__()
@@ -0,0 +1,416 @@
+import argparse
+import random
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from lexer import *
+from parser import *
+
+# после стольких участков со своим сдвигом сдвиги применяются к хранимым значениям
+MAX_SHIFTS = 64
+
+
+class SpanParser(Parser):
+    def __init__(self, tokens, index=0, line_of=None):
+        self.token_list = tokens
+        self.index = index - 1
+        self.line_of = line_of
+        self.current_token = None
+        self.shared_nodes = {}
+        self.advance()
+
+    def advance(self):
+        self.index += 1
+        if self.index < len(self.token_list):
+            token = self.token_list[self.index]
+            if self.line_of is not None:
+                line = self.line_of(self.index)
+                if line != token.line:
+                    # в документе лежит строка до сдвига правками выше, а в ошибках нужна настоящая
+                    token = Token(token.type, line, token.column, token.value)
+            self.current_token = token
+        else:
+            self.current_token = None
+
+
+# Ленивый сдвиг хвоста массива: к элементу index прибавляется values[k] для последней границы bounds[k] <= index.
+# Правка сдвигает все после себя одной записью, поэтому неизменный хвост документа не перебирается.
+class TailShift:
+    def __init__(self):
+        self.bounds = []
+        self.values = []
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def value(self, index):
+        k = bisect_right(self.bounds, index) - 1
+        return self.values[k] if k >= 0 else 0
+
+    # Элементы [first, rest) заменены count новыми, уже без сдвига, а ко всему хвосту прибавлен tail_delta.
+    def splice(self, first, rest, count, tail_delta):
+        bounds = self.bounds
+        values = self.values
+        tail_value = self.value(rest) + tail_delta
+        index_delta = count - (rest - first)
+        high = bisect_right(bounds, rest)
+        new_bounds = bounds[:bisect_left(bounds, first)]
+        new_values = values[:len(new_bounds)]
+
+        def add(bound, value):
+            if new_bounds and new_bounds[-1] == bound:
+                new_bounds.pop()
+                new_values.pop()
+            if (new_values[-1] if new_values else 0) != value:
+                new_bounds.append(bound)
+                new_values.append(value)
+
+        add(first, 0)
+        add(first + count, tail_value)
+        for k in range(high, len(bounds)):
+            add(bounds[k] + index_delta, values[k] + tail_delta)
+        self.bounds = new_bounds
+        self.values = new_values
+
+    # Участки с ненулевым сдвигом: (начало, конец, сдвиг).
+    def regions(self, length):
+        bounds = self.bounds
+        for k, value in enumerate(self.values):
+            if value:
+                yield bounds[k], bounds[k + 1] if k + 1 < len(bounds) else length, value
+
+    def clear(self):
+        self.bounds = []
+        self.values = []
+
+
+def lower_bound(key, low, high, target):
+    while low < high:
+        middle = (low + high) // 2
+        if key(middle) < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+# Текст, его токены и разобранные инструкции. Смещения токенов, их строки и номера первых токенов
+# инструкций после правки хранятся со сдвигом (TailShift), настоящие значения дают token_start,
+# token_line и statement_start; normalize применяет сдвиги, например перед чтением tokens[i].line.
+# Ошибка разбора не мешает открыть документ: разобранный до нее префикс остается, а сама ошибка - в error.
+class IncrementalDocument:
+    def __init__(self, text):
+        self.text = text
+        self.error = self.load()
+
+    def load(self):
+        self.tokens = None
+        self.token_starts = None
+        self.offset_shift = TailShift()
+        self.line_shift = TailShift()
+        self.statements = []
+        # индекс первого токена каждой инструкции и токен, на котором остановился разбор
+        self.statement_starts = array("I")
+        self.statement_shift = TailShift()
+        self.stop = 0
+        self.complete = False
+        try:
+            self.lex()
+        except (Error, Exception) as e:
+            return e
+        statements, starts, stop, _, error = self.parse(0)
+        self.replace_statements(0, 0, statements, starts, 0)
+        return self.finish(stop, error)
+
+    def lex(self):
+        self.tokens = None
+        self.token_starts = None
+        self.tokens, self.token_starts, _ = self.tokenize(TableLexer(self.text), 0, 1, 1)
+        self.offset_shift.clear()
+        self.line_shift.clear()
+
+    def token_start(self, index):
+        return self.token_starts[index] + self.offset_shift.value(index)
+
+    def token_line(self, index):
+        return self.tokens[index].line + self.line_shift.value(index)
+
+    def statement_start(self, index):
+        return self.statement_starts[index] + self.statement_shift.value(index)
+
+    def statement_end(self, index):
+        return self.statement_start(index + 1) if index + 1 < len(self.statements) else self.stop
+
+    # Тот же проход, что и TableLexer.tokenize, но с запоминанием смещения каждого токена.
+    # Если передан resync, лексер останавливается, как только снова попадает на начало старого токена.
+    def tokenize(self, lexer, position, line, column, resync=None):
+        tokens = []
+        starts = array("I")
+        append = tokens.append
+        text = lexer.text
+        length = len(text)
+        match_token = TOKEN_PATTERN.match
+        operators = SINGLE_CHAR_OPERATORS
+
+        while position < length:
+            match = match_token(text, position)
+            if match is not None and match.lastindex == 1:
+                end = match.end()
+                newlines = text.count("\n", position, end)
+                if newlines:
+                    line += newlines
+                    column = end - text.rfind("\n", position, end)
+                else:
+                    column += end - position
+                position = end
+                continue
+
+            if resync is not None:
+                old_index = resync(position, column)
+                if old_index is not None:
+                    return tokens, starts, (old_index, line)
+
+            count = len(tokens)
+            if match is None:
+                end = lexer.tokenize_rare(position, line, column, append)
+            else:
+                group = match.lastindex
+                end = match.end()
+                if group == 8:
+                    append(Token(operators[text[position]], line, column))
+                elif group == 3:
+                    append(word_token(match.group(3), line, column))
+                elif group == 2:
+                    append(number_token(match.group(2), line, column))
+                elif group == 4 or group == 5:
+                    append(Token(TokenKind.STRING, line, column, match.group(group)))
+                elif group == 6:
+                    append(Token(TokenKind.DYNAMIC_ASSIGN, line, column))
+            if len(tokens) > count:
+                starts.append(position)
+            position = end
+
+        return tokens, starts, None
+
+    # Разбирает инструкции начиная с токена index. Возвращает новые инструкции, их первые токены,
+    # токен остановки, номер старой инструкции, с которой разбор совпал (resync), и ошибку.
+    def parse(self, index, resync=None):
+        parser = SpanParser(self.tokens, index, self.token_line if len(self.line_shift) else None)
+        statements = []
+        starts = array("I")
+        tail = None
+        try:
+            while parser.current_token is not None:
+                if parser.current_token.type == TokenKind.NEW_LINE:
+                    parser.advance()
+                    continue
+                if resync is not None:
+                    tail = resync(parser.index)
+                    if tail is not None:
+                        break
+                starts.append(parser.index)
+                statements.append(parser.parse_statement())
+        except (Error, Exception) as e:
+            # разобранный до ошибки префикс остается, следующая правка продолжит с него
+            stop = starts.pop() if len(starts) > len(statements) else parser.index
+            return statements, starts, stop, None, e
+        return statements, starts, parser.index, tail, None
+
+    def replace_statements(self, first, rest, statements, starts, tail_delta):
+        self.statements[first:rest] = statements
+        self.statement_starts[first:rest] = starts
+        self.statement_shift.splice(first, rest, len(statements), tail_delta)
+
+    def finish(self, stop, error):
+        self.stop = stop
+        self.complete = error is None
+        self.error = error
+        return error
+
+    def normalize(self):
+        for first, end, value in self.offset_shift.regions(len(self.token_starts)):
+            self.token_starts[first:end] = array("I", [start + value for start in self.token_starts[first:end]])
+        for first, end, value in self.line_shift.regions(len(self.tokens)):
+            for index in range(first, end):
+                self.tokens[index].line += value
+        for first, end, value in self.statement_shift.regions(len(self.statement_starts)):
+            self.statement_starts[first:end] = array("I", [start + value for start in self.statement_starts[first:end]])
+        self.offset_shift.clear()
+        self.line_shift.clear()
+        self.statement_shift.clear()
+
+    def edit(self, offset, removed, inserted):
+        old_text = self.text
+        if offset < 0 or removed < 0 or offset + removed > len(old_text):
+            raise ValueError(f"Edit out of range: offset={offset}, removed={removed}")
+        self.text = old_text[:offset] + inserted + old_text[offset + removed:]
+
+        if self.tokens is None:
+            # прошлый текст не лексировался, инкрементально продолжать не от чего
+            self.error = self.load()
+            if self.error is not None:
+                raise self.error
+            return self.statements
+
+        tokens = self.tokens
+        count = len(tokens)
+        delta = len(inserted) - removed
+        edit_end = offset + len(inserted)
+
+        # перелексируем с последнего токена, начавшегося до правки: состояние лексера в его начале известно
+        first = lower_bound(self.token_start, 0, count, offset)
+        if first == 0:
+            position, line, column = 0, 1, 1
+        else:
+            first -= 1
+            position = self.token_start(first)
+            line = self.token_line(first)
+            column = tokens[first].column
+
+        candidate = [lower_bound(self.token_start, first, count, offset + removed)]
+
+        def resync_token(new_position, new_column):
+            if new_position < edit_end:
+                return None
+            old_position = new_position - delta
+            index = candidate[0]
+            while index < count and self.token_start(index) < old_position:
+                index += 1
+            candidate[0] = index
+            if index < count and self.token_start(index) == old_position and tokens[index].column == new_column:
+                return index
+            return None
+
+        try:
+            middle, middle_starts, stop = self.tokenize(TableLexer(self.text), position, line, column, resync_token)
+        except (Error, Exception) as e:
+            self.tokens = None
+            self.token_starts = None
+            self.error = e
+            raise
+
+        if stop is None:
+            rest, line_delta = count, 0
+        else:
+            rest, new_line = stop
+            line_delta = new_line - self.token_line(rest)
+        tokens[first:rest] = middle
+        self.token_starts[first:rest] = middle_starts
+        self.offset_shift.splice(first, rest, len(middle), delta)
+        self.line_shift.splice(first, rest, len(middle), line_delta)
+
+        self.reparse(first, first + len(middle), rest)
+        if max(len(self.offset_shift), len(self.line_shift), len(self.statement_shift)) > MAX_SHIFTS:
+            self.normalize()
+        if self.error is not None:
+            raise self.error
+        return self.statements
+
+    # Старые токены [first, rest) заменены новыми [first, changed_end).
+    def reparse(self, first, changed_end, rest):
+        token_delta = changed_end - rest
+        count = len(self.statements)
+        old_stop = self.stop
+        old_complete = self.complete
+
+        # инструкция зависит от своих токенов и от следующего за ними, на который смотрел парсер
+        affected = lower_bound(self.statement_end, 0, count, first)
+        start = self.statement_start(affected) if affected < count else old_stop
+        candidate = [affected + 1]
+
+        def resync_statement(position):
+            if position < changed_end:
+                return None
+            old_position = position - token_delta
+            index = candidate[0]
+            while index < count and self.statement_start(index) < old_position:
+                index += 1
+            candidate[0] = index
+            if index < count and self.statement_start(index) == old_position:
+                return index
+            return None
+
+        statements, starts, stop, tail, error = self.parse(start, resync_statement)
+        if tail is None:
+            self.replace_statements(affected, count, statements, starts, 0)
+            return self.finish(stop, error)
+
+        self.replace_statements(affected, tail, statements, starts, token_delta)
+        if old_complete:
+            return self.finish(old_stop + token_delta, None)
+        # старый разбор падал дальше по тексту - повторяем его, чтобы ошибка получила новые позиции
+        statements, starts, stop, _, error = self.parse(old_stop + token_delta)
+        end = len(self.statements)
+        self.replace_statements(end, end, statements, starts, 0)
+        return self.finish(stop, error)
+
+
+def full_parse(text):
+    return parse(run(text))
+
+
+def generate_source(statements, seed=0):
+    random_generator = random.Random(seed)
+    lines = []
+    for index in range(statements):
+        choice = random_generator.randrange(4)
+        if choice == 0 or index < 2:
+            lines.append(f"var v{index} := {random_generator.randrange(1000)} * ({index} + 1);")
+        elif choice == 1:
+            lines.append(f"stdout v{random_generator.randrange(index // 2 + 1) * 2}, \"line {index}\";")
+        elif choice == 2:
+            lines.append(f"var s{index} : string = \"a\" + {index} + \"b\";")
+        else:
+            lines.append(f"stdout ({index} + 2) * 3 - {index} / 4;")
+    return "\n".join(lines) + "\n"
+
+
+def benchmark(statements=20000, edits=200, seed=0, full_every=10):
+    text = generate_source(statements, seed)
+    random_generator = random.Random(seed)
+
+    started = time.perf_counter()
+    document = IncrementalDocument(text)
+    initial = time.perf_counter() - started
+
+    incremental_times = []
+    full_times = []
+    for _ in range(edits):
+        # меняем одно число в случайной строке, как при наборе текста в редакторе
+        line_start = document.text.rfind("\n", 0, random_generator.randrange(len(document.text))) + 1
+        digit = document.text.find("1", line_start)
+        if digit < 0:
+            continue
+        replacement = str(random_generator.randrange(2, 10))
+
+        started = time.perf_counter()
+        result = document.edit(digit, 1, replacement)
+        incremental_times.append(time.perf_counter() - started)
+        # полный разбор на больших текстах идет секундами, поэтому сверяется только каждая full_every-я правка
+        if len(incremental_times) % full_every:
+            continue
+
+        started = time.perf_counter()
+        expected = full_parse(document.text)
+        full_times.append(time.perf_counter() - started)
+        if repr(result) != repr(expected):
+            raise AssertionError(f"Incremental parse differs from full parse after edit at {digit}")
+
+    incremental_times.sort()
+    full_times.sort()
+    print(f"{statements} statements, {len(text)} characters, initial parse {initial * 1000:.2f} ms")
+    print(f"incremental edit: median {incremental_times[len(incremental_times) // 2] * 1000:.3f} ms, "
+          f"max {incremental_times[-1] * 1000:.3f} ms")
+    print(f"full re-parse:    median {full_times[len(full_times) // 2] * 1000:.3f} ms, "
+          f"max {full_times[-1] * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Measure latency of incremental re-parsing.")
+    argument_parser.add_argument("--statements", type=int, default=20000)
+    argument_parser.add_argument("--edits", type=int, default=200)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--full-every", type=int, default=10, help="compare with a full re-parse every N edits")
+    arguments = argument_parser.parse_args()
+    benchmark(arguments.statements, arguments.edits, arguments.seed, arguments.full_every)
@@ -1,4 +1,12 @@
+from functools import partial
+
 from parser import *
+from vm import *
+from closures import *
+from values import *
+from typechecker import *
+from resolver import *
+from sinks import *
 
 class Interpreter:
     def __init__(self, ast):
@@ -31,17 +39,7 @@ class Interpreter:
             return self.visit_BooleanNode(node)
         else:
             raise Exception(f"No visit_{type(node).__name__} method defined.")
-    def infer_type_from_value(self, value):
-        if isinstance(value, int):
-            return "TYPE_INT"
-        elif isinstance(value, float):
-            return "TYPE_FLOAT"
-        elif isinstance(value, str):
-            return "TYPE_STRING"
-        elif isinstance(value, bool):
-            return "TYPE_BOOL"
-        else:
-            return None
+    infer_type_from_value = staticmethod(infer_type_from_value)
     def visit_IntNumberNode(self, node):
         return node.value
 
@@ -51,9 +49,59 @@ class Interpreter:
     def visit_StringNode(self, node):
         return node.value
 
+    # Неглубокие выражения вычисляются прямой рекурсией, поддерево глубже RECURSION_BUDGET - evaluate_iterative.
+    def evaluate(self, node, depth=0):
+        node_type = type(node)
+        if node_type in LITERAL_NODES:
+            return node.value
+        if depth >= RECURSION_BUDGET:
+            return self.evaluate_iterative(node)
+        if node_type is BinOpNode:
+            left_value = self.evaluate(node.left, depth + 1)
+            return self.binary_operation(node, left_value, self.evaluate(node.right, depth + 1))
+        elif node_type is UnaryOpNode:
+            return self.unary_operation(node, self.evaluate(node.node, depth + 1))
+        elif node_type is ConcatenationNode or node_type is MultiValueNode:
+            return self.join_values([self.evaluate(value_node, depth + 1) for value_node in node.values], node.separator)
+        return self.visit(node)
+
+    # Вложенные операции вычисляются обходом в обратном порядке с явным стеком, а не рекурсией visit,
+    # поэтому глубина выражения ограничена только памятью. Листья по-прежнему идут через visit.
+    def evaluate_iterative(self, node):
+        values = []
+        stack = [(node, False)]
+        while stack:
+            node, ready = stack.pop()
+            if ready:
+                if isinstance(node, UnaryOpNode):
+                    values[-1] = self.unary_operation(node, values[-1])
+                elif isinstance(node, BinOpNode):
+                    right_value = values.pop()
+                    values[-1] = self.binary_operation(node, values[-1], right_value)
+                else:
+                    count = len(node.values)
+                    pieces = values[-count:]
+                    del values[-count:]
+                    values.append(self.join_values(pieces, node.separator))
+            elif isinstance(node, BinOpNode):
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, (ConcatenationNode, MultiValueNode)):
+                stack.append((node, True))
+                for value_node in reversed(node.values):
+                    stack.append((value_node, False))
+            elif isinstance(node, UnaryOpNode):
+                stack.append((node, True))
+                stack.append((node.node, False))
+            else:
+                values.append(self.visit(node))
+        return values[0]
+
     def visit_BinOpNode(self, node):
-        left_value = self.visit(node.left)
-        right_value = self.visit(node.right)
+        return self.evaluate(node)
+
+    def binary_operation(self, node, left_value, right_value):
         left_type = self.variable_types.get(node.left.name) if isinstance(node.left, VariableNode) else None
         right_type = self.variable_types.get(node.right.name) if isinstance(node.right, VariableNode) else None
 
@@ -83,14 +131,7 @@ class Interpreter:
                 raise Exception(f"InterpreterVarDecErr: Cannot infer type for variable '{var_name}'")
         else:
             var_type = node.type
-        if var_type == "TYPE_INT" and not isinstance(var_value, int):
-            raise TypeError(f"Expected TYPE_INT, got {type(var_value)}")
-        elif var_type == "TYPE_FLOAT" and not isinstance(var_value, (int, float)):
-            raise TypeError(f"Expected TYPE_FLOAT, got {type(var_value)}")
-        elif var_type == "TYPE_STRING" and not isinstance(var_value, str):
-            raise TypeError(f"Expected TYPE_STRING, got {type(var_value)}")
-        elif var_type == "TYPE_BOOL" and not isinstance(var_value, bool):
-            raise TypeError(f"Expected TYPE_BOOL got {type(var_value)}")
+        check_value_type(var_type, var_value, DECLARATION_ERRORS)
 
         if var_name not in self.variables:
             self.variables[var_name] = var_value
@@ -105,9 +146,11 @@ class Interpreter:
         else:
             raise Exception(f"Variable {var_name} is not defined")
     def visit_ConcatenationNode(self, node):
-        left_value = self.visit(node.left)
-        right_value = self.visit(node.right)
-        return str(left_value) + str(right_value)
+        return self.evaluate(node)
+
+    # Общий путь для цепочек конкатенации и stdout через запятую: один join вместо копирования префикса на каждом шаге
+    def join_values(self, values, separator):
+        return separator.join([str(value) for value in values])
 
     def visit_StdoutNode(self, node):
         if node.expression is None: return None
@@ -120,16 +163,16 @@ class Interpreter:
 
         return output
     def visit_UnaryOpNode(self, node):
-        value = self.visit(node.node)
+        return self.evaluate(node)
 
+    def unary_operation(self, node, value):
         if node.op == "MINUS":
             return -value
         else:
             raise Exception(f"Unknown unary operator: {node.op}")
 
     def visit_MultiValueNode(self, node):
-        values = (str(self.visit(value_node)) for value_node in node.values)
-        return node.separator.join(values)
+        return self.evaluate(node)
     def visit_AssignmentNode(self, node):
         var_name = node.variable_name
         var_value = self.visit(node.expression)
@@ -140,15 +183,8 @@ class Interpreter:
         declared_type = self.variable_types[var_name]
         inferred_type = self.infer_type_from_value(var_value)
 
-        if declared_type == "TYPE_INT" and not isinstance(var_value, int):
-            raise TypeError(f"Expected TYPE_INT, got {type(var_value)}")
-        elif declared_type == "TYPE_FLOAT" and not isinstance(var_value, (int, float)):
-            raise TypeError(f"Expected TYPE_FLOAT, got {type(var_value)}")
-        elif declared_type == "TYPE_STRING" and not isinstance(var_value, str):
-            raise TypeError(f"Expected TYPE_STRING, got {type(var_value)}")
-        elif declared_type == "TYPE_BOOL" and not isinstance(var_value, bool):
-            raise TypeError(f"Excepted TYPE_BOOL, got {type(var_value)}")
-        elif declared_type is None and inferred_type is None:
+        check_value_type(declared_type, var_value, ASSIGNMENT_ERRORS)
+        if declared_type is None and inferred_type is None:
             raise Exception("Cannot infer type for assignment")
         elif declared_type is None and declared_type != inferred_type:
             raise Exception(f"Type mismatch: cannot assign {inferred_type} to {declared_type}")
@@ -158,12 +194,184 @@ class Interpreter:
     def visit_BooleanNode(self, node):
         return node.value
 
-def interpret(ast):
-    interpreter = Interpreter(ast)
-    results = []
+class CheckedInterpreter(Interpreter):
+    def binary_operation(self, node, left_value, right_value):
+        if node.op == "PLUS":
+            if node.bool_plus:
+                return left_value or right_value
+            return left_value + right_value
+        elif node.op == "MINUS":
+            return left_value - right_value
+        elif node.op == "DIVIDE":
+            if right_value != 0:
+                return left_value / right_value
+            raise ZeroDivisionError("Division by zero")
+        elif node.op == "MULTIPLY":
+            return left_value * right_value
+        else:
+            raise Exception(f"Unknown binary operator: {node.op}")
+
+    def visit_VariableDeclarationNode(self, node):
+        if node.needs_check:
+            return super().visit_VariableDeclarationNode(node)
+        var_name = node.name
+        var_value = self.visit(node.value)
+        if var_name in self.variables:
+            raise InterpreterErrors("Invalid Syntax", f"Variable '{var_name}' already exists")
+        self.variables[var_name] = var_value
+        self.variable_types[var_name] = node.resolved_type
+        return var_value
+
+    def visit_AssignmentNode(self, node):
+        if node.needs_check:
+            return super().visit_AssignmentNode(node)
+        var_name = node.variable_name
+        var_value = self.visit(node.expression)
+        if var_name not in self.variables:
+            raise Exception(f"Name '{var_name}' is not defined")
+        self.variables[var_name] = var_value
+        return var_value
+
+
+class SlotInterpreter(Interpreter):
+    def __init__(self, program):
+        super().__init__(program.statements)
+        self.slots = [None] * program.slot_count
+        self.slot_types = [None] * program.slot_count
+        self.dispatch = {
+            IntNumberNode: self.visit_IntNumberNode,
+            FloatNumberNode: self.visit_FloatNumberNode,
+            StringNode: self.visit_StringNode,
+            BooleanNode: self.visit_BooleanNode,
+            BinOpNode: self.visit_BinOpNode,
+            UnaryOpNode: self.visit_UnaryOpNode,
+            ConcatenationNode: self.visit_ConcatenationNode,
+            StdoutNode: self.visit_StdoutNode,
+            SlotVariableNode: self.visit_SlotVariableNode,
+            SlotDeclarationNode: self.visit_SlotDeclarationNode,
+            SlotAssignmentNode: self.visit_SlotAssignmentNode,
+        }
+
+    def visit(self, node):
+        method = self.dispatch.get(type(node))
+        if method is None:
+            raise Exception(f"No visit_{type(node).__name__} method defined.")
+        return method(node)
+
+    def binary_operation(self, node, left_value, right_value):
+        left = node.left
+        right = node.right
+        if (node.op == "PLUS" and type(left) is SlotVariableNode and type(right) is SlotVariableNode
+                and self.slot_types[left.slot] == "TYPE_BOOL" and self.slot_types[right.slot] == "TYPE_BOOL"):
+            return left_value or right_value
+
+        if node.op == "PLUS":
+            return left_value + right_value
+        elif node.op == "MINUS":
+            return left_value - right_value
+        elif node.op == "DIVIDE":
+            if right_value != 0:
+                return left_value / right_value
+            raise ZeroDivisionError("Division by zero")
+        elif node.op == "MULTIPLY":
+            return left_value * right_value
+        else:
+            raise Exception(f"Unknown binary operator: {node.op}")
+
+    def visit_SlotVariableNode(self, node):
+        return self.slots[node.slot]
+
+    def visit_SlotDeclarationNode(self, node):
+        var_value = self.visit(node.value)
+        if node.type is None:
+            var_type = infer_type_from_value(var_value)
+            if var_type is None:
+                raise Exception(f"InterpreterVarDecErr: Cannot infer type for variable '{node.name}'")
+        else:
+            var_type = node.type
+            DECLARATION_CHECKS.get(var_type, no_check)(var_value)
+        self.slots[node.slot] = var_value
+        self.slot_types[node.slot] = var_type
+        return var_value
+
+    def visit_SlotAssignmentNode(self, node):
+        var_value = self.visit(node.expression)
+        ASSIGNMENT_CHECKS.get(self.slot_types[node.slot], no_check)(var_value)
+        self.slots[node.slot] = var_value
+        return var_value
+
+
+def execute(ast, engine="tree"):
+    if engine == "vm":
+        yield from VirtualMachine().execute(compile_program(ast))
+        return
+    if engine == "closure":
+        yield from compile_closures(ast).execute()
+        return
+    interpreter, ast = create_interpreter(ast, engine)
+    yield from execute_statements(interpreter, ast)
+
+
+# Интерпретатор для движков, обходящих дерево, и инструкции, которые ему исполнять.
+def create_interpreter(ast, engine="tree"):
+    if engine == "checked":
+        errors = typecheck(ast)
+        if errors:
+            raise errors[0]
+        return CheckedInterpreter(ast), ast
+    elif engine == "slots":
+        program = resolve(ast)
+        return SlotInterpreter(program), program.statements
+    elif engine == "tree":
+        return Interpreter(ast), ast
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+# Исполнение по одной инструкции для тех, кому нужно вмешиваться между инструкциями (asynchronous.py):
+# пары (функция без аргументов, печатает ли инструкция). Компиляция для vm и closure делается сразу,
+# а сами пары создаются лениво, по мере исполнения. Для vm каждая инструкция компилируется отдельно,
+# виртуальная машина и переменные у всех общие.
+def create_steps(ast, engine="tree"):
+    if engine == "vm":
+        machine = VirtualMachine()
+        codes = [compile_program([node]) for node in ast]
+        return ((partial(machine.run_statement, code), isinstance(node, StdoutNode)) for node, code in zip(ast, codes))
+    elif engine == "closure":
+        variables = {}
+        variable_types = {}
+        return ((partial(statement, variables, variable_types), is_stdout)
+                for statement, is_stdout in compile_closures(ast).statements)
+    interpreter, ast = create_interpreter(ast, engine)
+    return interpreter_steps(interpreter, ast)
+
+
+def interpreter_steps(interpreter, ast):
+    return ((partial(interpreter.visit, node), isinstance(node, StdoutNode)) for node in ast)
+
+
+def execute_statements(interpreter, ast):
     for node in ast:
         result = interpreter.visit(node)
         if isinstance(node, StdoutNode):
-            results.append(result)
-    return results
+            yield result
+
+
+# Результаты stdout пишутся в sink по мере исполнения; возвращается число записанных строк.
+def write_results(results, sink, flush_size=DEFAULT_FLUSH_SIZE):
+    sink = make_sink(sink, flush_size)
+    written = 0
+    try:
+        for result in results:
+            if result is not None:
+                sink.write(result)
+                written += 1
+    finally:
+        sink.flush()
+    return written
+
 
+# Без sink возвращает список результатов stdout, с sink - число строк, ушедших в sink.
+def interpret(ast, engine="tree", sink=None, flush_size=DEFAULT_FLUSH_SIZE):
+    if sink is None:
+        return list(execute(ast, engine))
+    return write_results(execute(ast, engine), sink, flush_size)
@@ -1,7 +1,11 @@
-from colorama import Fore, init
+from colors import Fore
 from exception import *
+from array import array
+from enum import IntEnum
 import string
-init()
+import sys
+import re
+import io
 DIGITS = string.digits
 
 OPERATORS = {
@@ -21,21 +25,59 @@ OPERATORS = {
     "RIGHT_BRACE": "}"
 }
 
+
+
+class TokenKind(IntEnum):
+    PLUS = 0
+    MINUS = 1
+    DIVIDE = 2
+    MULTIPLY = 3
+    LEFT_PAREN = 4
+    RIGHT_PAREN = 5
+    NEW_LINE = 6
+    SEMI_COLON = 7
+    ASSIGN = 8
+    COLON = 9
+    DYNAMIC_COLON = 10
+    COMMA = 11
+    LEFT_BRACE = 12
+    RIGHT_BRACE = 13
+    DYNAMIC_ASSIGN = 14
+    INTEGER = 15
+    FLOAT = 16
+    STRING = 17
+    VAR_IDENTIFIER = 18
+    VAR_KEYWORD = 19
+    TYPE_INT = 20
+    TYPE_FLOAT = 21
+    TYPE_STRING = 22
+    TYPE_BOOL = 23
+    STDOUT = 24
+    STDIN = 25
+    TRUE = 26
+    FALSE = 27
+
+
+# индекс совпадает со значением вида, так быстрее чем TokenKind(value)
+TOKEN_KINDS = tuple(TokenKind)
+
 KEYWORDS = {
-    "var": "VAR_KEYWORD",
-    "int": "TYPE_INT",
-    "float": "TYPE_FLOAT",
-    "string": "TYPE_STRING",
-    "bool": "TYPE_BOOL",
-    "stdout": "STDOUT",
-    "stdin": "STDIN",
-    "true": "TRUE",
-    "false": "FALSE",
+    "var": TokenKind.VAR_KEYWORD,
+    "int": TokenKind.TYPE_INT,
+    "float": TokenKind.TYPE_FLOAT,
+    "string": TokenKind.TYPE_STRING,
+    "bool": TokenKind.TYPE_BOOL,
+    "stdout": TokenKind.STDOUT,
+    "stdin": TokenKind.STDIN,
+    "true": TokenKind.TRUE,
+    "false": TokenKind.FALSE,
 
 }
 
 
 class Token:
+    __slots__ = ("type", "value", "line", "column")
+
     def __init__(self, type_, line, column, value=None):
         self.type = type_
         self.value = value
@@ -44,8 +86,8 @@ class Token:
 
     def __repr__(self):
         if self.value:
-            return f"Token(type={Fore.RED}{self.type}{Fore.RESET}, value={Fore.CYAN}{self.value}{Fore.RESET}, line={Fore.GREEN}{self.line}{Fore.RESET}, column={Fore.GREEN}{self.column}{Fore.RESET})"
-        return f"Operator(operator={Fore.MAGENTA}{self.type}{Fore.RESET}, line={Fore.GREEN}{self.line}{Fore.RESET}, column={Fore.GREEN}{self.column}{Fore.RESET})"
+            return f"Token(type={Fore.RED}{self.type.name}{Fore.RESET}, value={Fore.CYAN}{self.value}{Fore.RESET}, line={Fore.GREEN}{self.line}{Fore.RESET}, column={Fore.GREEN}{self.column}{Fore.RESET})"
+        return f"Operator(operator={Fore.MAGENTA}{self.type.name}{Fore.RESET}, line={Fore.GREEN}{self.line}{Fore.RESET}, column={Fore.GREEN}{self.column}{Fore.RESET})"
 
 
 class Lexer:
@@ -87,9 +129,9 @@ class Lexer:
             result = "0" + result
 
         if dot_count == 0:
-            return "INTEGER", int(result)
+            return TokenKind.INTEGER, int(result)
         else:
-            return "FLOAT", float(result)
+            return TokenKind.FLOAT, float(result)
 
     def string(self):
         result = ""
@@ -152,7 +194,7 @@ class Lexer:
                 continue
 
             if self.current_char == OPERATORS["NEW_LINE"]:
-                tokens.append(Token("NEW_LINE", start_line, start_column, "\n"))
+                tokens.append(Token(TokenKind.NEW_LINE, start_line, start_column, "\n"))
                 self.advance()
                 continue
 
@@ -183,23 +225,23 @@ class Lexer:
                     raise SyntaxError(f"Unterminated String", start_line, start_column)
 
                 self.advance()
-                tokens.append(Token("STRING", start_line, start_column, string_value))
+                tokens.append(Token(TokenKind.STRING, start_line, start_column, string_value))
                 continue
             if self.current_char == ":":
                 if self.position + 1 < len(self.text) and self.text[self.position + 1] == "=":
-                    tokens.append(Token("DYNAMIC_ASSIGN", start_line, start_column))
+                    tokens.append(Token(TokenKind.DYNAMIC_ASSIGN, start_line, start_column))
                     self.advance()
                     self.advance()
                     continue
                 else:
-                    tokens.append(Token("COLON", start_line, start_column))
+                    tokens.append(Token(TokenKind.COLON, start_line, start_column))
                     self.advance()
                     continue
 
             is_operator = False
             for token_type, operator_symbol in OPERATORS.items():
                 if self.current_char == operator_symbol:
-                    tokens.append(Token(token_type, start_line, start_column))
+                    tokens.append(Token(TokenKind[token_type], start_line, start_column))
                     self.advance()
                     is_operator = True
                     break
@@ -224,7 +266,7 @@ class Lexer:
                     self.skip_whitespace()
                     continue
 
-                tokens.append(Token("VAR_IDENTIFIER", start_line, start_column, command))
+                tokens.append(Token(TokenKind.VAR_IDENTIFIER, start_line, start_column, sys.intern(command)))
                 self.skip_whitespace()
                 continue
 
@@ -234,7 +276,244 @@ class Lexer:
         return tokens
 
 
-def run(content):
-    tokens = Lexer(content).tokenize()
+TOKEN_PATTERN = re.compile(r"""
+    (\s+)                        # 1 пробельные символы
+  | ([0-9]+\.?[0-9]*|\.[0-9]+)   # 2 число
+  | ([A-Za-z]\w*)                # 3 идентификатор или ключевое слово
+  | "([^"]*)"                    # 4 строка в двойных кавычках
+  | '([^']*)'                    # 5 строка в одинарных кавычках
+  | (:=)                         # 6 динамическое присваивание
+  | (//[^\n]*)                   # 7 комментарий
+  | ([-+*/(){};=:,])             # 8 односимвольный оператор
+""", re.VERBOSE)
+
+WORD_PATTERN = re.compile(r"\w*")
+NUMBER_PATTERN = re.compile(r"[0-9]*\.?[0-9]*")
+
+SINGLE_CHAR_OPERATORS = {symbol: TokenKind[token_type] for token_type, symbol in OPERATORS.items() if len(symbol) == 1}
+
+
+def number_token(lexeme, line, column):
+    if lexeme.startswith("."):
+        lexeme = "0" + lexeme
+    if "." in lexeme:
+        return Token(TokenKind.FLOAT, line, column, float(lexeme))
+    return Token(TokenKind.INTEGER, line, column, int(lexeme))
+
+
+def word_token(lexeme, line, column):
+    if lexeme in KEYWORDS:
+        return Token(KEYWORDS[lexeme], line, column)
+    # одно имя встречается в программе много раз: после intern все вхождения - один объект,
+    # а сравнение ключей в словарях переменных начинается с проверки идентичности
+    return Token(TokenKind.VAR_IDENTIFIER, line, column, sys.intern(lexeme))
+
+
+class TableLexer:
+    def __init__(self, text):
+        self.text = text
+        self.position = 0
+        self.line = 1
+        self.column = 1
+
+    def tokenize(self):
+        tokens = []
+        append = tokens.append
+        text = self.text
+        length = len(text)
+        position = self.position
+        line = self.line
+        column = self.column
+        match_token = TOKEN_PATTERN.match
+        operators = SINGLE_CHAR_OPERATORS
+
+        while position < length:
+            match = match_token(text, position)
+            if match is None:
+                position = self.tokenize_rare(position, line, column, append)
+                continue
+
+            group = match.lastindex
+            end = match.end()
+            if group == 1:
+                newlines = text.count("\n", position, end)
+                if newlines:
+                    line += newlines
+                    column = end - text.rfind("\n", position, end)
+                else:
+                    column += end - position
+            elif group == 8:
+                append(Token(operators[text[position]], line, column))
+            elif group == 3:
+                append(word_token(match.group(3), line, column))
+            elif group == 2:
+                append(number_token(match.group(2), line, column))
+            elif group == 4 or group == 5:
+                append(Token(TokenKind.STRING, line, column, match.group(group)))
+            elif group == 6:
+                append(Token(TokenKind.DYNAMIC_ASSIGN, line, column))
+            position = end
+
+        self.position = position
+        self.line = line
+        self.column = column
+        return tokens
+
+    # Символы вне основного шаблона: ошибки, незакрытые строки и не-ASCII буквы/цифры.
+    def tokenize_rare(self, position, line, column, append):
+        text = self.text
+        char = text[position]
+
+        if char == "." and (position + 1 >= len(text) or not text[position + 1].isdigit()):
+            raise InvalidCharacterError(f"'{char}'", line, column)
+
+        if char.isdigit() or char == ".":
+            end = NUMBER_PATTERN.match(text, position).end()
+            append(number_token(text[position:end], line, column))
+            return end
+
+        if char == '"' or char == "'":
+            raise SyntaxError(f"Unterminated String", line, column)
+
+        if char.isalpha():
+            end = WORD_PATTERN.match(text, position + 1).end()
+            append(word_token(text[position:end], line, column))
+            return end
+
+        raise InvalidCharacterError(f"'{char}'", line, column)
+
+
+class StreamLexer(TableLexer):
+    def __init__(self, file, chunk_size=65536):
+        super().__init__("")
+        self.file = file
+        self.chunk_size = chunk_size
+        self.eof = False
+
+    def read_chunk(self):
+        rest = self.text[self.position:]
+        # читаем не меньше уже накопленного хвоста, чтобы длинные строки склеивались за линейное время
+        chunk = self.file.read(max(self.chunk_size, len(rest)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = rest + chunk
+        self.position = 0
+        return True
+
+    def needs_more(self, match, position):
+        if self.eof:
+            return False
+        if match is not None:
+            return match.end() == len(self.text)
+        return self.text[position] in "\"'" or WORD_PATTERN.match(self.text, position + 1).end() == len(self.text)
+
+    def tokenize(self):
+        operators = SINGLE_CHAR_OPERATORS
+        rare_tokens = []
+
+        while True:
+            text = self.text
+            position = self.position
+            if position >= len(text):
+                if self.eof or not self.read_chunk():
+                    return
+                continue
+
+            match = TOKEN_PATTERN.match(text, position)
+            if self.needs_more(match, position) and self.read_chunk():
+                continue
+
+            line = self.line
+            column = self.column
+            if match is None:
+                self.position = self.tokenize_rare(position, line, column, rare_tokens.append)
+                yield from rare_tokens
+                rare_tokens.clear()
+                continue
+
+            group = match.lastindex
+            end = match.end()
+            self.position = end
+            if group == 1:
+                newlines = text.count("\n", position, end)
+                if newlines:
+                    self.line = line + newlines
+                    self.column = end - text.rfind("\n", position, end)
+                else:
+                    self.column = column + end - position
+            elif group == 8:
+                yield Token(operators[text[position]], line, column)
+            elif group == 3:
+                yield word_token(match.group(3), line, column)
+            elif group == 2:
+                yield number_token(match.group(2), line, column)
+            elif group == 4 or group == 5:
+                yield Token(TokenKind.STRING, line, column, match.group(group))
+            elif group == 6:
+                yield Token(TokenKind.DYNAMIC_ASSIGN, line, column)
+
+
+class TokenBuffer:
+    def __init__(self):
+        self.kinds = array("B")
+        self.lines = array("I")
+        self.columns = array("I")
+        self.values = []
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        buffer = cls()
+        buffer.extend(tokens)
+        return buffer
+
+    def append(self, token):
+        self.kinds.append(token.type)
+        self.lines.append(token.line)
+        self.columns.append(token.column)
+        self.values.append(token.value)
+
+    def extend(self, tokens):
+        kinds = self.kinds.append
+        lines = self.lines.append
+        columns = self.columns.append
+        values = self.values.append
+        for token in tokens:
+            kinds(token.type)
+            lines(token.line)
+            columns(token.column)
+            values(token.value)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        return Token(TOKEN_KINDS[self.kinds[index]], self.lines[index], self.columns[index], self.values[index])
+
+    def __iter__(self):
+        kinds = TOKEN_KINDS
+        for kind, line, column, value in zip(self.kinds, self.lines, self.columns, self.values):
+            yield Token(kinds[kind], line, column, value)
+
+    def __repr__(self):
+        return f"TokenBuffer(tokens={len(self)})"
+
+
+LEXERS = {
+    "table": TableLexer,
+    "legacy": Lexer,
+}
+
+
+def run(content, backend="table"):
+    tokens = LEXERS[backend](content).tokenize()
     return tokens
 
+
+def run_stream(file, chunk_size=65536):
+    return StreamLexer(file, chunk_size).tokenize()
+
+
+def run_buffer(content):
+    return TokenBuffer.from_tokens(StreamLexer(io.StringIO(content)).tokenize())
+
@@ -0,0 +1,162 @@
+import argparse
+import sys
+import time
+from bisect import bisect_left
+
+from lexer import *
+from parser import *
+from exception import *
+from batch import expand_paths
+
+# токены, с которых начинается инструкция: на них парсер может продолжить после ошибки
+STATEMENT_KINDS = (TokenKind.VAR_KEYWORD, TokenKind.STDOUT, TokenKind.VAR_IDENTIFIER)
+
+
+class RecoveringLexer(TableLexer):
+    def __init__(self, text):
+        super().__init__(text)
+        self.diagnostics = []
+
+    def tokenize_rare(self, position, line, column, append):
+        try:
+            return super().tokenize_rare(position, line, column, append)
+        except InvalidCharacterError as e:
+            self.diagnostics.append(e)
+            return position + 1
+        except SyntaxError:
+            # у незакрытой строки нет конца, поэтому пропускается остаток строки
+            self.diagnostics.append(StringError("Unterminated String", line, column))
+            end = self.text.find("\n", position)
+            return end if end >= 0 else len(self.text)
+        except Exception:
+            # символ вроде '²' считается цифрой, но числом не разбирается
+            self.diagnostics.append(InvalidCharacterError(f"'{self.text[position]}'", line, column))
+            return position + 1
+
+
+class RecoveringParser(Parser):
+    def __init__(self, tokens):
+        self.previous_token = None
+        self.consumed = 0
+        self.diagnostics = []
+        # строки, на которых начиналась и закончилась ошибочная инструкция, для каждой ошибки
+        self.spans = []
+        super().__init__(tokens)
+
+    def advance(self):
+        self.previous_token = self.current_token
+        self.consumed += 1
+        super().advance()
+
+    def parse(self):
+        statements = []
+        while self.current_token is not None:
+            if self.current_token.type == TokenKind.NEW_LINE:
+                self.advance()
+                continue
+            start = self.consumed
+            first_line = self.current_token.line
+            try:
+                statements.append(self.parse_statement())
+                continue
+            except Error as e:
+                self.diagnostics.append(e)
+            except Exception as e:
+                # парсер упал не на своей проверке (например, токены кончились посреди инструкции)
+                token = self.current_token or self.previous_token
+                self.diagnostics.append(Error("Parsing error", f"{type(e).__name__}: {e}", token.line, token.column))
+            self.synchronize(start)
+            last_line = self.previous_token.line
+            self.spans.append((first_line, max(last_line, self.diagnostics[-1].code_line)))
+        return statements
+
+    # Пропускает остаток ошибочной инструкции: до ';' включительно или до первого токена на новой строке,
+    # с которого может начаться инструкция. Хотя бы один токен пропускается всегда, иначе разбор зациклится.
+    def synchronize(self, start):
+        while self.current_token is not None:
+            token = self.current_token
+            if self.consumed > start:
+                if token.type == TokenKind.SEMI_COLON:
+                    self.advance()
+                    return
+                if token.type in STATEMENT_KINDS and token.line > self.previous_token.line:
+                    return
+            elif token.type == TokenKind.SEMI_COLON:
+                self.advance()
+                return
+            self.advance()
+
+
+class CheckResult:
+    def __init__(self, statements, diagnostics):
+        self.statements = statements
+        self.diagnostics = diagnostics
+
+    @property
+    def ok(self):
+        return not self.diagnostics
+
+    def __repr__(self):
+        return f"CheckResult(statements={len(self.statements)}, diagnostics={len(self.diagnostics)})"
+
+
+# Разбирает текст целиком, не останавливаясь на первой ошибке: возвращает все, что удалось разобрать,
+# и список ошибок. Сначала идут ошибки лексера, потом парсера, каждые в порядке строк: в обычном конвейере
+# лексер отрабатывает до парсера, поэтому первая ошибка списка - та, на которой остановился бы run.py.
+# Ошибка парсера в инструкции, которая задевает строку с ошибкой лексера, не сообщается - обычно это
+# следствие пропущенного символа.
+def check_source(text):
+    lexer = RecoveringLexer(text)
+    tokens = lexer.tokenize()
+    parser = RecoveringParser(tokens)
+    statements = parser.parse()
+    lexer_lines = sorted({diagnostic.code_line for diagnostic in lexer.diagnostics})
+    diagnostics = list(lexer.diagnostics)
+    for diagnostic, (first_line, last_line) in zip(parser.diagnostics, parser.spans):
+        index = bisect_left(lexer_lines, first_line)
+        if index == len(lexer_lines) or lexer_lines[index] > last_line:
+            diagnostics.append(diagnostic)
+    return CheckResult(statements, diagnostics)
+
+
+def check_file(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return check_source(file.read())
+
+
+def check_paths(paths, quiet=False):
+    paths = expand_paths(paths)
+    failed = 0
+    diagnostics = 0
+    started = time.perf_counter()
+
+    for path in paths:
+        try:
+            result = check_file(path)
+        except (OSError, UnicodeDecodeError) as e:
+            failed += 1
+            print(f"{path}: {e}")
+            continue
+        if result.diagnostics:
+            failed += 1
+            diagnostics += len(result.diagnostics)
+            for diagnostic in result.diagnostics:
+                print(f"{path}: {diagnostic}")
+        elif not quiet:
+            print(f"{path}: ok")
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(paths)} files checked, {failed} with errors, {diagnostics} diagnostics in {elapsed:.3f}s")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Report all syntax errors in QuarkScript files without running them.")
+    argument_parser.add_argument("paths", nargs="+", help="files, directories or glob patterns")
+    argument_parser.add_argument("--quiet", action="store_true", help="print only files with errors")
+    arguments = argument_parser.parse_args(argv)
+    return check_paths(arguments.paths, arguments.quiet)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+from array import array
+
+from parser import *
+from cache import *
+
+
+def node_value(node):
+    if node is None or type(node) in (StdoutNode, ConcatenationNode):
+        return None
+    elif type(node) in LITERAL_TAGS:
+        return node.value
+    elif type(node) in (BinOpNode, UnaryOpNode):
+        return node.op
+    elif type(node) is VariableNode:
+        return node.name
+    elif type(node) is VariableDeclarationNode:
+        return (node.name, node.type)
+    elif type(node) is MultiValueNode:
+        return node.separator
+    elif type(node) is AssignmentNode:
+        return node.variable_name
+    raise ValueError(f"Cannot pool {type(node).__name__}")
+
+
+# Плоское дерево: тип узла, полезное значение и индексы детей лежат в массивах, узлы пронумерованы
+# в обратном польском порядке, поэтому дети всегда имеют меньшие индексы, чем родитель, и проход
+# for index in range(len(pool)) видит операнды раньше операции. Коды типов - теги из cache.py.
+# Одинаковые литералы и переменные хранятся один раз, так что пул - DAG, а не дерево.
+# Движки и проходы работают с обычным деревом: пул используется только для замеров памяти (benchmarks/memory.py),
+# перевод в него на каждом запуске стоил бы дороже, чем проход по узлам.
+class NodePool:
+    def __init__(self):
+        self.kinds = array("B")
+        self.values = []
+        # дети узла index: children[child_starts[index]:child_starts[index + 1]]
+        self.child_starts = array("I", [0])
+        self.children = array("I")
+        self.roots = array("I")
+        self.leaves = {}
+
+    @classmethod
+    def from_ast(cls, ast):
+        pool = cls()
+        for statement in ast:
+            pool.roots.append(pool.add(statement))
+        return pool
+
+    def add(self, root):
+        indices = []
+        stack = [(root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                count = len(node_children(node))
+                operands = indices[len(indices) - count:]
+                del indices[len(indices) - count:]
+                indices.append(self.append(node_fields(node)[0], node_value(node), operands))
+                continue
+            if node is None or type(node) in LITERAL_TAGS or type(node) is VariableNode:
+                indices.append(self.leaf(node))
+                continue
+            stack.append((node, True))
+            for child in reversed(node_children(node)):
+                stack.append((child, False))
+        return indices[0]
+
+    def leaf(self, node):
+        kind = node_fields(node)[0]
+        value = node_value(node)
+        # -0.0 == 0.0 и 1 == 1.0 == True: ключ по значению склеил бы разные литералы
+        key = (kind, type(value), repr(value))
+        index = self.leaves.get(key)
+        if index is None:
+            index = self.leaves[key] = self.append(kind, value, ())
+        return index
+
+    def append(self, kind, value, children):
+        self.kinds.append(kind)
+        self.values.append(value)
+        self.children.extend(children)
+        self.child_starts.append(len(self.children))
+        return len(self.kinds) - 1
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def child_indices(self, index):
+        return self.children[self.child_starts[index]:self.child_starts[index + 1]]
+
+    def indices_of(self, kind):
+        return [index for index, node_kind in enumerate(self.kinds) if node_kind == kind]
+
+    def read_names(self):
+        return {self.values[index] for index in self.indices_of(TAG_VARIABLE)}
+
+    def to_ast(self):
+        nodes = []
+        kinds = self.kinds
+        values = self.values
+        starts = self.child_starts
+        children = self.children
+        for index in range(len(kinds)):
+            kind = kinds[index]
+            value = values[index]
+            operands = [nodes[child] for child in children[starts[index]:starts[index + 1]]]
+            if kind == TAG_NONE:
+                node = None
+            elif kind == TAG_STRING:
+                node = StringNode(value)
+            elif kind == TAG_INT:
+                node = IntNumberNode(value)
+            elif kind == TAG_FLOAT:
+                node = FloatNumberNode(value)
+            elif kind == TAG_BOOLEAN:
+                node = BooleanNode(value)
+            elif kind == TAG_VARIABLE:
+                node = VariableNode(value)
+            elif kind == TAG_BINOP:
+                node = BinOpNode(value, operands[0], operands[1])
+            elif kind == TAG_UNARY:
+                node = UnaryOpNode(value, operands[0])
+            elif kind == TAG_CONCATENATION:
+                node = ConcatenationNode(operands)
+            elif kind == TAG_STDOUT:
+                node = StdoutNode(operands[0])
+            elif kind == TAG_DECLARATION:
+                node = VariableDeclarationNode(value[0], value[1], operands[0])
+            elif kind == TAG_ASSIGNMENT:
+                node = AssignmentNode(value, operands[0])
+            elif kind == TAG_MULTI_VALUE:
+                node = MultiValueNode(operands, value)
+            else:
+                raise ValueError(f"Unknown node tag: {kind}")
+            nodes.append(node)
+        return [nodes[root] for root in self.roots]
+
+    def __repr__(self):
+        return f"NodePool(nodes={len(self.kinds)}, statements={len(self.roots)})"
+
+
+def pool_ast(ast):
+    return NodePool.from_ast(ast)
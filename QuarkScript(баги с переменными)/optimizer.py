@@ -0,0 +1,257 @@
+from parser import *
+from values import *
+
+
+def literal_node(value):
+    if isinstance(value, bool):
+        return BooleanNode(value)
+    elif isinstance(value, int):
+        return IntNumberNode(value)
+    elif isinstance(value, float):
+        return FloatNumberNode(value)
+    return StringNode(value)
+
+
+def binary_operation(op, left_value, right_value, bool_operands=False):
+    if op == "PLUS":
+        if bool_operands:
+            return left_value or right_value
+        return left_value + right_value
+    elif op == "MINUS":
+        return left_value - right_value
+    elif op == "DIVIDE":
+        if right_value != 0:
+            return left_value / right_value
+        raise ZeroDivisionError("Division by zero")
+    elif op == "MULTIPLY":
+        return left_value * right_value
+    raise Exception(f"Unknown binary operator: {op}")
+
+
+def read_names(node, names):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, VariableNode):
+            names.add(node.name)
+        else:
+            stack.extend(node_children(node))
+    return names
+
+
+# шаги Optimizer.fold
+FOLD_NODE = 0
+FOLD_BINOP = 1
+FOLD_UNARY = 2
+FOLD_PIECE = 3
+FOLD_CONCATENATION = 4
+
+
+# Свертка выполняется только если вычисление на этапе оптимизации прошло без ошибок:
+# деление на ноль и прочие ошибки остаются в дереве и возникают во время исполнения, как раньше.
+class Optimizer:
+    def __init__(self, report=False):
+        self.report = report
+        self.messages = []
+        self.constants = {}
+        self.static_types = {}
+        self.propagatable = set()
+        self.single_declarations = set()
+
+    def note(self, message):
+        if self.report:
+            self.messages.append(message)
+
+    def optimize(self, ast):
+        declarations = {}
+        assigned = set()
+        for node in ast:
+            if isinstance(node, VariableDeclarationNode):
+                declarations[node.name] = declarations.get(node.name, 0) + 1
+            elif isinstance(node, AssignmentNode):
+                assigned.add(node.variable_name)
+        self.propagatable = {name for name, count in declarations.items() if count == 1 and name not in assigned}
+        self.single_declarations = {name for name, count in declarations.items() if count == 1}
+
+        statements = [self.fold_statement(node) for node in ast]
+        return self.eliminate_dead_stores(statements)
+
+    def fold_statement(self, node):
+        if isinstance(node, StdoutNode):
+            return self.fold_stdout(node)
+        elif isinstance(node, VariableDeclarationNode):
+            value = self.fold(node.value)
+            if node.name in self.single_declarations:
+                if isinstance(value, LITERAL_NODES):
+                    var_type = node.type or infer_type_from_value(value.value)
+                    if node.name in self.propagatable:
+                        self.constants[node.name] = (value.value, var_type)
+                else:
+                    var_type = node.type
+                self.static_types[node.name] = var_type
+            return VariableDeclarationNode(node.name, node.type, value)
+        elif isinstance(node, AssignmentNode):
+            return AssignmentNode(node.variable_name, self.fold(node.expression))
+        return self.fold(node)
+
+    def fold_stdout(self, node):
+        expression = node.expression
+        if expression is None or isinstance(expression, FloatNumberNode):
+            return node
+
+        if isinstance(expression, MultiValueNode):
+            values = [self.fold(value) for value in expression.values]
+            if all(isinstance(value, LITERAL_NODES) for value in values):
+                output = expression.separator.join(str(value.value) for value in values)
+                self.note(f"folded MultiValueNode -> \"{output}\"")
+                return StdoutNode(StringNode(output))
+            return StdoutNode(MultiValueNode(values, expression.separator))
+
+        # stdout печатает str(значения), поэтому свернутая константа превращается в строку
+        expression = self.fold(expression)
+        if isinstance(expression, LITERAL_NODES) and not isinstance(expression, StringNode):
+            expression = StringNode(str(expression.value))
+        return StdoutNode(expression)
+
+    # Свертка идет в обратном порядке на явном стеке: дети раньше родителя и в том же порядке,
+    # что при рекурсивном спуске, поэтому и дерево, и отчет не меняются, а глубина не ограничена.
+    # Части цепочки конкатенации разбираются по одной сразу после свертки, как в цикле рекурсивной версии.
+    def fold(self, node):
+        folded = []
+        stack = [(FOLD_NODE, node, None)]
+        while stack:
+            step, node, pieces = stack.pop()
+            if step == FOLD_BINOP:
+                right = folded.pop()
+                folded[-1] = self.fold_binop(node, folded[-1], right)
+            elif step == FOLD_UNARY:
+                folded[-1] = self.fold_unary(node, folded[-1])
+            elif step == FOLD_PIECE:
+                self.add_piece(pieces, folded.pop())
+            elif step == FOLD_CONCATENATION:
+                folded.append(self.fold_concatenation(pieces))
+            elif isinstance(node, VariableNode):
+                if node.name in self.constants:
+                    value = self.constants[node.name][0]
+                    self.note(f"propagated constant {node.name} = {value!r}")
+                    node = literal_node(value)
+                folded.append(node)
+            elif isinstance(node, BinOpNode):
+                # у 'bool + bool' особая семантика, которая зависит от того, что оба операнда переменные
+                if node.op == "PLUS" and isinstance(node.left, VariableNode) and isinstance(node.right, VariableNode):
+                    folded.append(self.fold_variable_sum(node))
+                    continue
+                stack.append((FOLD_BINOP, node, None))
+                stack.append((FOLD_NODE, node.right, None))
+                stack.append((FOLD_NODE, node.left, None))
+            elif isinstance(node, UnaryOpNode):
+                stack.append((FOLD_UNARY, node, None))
+                stack.append((FOLD_NODE, node.node, None))
+            elif isinstance(node, ConcatenationNode):
+                pieces = ([], [])
+                stack.append((FOLD_CONCATENATION, node, pieces))
+                for value in reversed(node.values):
+                    stack.append((FOLD_PIECE, node, pieces))
+                    stack.append((FOLD_NODE, value, None))
+            else:
+                folded.append(node)
+        return folded[0]
+
+    def fold_unary(self, node, operand):
+        if isinstance(operand, LITERAL_NODES) and node.op == "MINUS":
+            try:
+                value = -operand.value
+            except Exception:
+                return UnaryOpNode(node.op, operand)
+            self.note(f"folded UnaryOpNode(MINUS) -> {value!r}")
+            return literal_node(value)
+        return UnaryOpNode(node.op, operand)
+
+    def fold_variable_sum(self, node):
+        if node.left.name not in self.constants or node.right.name not in self.constants:
+            return node
+        left_value, left_type = self.constants[node.left.name]
+        right_value, right_type = self.constants[node.right.name]
+        bool_operands = left_type == "TYPE_BOOL" and right_type == "TYPE_BOOL"
+        try:
+            value = binary_operation(node.op, left_value, right_value, bool_operands)
+        except Exception:
+            return node
+        self.note(f"folded BinOpNode({node.op}) {node.left.name}, {node.right.name} -> {value!r}")
+        return literal_node(value)
+
+    def fold_binop(self, node, left, right):
+        if isinstance(left, LITERAL_NODES) and isinstance(right, LITERAL_NODES):
+            try:
+                value = binary_operation(node.op, left.value, right.value)
+            except Exception:
+                return BinOpNode(node.op, left, right)
+            self.note(f"folded BinOpNode({node.op}) {left.value!r}, {right.value!r} -> {value!r}")
+            return literal_node(value)
+        return BinOpNode(node.op, left, right)
+
+    # Соседние константы в цепочке склеиваются в одну строку, остальные части остаются на своих местах.
+    # pieces - пара (готовые части, константы подряд перед следующей частью).
+    def add_piece(self, pieces, value):
+        values, literals = pieces
+        if isinstance(value, LITERAL_NODES):
+            literals.append(value)
+            return
+        self.append_literals(values, literals)
+        literals.clear()
+        values.append(value)
+
+    def fold_concatenation(self, pieces):
+        values, literals = pieces
+        if not values:
+            value = "".join([str(literal.value) for literal in literals])
+            self.note(f"folded ConcatenationNode -> \"{value}\"")
+            return StringNode(value)
+        self.append_literals(values, literals)
+        return ConcatenationNode(values)
+
+    def append_literals(self, values, literals):
+        if len(literals) == 1:
+            values.append(literals[0])
+        elif literals:
+            value = "".join([str(literal.value) for literal in literals])
+            self.note(f"folded ConcatenationNode pieces -> \"{value}\"")
+            values.append(StringNode(value))
+
+    # Присваивание удаляется, только если его значение перезаписывается раньше чтения
+    # и само оно гарантированно не падает: константа подходящего типа в уже объявленную переменную.
+    def eliminate_dead_stores(self, statements):
+        next_access = {}
+        declared_before = set()
+        removable = set()
+        for index, node in enumerate(statements):
+            if isinstance(node, AssignmentNode):
+                name = node.variable_name
+                var_type = self.static_types.get(name)
+                if (name in declared_before and isinstance(node.expression, LITERAL_NODES)
+                        and value_matches_type(node.expression.value, var_type)):
+                    removable.add(index)
+            elif isinstance(node, VariableDeclarationNode):
+                declared_before.add(node.name)
+
+        kept = []
+        for index in range(len(statements) - 1, -1, -1):
+            node = statements[index]
+            if isinstance(node, AssignmentNode):
+                name = node.variable_name
+                if index in removable and next_access.get(name) == "write":
+                    self.note(f"removed dead store {name} = {node.expression.value!r}")
+                    continue
+                next_access[name] = "write"
+            elif isinstance(node, VariableDeclarationNode):
+                next_access[node.name] = "declare"
+            for name in read_names(node, set()):
+                next_access[name] = "read"
+            kept.append(node)
+        kept.reverse()
+        return kept
+
+
+# отчет о свертках печатает вызывающая сторона: Optimizer(report=True).messages
+def optimize(ast):
+    return Optimizer().optimize(ast)
@@ -0,0 +1,143 @@
+import argparse
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import *
+
+MIN_CHUNK_SIZE = 1 << 16
+CHUNKS_PER_WORKER = 4
+
+
+class ChunkResult:
+    def __init__(self, kinds, lines, columns, values, end_line, error=None):
+        self.kinds = kinds
+        self.lines = lines
+        self.columns = columns
+        self.values = values
+        self.end_line = end_line
+        self.error = error
+
+    def __repr__(self):
+        return f"ChunkResult(tokens={len(self.values)}, end_line={self.end_line}, error={self.error!r})"
+
+
+def split_source(content, chunks):
+    boundaries = [0]
+    step = max(len(content) // chunks, 1)
+    for index in range(1, chunks):
+        newline = content.find("\n", max(index * step, boundaries[-1]))
+        if newline < 0:
+            break
+        if newline + 1 < len(content):
+            boundaries.append(newline + 1)
+    boundaries.append(len(content))
+    return boundaries
+
+
+# В процесс уходит только кусок текста, назад - массивы как у TokenBuffer, без объектов Token.
+def lex_chunk(chunk, line):
+    lexer = TableLexer(chunk)
+    lexer.line = line
+    try:
+        buffer = TokenBuffer.from_tokens(lexer.tokenize())
+    except (Error, Exception) as e:
+        return ChunkResult(b"", b"", b"", [], line, repr(e))
+    return ChunkResult(buffer.kinds.tobytes(), buffer.lines.tobytes(), buffer.columns.tobytes(),
+                       buffer.values, lexer.line)
+
+
+def lex_serial_from(content, position, line):
+    lexer = TableLexer(content)
+    lexer.position = position
+    lexer.line = line
+    return lexer.tokenize()
+
+
+def run_parallel(content, workers=None, min_chunk_size=MIN_CHUNK_SIZE, executor=None):
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers * CHUNKS_PER_WORKER, max(len(content) // min_chunk_size, 1))
+    if chunks == 1:
+        return TokenBuffer.from_tokens(run(content))
+
+    boundaries = split_source(content, chunks)
+    starts = boundaries[:-1]
+    # номер строки угадывается по числу переводов строки; неверен он только если перевод был внутри строкового литерала
+    guessed_lines = []
+    line = 1
+    previous = 0
+    for start in starts:
+        line += content.count("\n", previous, start)
+        guessed_lines.append(line)
+        previous = start
+    pieces = [content[start:end] for start, end in zip(starts, boundaries[1:])]
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lex_chunk, pieces, guessed_lines))
+    else:
+        results = list(executor.map(lex_chunk, pieces, guessed_lines))
+
+    buffer = TokenBuffer()
+    line = 1
+    for start, guessed_line, result in zip(starts, guessed_lines, results):
+        if result.error is not None:
+            # кусок начался или закончился внутри строкового литерала, либо в нем настоящая ошибка:
+            # дальше лексируем последовательно, ошибка будет той же, что и у обычного лексера
+            buffer.extend(lex_serial_from(content, start, line))
+            return buffer
+        lines = array("I")
+        lines.frombytes(result.lines)
+        shift = line - guessed_line
+        if shift:
+            lines = array("I", [token_line + shift for token_line in lines])
+        buffer.kinds.frombytes(result.kinds)
+        buffer.lines.extend(lines)
+        buffer.columns.frombytes(result.columns)
+        buffer.values.extend(result.values)
+        line = result.end_line + shift
+    return buffer
+
+
+def benchmark(path=None, size=8, repeat=3, max_workers=None):
+    if path is None:
+        from benchmarks.generator import generate_program
+        content = generate_program("mixed", statements=size * 2000)
+    else:
+        with open(path, "r", encoding="utf-8") as file:
+            content = file.read()
+
+    started = time.perf_counter()
+    expected = TokenBuffer.from_tokens(run(content))
+    serial = time.perf_counter() - started
+    print(f"{len(content)} characters, {len(expected)} tokens")
+    print(f"serial      {serial * 1000:>10.1f} ms")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    workers = 1
+    while workers <= max_workers:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # пул создается заранее, чтобы в замер не попал запуск процессов
+            list(pool.map(abs, range(workers)))
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                tokens = run_parallel(content, workers, executor=pool)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+        if (tokens.kinds, tokens.lines, tokens.columns, tokens.values) != \
+                (expected.kinds, expected.lines, expected.columns, expected.values):
+            raise AssertionError(f"Parallel lexing with {workers} workers differs from serial lexing")
+        print(f"{workers:>2} workers  {best * 1000:>10.1f} ms  x{serial / best:.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Measure parallel lexing against the serial lexer.")
+    argument_parser.add_argument("path", nargs="?", default=None, help="a .qs file, a generated program by default")
+    argument_parser.add_argument("--size", type=int, default=8, help="size of the generated program")
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--max-workers", type=int, default=None, help="number of cores by default")
+    arguments = argument_parser.parse_args()
+    benchmark(arguments.path, arguments.size, arguments.repeat, arguments.max_workers)
@@ -1,11 +1,23 @@
-from colorama import Fore, init
+from colors import Fore
 from exception import *
-init()
+from lexer import TokenKind
+
+TYPE_KINDS = (TokenKind.TYPE_INT, TokenKind.TYPE_FLOAT, TokenKind.TYPE_STRING, TokenKind.TYPE_BOOL)
+ADDITIVE_KINDS = (TokenKind.PLUS, TokenKind.MINUS)
+MULTIPLICATIVE_KINDS = (TokenKind.MULTIPLY, TokenKind.DIVIDE)
+FACTOR_KINDS = (TokenKind.INTEGER, TokenKind.FLOAT, TokenKind.LEFT_PAREN, TokenKind.STRING,
+                TokenKind.VAR_IDENTIFIER, TokenKind.FALSE, TokenKind.TRUE, TokenKind.MINUS)
+# уровни приоритета бинарных операторов, от слабого к сильному
+PRECEDENCE_LEVELS = (ADDITIVE_KINDS, MULTIPLICATIVE_KINDS)
+# вложенность скобок и унарных минусов, до которой выражения разбираются и вычисляются прямой рекурсией;
+# глубже работает обход с явным стеком, он не упирается в предел рекурсии, но медленнее на мелких выражениях
+RECURSION_BUDGET = 64
 
 class Parser:
     def __init__(self, tokens):
         self.tokens = iter(tokens)
         self.current_token = None
+        self.shared_nodes = {}
         self.advance()
 
     def advance(self):
@@ -14,121 +26,128 @@ class Parser:
         except StopIteration:
             self.current_token = None
 
+    # Литералы и ссылки на переменные не изменяются после разбора, поэтому одинаковые узлы
+    # создаются один раз на весь разбор. Класс входит в ключ: 1, 1.0 и True равны как ключи словаря.
+    def shared_node(self, node_class, value):
+        key = (node_class, value)
+        node = self.shared_nodes.get(key)
+        if node is None:
+            node = self.shared_nodes[key] = node_class(value)
+        return node
+
     def parse(self):
         statements = []
         while self.current_token is not None:
-            if self.current_token.type == "NEW_LINE":
+            if self.current_token.type == TokenKind.NEW_LINE:
                 self.advance()
                 continue
             statements.append(self.parse_statement())
         return statements
 
+    # Позиция первого токена читается только при ошибке: у SourceToken это поиск по индексу строк.
     def parse_statement(self):
-        current_token_line = self.current_token.line
-        current_token_column = self.current_token.column
-        if self.current_token is None:
+        start_token = self.current_token
+        if start_token is None:
             return None
 
-        if self.current_token.type == 'STDOUT':
+        if self.current_token.type == TokenKind.STDOUT:
             statement = self.parse_stdout()
-        elif self.current_token.type == "VAR_KEYWORD":
+        elif self.current_token.type == TokenKind.VAR_KEYWORD:
             statement = self.parse_var_declaration()
 
-        elif self.current_token.type == "VAR_IDENTIFIER":
+        elif self.current_token.type == TokenKind.VAR_IDENTIFIER:
             variable_name = self.current_token.value
             self.advance()
-            if self.current_token is not None and self.current_token.type == "ASSIGN":
+            if self.current_token is not None and self.current_token.type == TokenKind.ASSIGN:
                 self.advance()
                 expression = self.parse_expression()
-                if self.current_token is not None and self.current_token.type == "SEMI_COLON":
+                if self.current_token is not None and self.current_token.type == TokenKind.SEMI_COLON:
                     self.advance()
                 return AssignmentNode(variable_name, expression)
             else:
-                return VariableNode(variable_name)
+                return self.shared_node(VariableNode, variable_name)
         else:
             statement = self.parse_expression()
 
 
 
-        if self.current_token is None or self.current_token.type != "SEMI_COLON":
+        if self.current_token is None or self.current_token.type != TokenKind.SEMI_COLON:
             raise Error("Statement Syntax Error",
                         "Excepted ';' at the end of statement",
-                        current_token_line, current_token_column)
+                        start_token.line, start_token.column)
         self.advance()
         return statement
 
     def parse_var_declaration(self):
-        current_token_line = self.current_token.line # запоминаем данные токена пока токен не None
-        current_token_column = self.current_token.column
+        start_token = self.current_token # запоминаем токен, пока он не None
         self.advance() # пропускаем ключевое слово "var" и идем к идентификатору
 
-        if self.current_token is None or self.current_token.type != "VAR_IDENTIFIER": # если после слова "var" не идентификатор, выбрасываем ошибку
+        if self.current_token is None or self.current_token.type != TokenKind.VAR_IDENTIFIER: # если после слова "var" не идентификатор, выбрасываем ошибку
                 raise Error(
                     "Invalid Syntax",
                     "Excepted variable name after keyword var.",
-                    current_token_line, current_token_column)
+                    start_token.line, start_token.column)
 
         var_name = self.current_token.value # записываем идентификатор переменной
         self.advance() # после записи продвигаемся на следующий токен, ожидается что этот токен будет: или:=
         var_type = None
 
 
-        if self.current_token.type == "COLON":
+        if self.current_token.type == TokenKind.COLON:
             self.advance()
 
-            if self.current_token is None or self.current_token.type not in ("TYPE_INT", "TYPE_FLOAT", "TYPE_STRING", "TYPE_BOOL"):
+            if self.current_token is None or self.current_token.type not in TYPE_KINDS:
                 raise Error("Invalid Variable Declaration",
                             "Excepted type after ':'",
-                            current_token_line, current_token_column
+                            start_token.line, start_token.column
                         )
 
-            var_type = self.current_token.type
+            var_type = self.current_token.type.name
             self.advance()
 
-            if self.current_token.type != "ASSIGN":
+            if self.current_token.type != TokenKind.ASSIGN:
                 raise Error("Invalid Syntax",
                             "Excepted '=' after type declaration",
-                            current_token_line, current_token_column
+                            start_token.line, start_token.column
                         )
             self.advance()
 
-        elif self.current_token.type == "DYNAMIC_ASSIGN":
+        elif self.current_token.type == TokenKind.DYNAMIC_ASSIGN:
             self.advance()
-        elif self.current_token.type == "ASSIGN":
+        elif self.current_token.type == TokenKind.ASSIGN:
             raise Error("Invalid Syntax",
                         "You can't use '=' to declare a variable. Use ':=' or ': type ='",
-                        current_token_line, current_token_column)
+                        start_token.line, start_token.column)
         else:
             raise Error("Invalid Syntax",
                         "Expected ':='  after variable id",
-                        current_token_line, current_token_column)
+                        start_token.line, start_token.column)
 
         value = self.parse_expression()
 
-        if self.current_token is not None and self.current_token.type != "SEMI_COLON":
+        if self.current_token is not None and self.current_token.type != TokenKind.SEMI_COLON:
             raise Error("Invalid Syntax",
                         "Expected ';' after variable declaration",
-                        current_token_line, current_token_column)
+                        start_token.line, start_token.column)
 
         return VariableDeclarationNode(var_name, var_type, value)
 
     def parse_stdout(self):
-        current_token_line = self.current_token.line
-        current_token_column = self.current_token.column
+        start_token = self.current_token
         self.advance()
-        if self.current_token.type == "SEMI_COLON":
+        if self.current_token.type == TokenKind.SEMI_COLON:
             return StdoutNode(None)
 
-        elif self.current_token.type == "VAR_KEYWORD":
+        elif self.current_token.type == TokenKind.VAR_KEYWORD:
             raise Error("SyntaxError",
                         "an attempt to declare a variable inside 'stdout'",
-                        current_token_line,
-                        current_token_column)
+                        start_token.line,
+                        start_token.column)
         first_value = self.parse_expression()
 
-        if self.current_token is not None and self.current_token.type == "COMMA":
+        if self.current_token is not None and self.current_token.type == TokenKind.COMMA:
             values = [first_value]
-            while self.current_token is not None and self.current_token.type == "COMMA":
+            while self.current_token is not None and self.current_token.type == TokenKind.COMMA:
                 self.advance()
                 values.append(self.parse_expression())
 
@@ -136,201 +155,391 @@ class Parser:
         else:
             return StdoutNode(first_value)
 
-    def parse_expression(self):
-        left = self.parse_term()
+    # depth - число открытых скобок и унарных минусов над текущим выражением. Пока оно меньше
+    # RECURSION_BUDGET, разбор идет обычным спуском, глубже - parse_expression_iterative.
+    def parse_expression(self, depth=0):
+        if depth >= RECURSION_BUDGET:
+            return self.parse_expression_iterative()
+        left = self.parse_term(depth)
 
-        while self.current_token is not None and self.current_token.type in ("PLUS", "MINUS"):
+        while self.current_token is not None and self.current_token.type in ADDITIVE_KINDS:
             op = self.current_token
             self.advance()
-            right = self.parse_term()
+            right = self.parse_term(depth)
             # левое | правое
             if (isinstance(left, StringNode) or isinstance(right, StringNode) or
                     isinstance(left, ConcatenationNode) or isinstance(right, ConcatenationNode)):
-                left = ConcatenationNode(left, right)
+                left = concatenation(left, right)
             else:
-                left = BinOpNode(op.type, left, right)
+                left = BinOpNode(op.type.name, left, right)
 
         return left
 
-    def parse_term(self):
-        left = self.parse_factor()
+    def parse_term(self, depth):
+        left = self.parse_factor(depth)
 
-        while self.current_token is not None and self.current_token.type in ('MULTIPLY', 'DIVIDE'):
+        while self.current_token is not None and self.current_token.type in MULTIPLICATIVE_KINDS:
             op = self.current_token
             self.advance()
 
+            if self.current_token is None or self.current_token.type not in FACTOR_KINDS:
+                raise Error("SyntaxError", "Expected factor after operator", op.line, op.column)
 
-            if self.current_token is None or (self.current_token.type not in (
-            "INTEGER", "FLOAT", "LEFT_PAREN", "STRING", "VAR_IDENTIFIER", "FALSE", "TRUE") and self.current_token.type != "MINUS"):
-                line = op.line
-                column = op.column
-                raise Error("SyntaxError", "Expected factor after operator", line, column)
-
-            if self.current_token is not None and self.current_token.type == "MINUS":
-                unary_op = self.current_token.type
+            if self.current_token.type == TokenKind.MINUS:
+                unary_op = self.current_token.type.name
                 self.advance()
-                right = UnaryOpNode(unary_op, self.parse_factor())
+                right = UnaryOpNode(unary_op, self.parse_factor(depth + 1))
             else:
-                right = self.parse_factor()
+                right = self.parse_factor(depth)
 
             if isinstance(left, StringNode) or isinstance(right, StringNode):
-                line = op.line
-                column = op.column
                 raise Error("TypeError",
                             f"Multiplication or division of a string is not allowed: {left.__class__.__name__}[{left.value}] {op.value} {right.__class__.__name__}[\"{right.value}\"]",
-                            line, column)
+                            op.line, op.column)
 
-            left = BinOpNode(op.type, left, right)
+            left = BinOpNode(op.type.name, left, right)
 
         return left
 
-    def parse_factor(self):
-        if self.current_token is None:
-            line = self.current_token.line if self.current_token else 1
-            column = self.current_token.column if self.current_token else 1
-            raise Error("Parsing error", "Expected factor, but got end of input", line, column)
+    def parse_factor(self, depth):
+        if depth >= RECURSION_BUDGET:
+            return self.parse_expression_iterative(len(PRECEDENCE_LEVELS))
+        token = self.current_token
+        if token is None:
+            raise Error("Parsing error", "Expected factor, but got end of input", 1, 1)
 
-        if self.current_token.type == "MINUS":
-            op = self.current_token.type
+        kind = token.type
+        if kind == TokenKind.MINUS:
             self.advance()
-            node = self.parse_factor()
-            return UnaryOpNode(op, node)
-
-        if self.current_token.type == "INTEGER":
-            node = IntNumberNode(self.current_token.value)
-            self.advance()
-            return node
-
-        elif self.current_token.type == "FLOAT":
-            node = FloatNumberNode(self.current_token.value)
+            return UnaryOpNode(kind.name, self.parse_factor(depth + 1))
+        elif kind == TokenKind.INTEGER:
+            node = self.shared_node(IntNumberNode, token.value)
+        elif kind == TokenKind.FLOAT:
+            node = self.shared_node(FloatNumberNode, token.value)
+        elif kind == TokenKind.TRUE:
+            node = self.shared_node(BooleanNode, True)
+        elif kind == TokenKind.FALSE:
+            node = self.shared_node(BooleanNode, False)
+        elif kind == TokenKind.STRING:
+            node = self.shared_node(StringNode, token.value)
+        elif kind == TokenKind.VAR_IDENTIFIER:
+            node = self.shared_node(VariableNode, token.value)
+        elif kind == TokenKind.LEFT_PAREN:
             self.advance()
-            return node
-        elif self.current_token.type == "TRUE":
-            node = BooleanNode(True)
+            node = self.parse_expression(depth + 1)
+            if self.current_token is None or self.current_token.type != TokenKind.RIGHT_PAREN:
+                raise Error("Parsing error", "Expected ')'", token.line, token.column)
+        elif kind == TokenKind.RIGHT_PAREN:
+            raise Error("Parsing error", "Expected '('", token.line, token.column)
+        elif kind == TokenKind.NEW_LINE:
             self.advance()
-            return node
-        elif self.current_token.type == "FALSE":
-            node = BooleanNode(False)
-            self.advance()
-            return node
-        elif self.current_token.type == "STRING":
-            node = StringNode(self.current_token.value)
-            self.advance()
-            return node
-        elif self.current_token.type == "VAR_IDENTIFIER":
-            node = VariableNode(self.current_token.value)
-            self.advance()
-            return node
+            return self.parse_statement()
+        elif kind == TokenKind.SEMI_COLON or kind == TokenKind.VAR_KEYWORD:
+            node = None
+        else:
+            raise Error("Parsing error", f"Unexpected token: {kind.name}", token.line, token.column)
+        self.advance()
+        return node
+
+    # Тот же разбор без рекурсии: вместо вызовов parse_expression -> parse_term -> parse_factor
+    # на явном стеке лежат рамки уровней приоритета, открытые скобки и унарные минусы.
+    # Порядок чтения токенов и проверок тот же, поэтому деревья и позиции ошибок не меняются.
+    # descend = len(PRECEDENCE_LEVELS) разбирает один множитель, как parse_factor.
+    def parse_expression_iterative(self, descend=0):
+        stack = []
+        while True:
+            if descend is not None:
+                for level in range(descend, len(PRECEDENCE_LEVELS)):
+                    stack.append(BinaryFrame(level))
+                descend = None
+                token = self.current_token
+                if token is None:
+                    raise Error("Parsing error", "Expected factor, but got end of input", 1, 1)
+
+                kind = token.type
+                if kind == TokenKind.MINUS:
+                    self.advance()
+                    stack.append(UnaryFrame(kind.name))
+                    descend = len(PRECEDENCE_LEVELS)
+                    continue
+                elif kind == TokenKind.LEFT_PAREN:
+                    self.advance()
+                    stack.append(ParenFrame(token))
+                    descend = 0
+                    continue
+                elif kind == TokenKind.INTEGER:
+                    value = self.shared_node(IntNumberNode, token.value)
+                    self.advance()
+                elif kind == TokenKind.FLOAT:
+                    value = self.shared_node(FloatNumberNode, token.value)
+                    self.advance()
+                elif kind == TokenKind.TRUE:
+                    value = self.shared_node(BooleanNode, True)
+                    self.advance()
+                elif kind == TokenKind.FALSE:
+                    value = self.shared_node(BooleanNode, False)
+                    self.advance()
+                elif kind == TokenKind.STRING:
+                    value = self.shared_node(StringNode, token.value)
+                    self.advance()
+                elif kind == TokenKind.VAR_IDENTIFIER:
+                    value = self.shared_node(VariableNode, token.value)
+                    self.advance()
+                elif kind == TokenKind.RIGHT_PAREN:
+                    raise Error("Parsing error", "Expected '('", token.line, token.column)
+                elif kind == TokenKind.NEW_LINE:
+                    self.advance()
+                    value = self.parse_statement()
+                elif kind == TokenKind.SEMI_COLON or kind == TokenKind.VAR_KEYWORD:
+                    self.advance()
+                    value = None
+                else:
+                    raise Error("Parsing error", f"Unexpected token: {kind.name}", token.line, token.column)
 
-        elif self.current_token.type == "LEFT_PAREN":
-            left_paren_line = self.current_token.line
-            left_paren_column = self.current_token.column
-            self.advance()
-            node = self.parse_expression()
-            if self.current_token is None or self.current_token.type != "RIGHT_PAREN":
+            if not stack:
+                return value
+            frame = stack[-1]
 
-                raise Error("Parsing error", "Expected ')'", left_paren_line, left_paren_column)
-            self.advance()
-            return node
-        elif self.current_token.type == "RIGHT_PAREN":
-            line = self.current_token.line
-            column = self.current_token.column
-            raise Error("Parsing error", "Expected '('", line, column)
+            if type(frame) is UnaryFrame:
+                stack.pop()
+                value = UnaryOpNode(frame.op, value)
+                continue
+            if type(frame) is ParenFrame:
+                if self.current_token is None or self.current_token.type != TokenKind.RIGHT_PAREN:
+                    raise Error("Parsing error", "Expected ')'", frame.token.line, frame.token.column)
+                self.advance()
+                stack.pop()
+                continue
 
-        elif self.current_token.type == 'NEW_LINE':
-            self.advance()
-            return self.parse_statement()
-        elif self.current_token.type == "SEMI_COLON":
-            self.advance()
-        elif self.current_token.type == "VAR_KEYWORD":
+            if frame.op is None:
+                frame.left = value
+            elif frame.level == 0:
+                left = frame.left
+                # левое | правое
+                if (isinstance(left, StringNode) or isinstance(value, StringNode) or
+                        isinstance(left, ConcatenationNode) or isinstance(value, ConcatenationNode)):
+                    frame.left = concatenation(left, value)
+                else:
+                    frame.left = BinOpNode(frame.op.type.name, left, value)
+            else:
+                left = frame.left
+                op = frame.op
+                if isinstance(left, StringNode) or isinstance(value, StringNode):
+                    raise Error("TypeError",
+                                f"Multiplication or division of a string is not allowed: {left.__class__.__name__}[{left.value}] {op.value} {value.__class__.__name__}[\"{value.value}\"]",
+                                op.line, op.column)
+                frame.left = BinOpNode(op.type.name, left, value)
+
+            token = self.current_token
+            if token is None or token.type not in PRECEDENCE_LEVELS[frame.level]:
+                stack.pop()
+                value = frame.left
+                continue
+
+            frame.op = token
             self.advance()
+            descend = frame.level + 1
+            if frame.level == 1:
+                if self.current_token is None or self.current_token.type not in FACTOR_KINDS:
+                    raise Error("SyntaxError", "Expected factor after operator", token.line, token.column)
+                if self.current_token.type == TokenKind.MINUS:
+                    stack.append(UnaryFrame(self.current_token.type.name))
+                    self.advance()
 
-        else:
-            line = self.current_token.line if self.current_token else 1
-            column = self.current_token.column if self.current_token else 1
-            raise Error("Parsing error", f"Unexpected token: {self.current_token.type}", line, column)
+
+class BinaryFrame:
+    __slots__ = ("level", "left", "op")
+
+    def __init__(self, level):
+        self.level = level
+        self.left = None
+        self.op = None
 
 
+class UnaryFrame:
+    __slots__ = ("op",)
 
+    def __init__(self, op):
+        self.op = op
+
+
+class ParenFrame:
+    __slots__ = ("token",)
+
+    def __init__(self, token):
+        self.token = token
+
+
+# Узлы без __dict__: в больших программах их миллионы. resolved_type, needs_check и bool_plus
+# проставляет typechecker, поэтому для них тоже заведены слоты.
 class ASTNode:
-    pass
+    __slots__ = ("resolved_type",)
+
+    def __repr__(self):
+        return node_repr(self)
+
+
+# Узлы с детьми описывают свой текст в repr_parts: строки - готовые куски, остальное - дочерние узлы,
+# списки узлов или None. node_repr раскрывает детей на явном стеке, поэтому дамп дерева любой глубины
+# не упирается в предел рекурсии, а текст тот же, что давали вложенные f-строки.
+def node_repr(node):
+    pieces = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            pieces.append(item)
+        elif type(item) is list:
+            parts = ["["]
+            for index, value in enumerate(item):
+                if index:
+                    parts.append(", ")
+                parts.append(value)
+            parts.append("]")
+            stack.extend(reversed(parts))
+        elif hasattr(item, "repr_parts"):
+            stack.extend(reversed(item.repr_parts()))
+        else:
+            pieces.append(repr(item))
+    return "".join(pieces)
 
 class StdoutNode(ASTNode):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
-    def __repr__(self):
-        return f"StdoutNode(expression={self.expression})"
+    def repr_parts(self):
+        return ("StdoutNode(expression=", self.expression, ")")
 
 class StringNode(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
         return f"StringNode(value={Fore.YELLOW}\"{self.value}\"{Fore.RESET})"
 
 class IntNumberNode(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
         return f"IntNumberNode(value={Fore.BLUE}{self.value}{Fore.RESET})"
 
 class FloatNumberNode(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
         return f"FloatNumberNode(value={Fore.BLUE}{self.value}{Fore.RESET})"
 class BinOpNode(ASTNode):
+    __slots__ = ("op", "left", "right", "bool_plus")
+
     def __init__(self, op, left, right):
         self.op = op
         self.left = left
         self.right = right
-    def __repr__(self):
-        return f"BinOpNode(op='{Fore.MAGENTA}{self.op}{Fore.RESET}', left={self.left}, right={self.right})"
+    def repr_parts(self):
+        return (f"BinOpNode(op='{Fore.MAGENTA}{self.op}{Fore.RESET}', left=", self.left, ", right=", self.right, ")")
 class UnaryOpNode(ASTNode):
+    __slots__ = ("op", "node")
+
     def __init__(self, op, node):
         self.op = op
         self.node = node
-    def __repr__(self):
-        return f"UnaryOpNode(op='{Fore.MAGENTA}{self.op}{Fore.RESET}', node={self.node})"
+    def repr_parts(self):
+        return (f"UnaryOpNode(op='{Fore.MAGENTA}{self.op}{Fore.RESET}', node=", self.node, ")")
 
+# Цепочка a + "x" + b хранится одним узлом со списком частей и вычисляется одним join, как MultiValueNode.
 class ConcatenationNode(ASTNode):
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
+    __slots__ = ("values",)
+    separator = ""
 
-    def __repr__(self):
-        return f"ConcatenationNode(left={self.left}, right={self.right})"
+    def __init__(self, values):
+        self.values = values
+
+    def repr_parts(self):
+        return ("ConcatenationNode(values=", self.values, ")")
+
+
+def concatenation(left, right):
+    # str(str(a) + str(b)) == str(a) + str(b), поэтому вложенные цепочки, в том числе в скобках, сливаются в одну.
+    # Левая цепочка только что построена парсером и дополняется на месте.
+    if isinstance(left, ConcatenationNode):
+        values = left.values
+    else:
+        values = [left]
+        left = ConcatenationNode(values)
+    if isinstance(right, ConcatenationNode):
+        values.extend(right.values)
+    else:
+        values.append(right)
+    return left
 
 class VariableNode(ASTNode):
+    __slots__ = ("name",)
+
     def __init__(self, name):
         self.name = name
     def __repr__(self):
         return f"VariableNode(name={Fore.CYAN}{self.name}{Fore.RESET})"
 
 class VariableDeclarationNode(ASTNode):
+    __slots__ = ("name", "type", "value", "needs_check")
+
     def __init__(self, variable_name, variable_type, variable_value):
         self.name = variable_name
         self.type = variable_type
         self.value = variable_value
-    def __repr__(self):
-        return f"VariableDeclarationNode(variable_name={Fore.RED}\"{self.name}\"{Fore.RESET}, type={Fore.RED}{self.type}{Fore.RESET}, value={self.value})"
+    def repr_parts(self):
+        return (f"VariableDeclarationNode(variable_name={Fore.RED}\"{self.name}\"{Fore.RESET}, type={Fore.RED}{self.type}{Fore.RESET}, value=",
+                self.value, ")")
 class MultiValueNode(ASTNode):
+    __slots__ = ("values", "separator")
+
     def __init__(self, values, separator=" "):
         self.values = values
         self.separator = separator
-    def __repr__(self):
-        return f"MultiValueNode(values={self.values}, sep={self.separator})"
+    def repr_parts(self):
+        return ("MultiValueNode(values=", self.values, f", sep={self.separator})")
 class AssignmentNode(ASTNode):
+    __slots__ = ("variable_name", "expression", "needs_check")
+
     def __init__(self, variable_name, expression):
         self.variable_name = variable_name
         self.expression = expression
-    def __repr__(self):
-        return f"AssignmentNode(variable_name={self.variable_name}, expression={self.expression})"
+    def repr_parts(self):
+        return (f"AssignmentNode(variable_name={self.variable_name}, expression=", self.expression, ")")
 class BooleanNode(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
         return f"BooleanNode(value={Fore.YELLOW}{self.value}{Fore.RESET})"
 
+LITERAL_NODES = (IntNumberNode, FloatNumberNode, StringNode, BooleanNode)
+
+
+# дети узла в порядке вычисления, для обходов дерева с явным стеком
+def node_children(node):
+    if isinstance(node, StdoutNode):
+        return [node.expression]
+    elif isinstance(node, BinOpNode):
+        return [node.left, node.right]
+    elif isinstance(node, UnaryOpNode):
+        return [node.node]
+    elif isinstance(node, (ConcatenationNode, MultiValueNode)):
+        return node.values
+    elif isinstance(node, VariableDeclarationNode):
+        return [node.value]
+    elif isinstance(node, AssignmentNode):
+        return [node.expression]
+    return []
+
+
 def parse(tokens):
     parser = Parser(tokens)
     ast = parser.parse()
@@ -0,0 +1,216 @@
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+from lexer import *
+from parser import *
+from exception import *
+from interpreter import *
+
+
+class Profiler:
+    def __init__(self):
+        self.phases = {}
+        self.node_counts = {}
+        self.node_times = {}
+        self.node_self_times = {}
+        # путь от инструкции до узла -> собственное время узла, для flamegraph
+        self.stacks = {}
+        self.line_hits = {}
+        self.line_times = {}
+        self.current_line = None
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def record_node(self, path, elapsed, self_time):
+        name = path[-1]
+        self.node_counts[name] = self.node_counts.get(name, 0) + 1
+        # у вложенных узлов того же типа общее время уже учтено во внешнем
+        if name not in path[:-1]:
+            self.node_times[name] = self.node_times.get(name, 0.0) + elapsed
+        else:
+            self.node_times.setdefault(name, 0.0)
+        self.node_self_times[name] = self.node_self_times.get(name, 0.0) + self_time
+        key = (self.current_line,) + path
+        self.stacks[key] = self.stacks.get(key, 0.0) + self_time
+
+    def record_line(self, line, elapsed):
+        self.line_hits[line] = self.line_hits.get(line, 0) + 1
+        self.line_times[line] = self.line_times.get(line, 0.0) + elapsed
+
+    def to_dict(self):
+        return {
+            "phases": self.phases,
+            "nodes": {
+                name: {
+                    "count": self.node_counts[name],
+                    "seconds": self.node_times[name],
+                    "self_seconds": self.node_self_times[name],
+                }
+                for name in sorted(self.node_times, key=self.node_times.get, reverse=True)
+            },
+            "lines": {
+                str(line): {"hits": self.line_hits[line], "seconds": self.line_times[line]}
+                for line in sorted(self.line_hits)
+            },
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    # Формат collapsed stacks для flamegraph.pl и speedscope: "кадр;кадр;кадр значение", значение в микросекундах.
+    def collapsed(self):
+        lines = []
+        for name, seconds in self.phases.items():
+            if name != "interpret" or not self.stacks:
+                lines.append(f"{name} {round(seconds * 1e6)}")
+        for (line, *path), seconds in self.stacks.items():
+            lines.append(f"interpret;line {line};{';'.join(path)} {round(seconds * 1e6)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, limit=10):
+        lines = ["PHASES:"]
+        for name, seconds in self.phases.items():
+            lines.append(f"    {name:<12}{seconds * 1000:>10.3f} ms")
+        if self.node_times:
+            lines.append("NODES:")
+            for name in sorted(self.node_times, key=self.node_times.get, reverse=True):
+                lines.append(f"    {name:<26}{self.node_counts[name]:>9}{self.node_times[name] * 1000:>12.3f} ms"
+                             f"{self.node_self_times[name] * 1000:>12.3f} ms self")
+        if self.line_times:
+            lines.append("LINES:")
+            for line in sorted(self.line_times, key=self.line_times.get, reverse=True)[:limit]:
+                lines.append(f"    line {line:<8}{self.line_hits[line]:>9}{self.line_times[line] * 1000:>12.3f} ms")
+        return "\n".join(lines)
+
+
+class LineParser(Parser):
+    def parse(self):
+        statements = []
+        self.lines = []
+        while self.current_token is not None:
+            if self.current_token.type == TokenKind.NEW_LINE:
+                self.advance()
+                continue
+            self.lines.append(self.current_token.line)
+            statements.append(self.parse_statement())
+        return statements
+
+
+# Отдельный подкласс, а не флаг в Interpreter.visit: без профилирования горячий путь не меняется.
+class ProfilingInterpreter(Interpreter):
+    def __init__(self, ast, profiler):
+        super().__init__(ast)
+        self.profiler = profiler
+        self.path = []
+        self.child_times = []
+
+    def visit(self, node):
+        self.path.append(type(node).__name__)
+        self.child_times.append(0.0)
+        started = time.perf_counter()
+        try:
+            return Interpreter.visit(self, node)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self.child_times.pop()
+            self.profiler.record_node(tuple(self.path), elapsed, elapsed - children)
+            self.path.pop()
+            if self.child_times:
+                self.child_times[-1] += elapsed
+
+    # Для статистики по узлам каждая операция должна пройти через visit, поэтому здесь обход рекурсивный.
+    def visit_BinOpNode(self, node):
+        return self.binary_operation(node, self.visit(node.left), self.visit(node.right))
+
+    def visit_ConcatenationNode(self, node):
+        return self.join_values([self.visit(value_node) for value_node in node.values], node.separator)
+
+    def visit_MultiValueNode(self, node):
+        return self.join_values([self.visit(value_node) for value_node in node.values], node.separator)
+
+    def visit_UnaryOpNode(self, node):
+        return self.unary_operation(node, self.visit(node.node))
+
+
+def profile_execute(ast, lines, profiler):
+    interpreter = ProfilingInterpreter(ast, profiler)
+    for node, line in zip(ast, lines):
+        profiler.current_line = line
+        started = time.perf_counter()
+        try:
+            result = interpreter.visit(node)
+        finally:
+            profiler.record_line(line, time.perf_counter() - started)
+        if isinstance(node, StdoutNode):
+            yield result
+
+
+def profile_source(source, engine="tree", profiler=None):
+    if profiler is None:
+        profiler = Profiler()
+    with profiler.phase("lex"):
+        tokens = run(source)
+    with profiler.phase("parse"):
+        parser = LineParser(tokens)
+        ast = parser.parse()
+    with profiler.phase("interpret"):
+        if engine == "tree":
+            try:
+                results = list(profile_execute(ast, parser.lines, profiler))
+            except RecursionError:
+                # обход с замером каждого узла рекурсивный, глубину ограничивает предел рекурсии Python
+                raise Error("RecursionError", "Expression is nested too deeply to profile it node by node",
+                            profiler.current_line, 1) from None
+        else:
+            # у остальных движков нет обхода по узлам, для них меряются только фазы
+            results = interpret(ast, engine=engine)
+    return results, profiler
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Profile a QuarkScript file.")
+    argument_parser.add_argument("path")
+    argument_parser.add_argument("--engine", default="tree", help="node and line statistics need the tree engine")
+    argument_parser.add_argument("--json", default=None, help="write the profile as JSON")
+    argument_parser.add_argument("--collapsed", default=None, help="write flamegraph collapsed stacks")
+    argument_parser.add_argument("--quiet", action="store_true", help="do not print script output")
+    arguments = argument_parser.parse_args(argv)
+
+    with open(arguments.path, "r", encoding="utf-8") as file:
+        source = file.read()
+
+    profiler = Profiler()
+    status = 0
+    try:
+        results, _ = profile_source(source, arguments.engine, profiler)
+    except (Error, InterpreterErrors, Exception) as e:
+        # профиль до ошибки все равно печатается и сохраняется
+        print(e, file=sys.stderr)
+        results = []
+        status = 1
+
+    if not arguments.quiet:
+        for result in results:
+            if result is not None:
+                print(result)
+    print(profiler.summary(), file=sys.stderr)
+    if arguments.json is not None:
+        with open(arguments.json, "w", encoding="utf-8") as file:
+            file.write(profiler.to_json())
+    if arguments.collapsed is not None:
+        with open(arguments.collapsed, "w", encoding="utf-8") as file:
+            file.write(profiler.collapsed())
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+from sys import *
+
+from session import *
+from colors import Fore, Style
+
+PROMPT = "qs> "
+CONTINUATION_PROMPT = "... "
+
+
+def print_error(error):
+    print(f"{Fore.RED}{Style.BRIGHT}{error}{Fore.RESET}")
+
+
+def read_fragment():
+    lines = [input(PROMPT)]
+    # фрагмент считается законченным, когда строка заканчивается ';' или пустая
+    while lines[-1].strip() and not lines[-1].rstrip().endswith(";") and not lines[0].startswith("."):
+        lines.append(input(CONTINUATION_PROMPT))
+    return "\n".join(lines)
+
+
+def main():
+    session = Session()
+    while True:
+        try:
+            fragment = read_fragment()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return 0
+
+        command = fragment.strip()
+        if not command:
+            continue
+        if command in (".exit", ".quit"):
+            return 0
+        if command == ".reset":
+            session.reset()
+            continue
+        if command == ".vars":
+            for name, value in session.variables.items():
+                print(f"{name} : {session.variable_types[name]} = {value!r}")
+            continue
+
+        try:
+            for result in session.execute(fragment):
+                if result is not None:
+                    print(result)
+        except (Error, InterpreterErrors, Exception) as e:
+            print_error(e)
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,129 @@
+from parser import *
+
+
+class SlotVariableNode(VariableNode):
+    __slots__ = ("slot",)
+
+    def __init__(self, name, slot):
+        super().__init__(name)
+        self.slot = slot
+    def __repr__(self):
+        return f"SlotVariableNode(name={Fore.CYAN}{self.name}{Fore.RESET}, slot={self.slot})"
+
+class SlotDeclarationNode(VariableDeclarationNode):
+    __slots__ = ("slot",)
+
+    def __init__(self, variable_name, variable_type, variable_value, slot):
+        super().__init__(variable_name, variable_type, variable_value)
+        self.slot = slot
+    def repr_parts(self):
+        return (f"SlotDeclarationNode(variable_name={Fore.RED}\"{self.name}\"{Fore.RESET}, slot={self.slot}, type={Fore.RED}{self.type}{Fore.RESET}, value=",
+                self.value, ")")
+
+class SlotAssignmentNode(AssignmentNode):
+    __slots__ = ("slot",)
+
+    def __init__(self, variable_name, expression, slot):
+        super().__init__(variable_name, expression)
+        self.slot = slot
+    def repr_parts(self):
+        return (f"SlotAssignmentNode(variable_name={self.variable_name}, slot={self.slot}, expression=", self.expression, ")")
+
+
+class Scope:
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.names = {}
+
+    def lookup(self, name):
+        scope = self
+        while scope is not None:
+            if name in scope.names:
+                return scope.names[name]
+            scope = scope.parent
+        return None
+
+
+class ResolvedProgram:
+    def __init__(self, statements, slot_count):
+        self.statements = statements
+        self.slot_count = slot_count
+
+    def __repr__(self):
+        return f"ResolvedProgram(statements={len(self.statements)}, slots={self.slot_count})"
+
+
+# Ошибки "не определена" и "уже существует" выявляются здесь, до исполнения.
+# Вложенные области видимости (begin_scope/end_scope) понадобятся для func и for ... as local.
+class Resolver:
+    def __init__(self):
+        self.scope = Scope()
+        self.slot_count = 0
+
+    def begin_scope(self):
+        self.scope = Scope(self.scope)
+
+    def end_scope(self):
+        self.scope = self.scope.parent
+
+    def declare(self, name):
+        if name in self.scope.names:
+            raise InterpreterErrors("Invalid Syntax", f"Variable '{name}' already exists")
+        slot = self.slot_count
+        self.slot_count += 1
+        self.scope.names[name] = slot
+        return slot
+
+    def resolve(self, ast):
+        statements = [self.resolve_node(node) for node in ast]
+        return ResolvedProgram(statements, self.slot_count)
+
+    # Узлы перестраиваются в обратном порядке на явном стеке: дети раньше родителя, слева направо,
+    # как при рекурсивном спуске, поэтому слоты и ошибки те же, а глубина выражения не ограничена.
+    def resolve_node(self, node):
+        resolved = []
+        stack = [(node, False)]
+        while stack:
+            node, ready = stack.pop()
+            if ready:
+                resolved.append(self.rebuild(node, resolved))
+            elif isinstance(node, (VariableDeclarationNode, AssignmentNode, BinOpNode, UnaryOpNode,
+                                   ConcatenationNode, StdoutNode, MultiValueNode)):
+                stack.append((node, True))
+                for child in reversed(node_children(node)):
+                    stack.append((child, False))
+            elif isinstance(node, VariableNode):
+                slot = self.scope.lookup(node.name)
+                if slot is None:
+                    raise Exception(f"Variable {node.name} is not defined")
+                resolved.append(SlotVariableNode(node.name, slot))
+            else:
+                resolved.append(node)
+        return resolved[0]
+
+    # новый узел из уже разрешенных детей, которые лежат на вершине resolved
+    def rebuild(self, node, resolved):
+        if isinstance(node, VariableDeclarationNode):
+            return SlotDeclarationNode(node.name, node.type, resolved.pop(), self.declare(node.name))
+        elif isinstance(node, AssignmentNode):
+            expression = resolved.pop()
+            slot = self.scope.lookup(node.variable_name)
+            if slot is None:
+                raise Exception(f"Name '{node.variable_name}' is not defined")
+            return SlotAssignmentNode(node.variable_name, expression, slot)
+        elif isinstance(node, BinOpNode):
+            right = resolved.pop()
+            return BinOpNode(node.op, resolved.pop(), right)
+        elif isinstance(node, UnaryOpNode):
+            return UnaryOpNode(node.op, resolved.pop())
+        elif isinstance(node, StdoutNode):
+            return StdoutNode(resolved.pop())
+        values = resolved[len(resolved) - len(node.values):]
+        del resolved[len(resolved) - len(node.values):]
+        if isinstance(node, ConcatenationNode):
+            return ConcatenationNode(values)
+        return MultiValueNode(values, node.separator)
+
+
+def resolve(ast):
+    return Resolver().resolve(ast)
@@ -1,59 +1,204 @@
+import time
+started = time.perf_counter()
+
+import argparse
 import os
 from sys import *
 
-import colorama
-
 from parser import *
 from lexer import *
 from exception import *
 from interpreter import *
-from colorama import Fore, init, Style
-init()
+from optimizer import *
+from cache import *
+from source import *
+from colors import Fore, Style
+
+DUMPS = ("code", "tokens", "ast")
+
+
+def parse_arguments(script_dir):
+    argument_parser = argparse.ArgumentParser(description="Run a QuarkScript file.")
+    argument_parser.add_argument("path", nargs="?", default=os.path.join(script_dir, "index.qs"))
+    argument_parser.add_argument("--quiet", action="store_true", help="print only the program output")
+    argument_parser.add_argument("--dump", default=None, help="comma separated: code, tokens, ast (all by default)")
+    argument_parser.add_argument("--timings", action="store_true", help="report per-phase and cold start times")
+    argument_parser.add_argument("--engine", default="tree", help="tree, slots, vm or closure")
+    argument_parser.add_argument("--optimize", action="store_true")
+    argument_parser.add_argument("--report-folds", action="store_true")
+    argument_parser.add_argument("--typecheck", action="store_true")
+    argument_parser.add_argument("--cache", action="store_true")
+    argument_parser.add_argument("--stream", action="store_true")
+    argument_parser.add_argument("--flush-size", type=int, default=DEFAULT_FLUSH_SIZE,
+                                 help="characters buffered before --stream writes them out, 0 writes every result")
+    argument_parser.add_argument("--mmap", action="store_true", help="lex the file as bytes straight from a memory map")
+    argument_parser.add_argument("--snapshot", action="store_true",
+                                 help="restore the state after leading declarations from PATH.qss instead of re-running them")
+    argument_parser.add_argument("--check", nargs="+", metavar="PATH", default=None,
+                                 help="report all syntax errors in files, directories or globs without running them")
+    arguments = argument_parser.parse_args()
+    dumps = DUMPS if arguments.dump is None else [name for name in arguments.dump.split(",") if name]
+    if arguments.snapshot:
+        # снимок восстанавливает состояние интерпретатора дерева и пропускает лексер и парсер для прелюдии,
+        # поэтому остальные этапы конвейера с ним не работают; без явного --dump печатается только код
+        incompatible = [option for option, used in (
+            ("--engine", arguments.engine != "tree"),
+            ("--cache", arguments.cache),
+            ("--optimize", arguments.optimize),
+            ("--typecheck", arguments.typecheck),
+            ("--stream", arguments.stream),
+        ) if used]
+        if arguments.dump is not None:
+            incompatible += [f"--dump {name}" for name in dumps if name in ("tokens", "ast")]
+        if incompatible:
+            argument_parser.error(f"--snapshot cannot be combined with {', '.join(incompatible)}")
+        if arguments.dump is None:
+            dumps = ["code"]
+    arguments.dump = set() if arguments.quiet else set(dumps)
+    return arguments
+
+
+def print_error(error):
+    print(f"{Fore.RED}{Style.BRIGHT}{error}{Fore.RESET}")
+
+
 if __name__ == '__main__':
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(script_dir, "index.qs")
+    arguments = parse_arguments(script_dir)
+    if arguments.check is not None:
+        # lint тянет за собой batch и multiprocessing, обычному запуску они не нужны
+        from lint import check_paths
+        exit(check_paths(arguments.check, arguments.quiet))
+    file_path = arguments.path
+    verbose = not arguments.quiet
+    timings = [("imports", time.perf_counter())]
 
+    source = None
+    content_to_compile = None
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            file.seek(0)
-            content_to_compile = file.read()
+        if arguments.mmap:
+            # текст целиком декодируется только если он нужен для вывода кода или кэша
+            source = MappedSource(file_path)
+            if "code" in arguments.dump or arguments.cache or arguments.snapshot:
+                content_to_compile = source.text()
+        else:
+            with open(file_path, "r", encoding="utf-8") as file:
+                file.seek(0)
+                content_to_compile = file.read()
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         exit(1)
     except Exception as e:
         print(f"Error reading file: {e}")
         exit(1)
+    timings.append(("read", time.perf_counter()))
 
-    lexer_result = run(content_to_compile)
-    if len(content_to_compile) > 0:
-        print("CODE: ")
-        print(f"    {content_to_compile}")
-        print("LEXER TOKENS:")
-        for l in lexer_result:
-            print(f"    {l}")
+    if len(source if source is not None else content_to_compile) > 0:
+        if "code" in arguments.dump:
+            print("CODE: ")
+            print(f"    {content_to_compile}")
 
         try:
-            parser_result = parse(lexer_result)
-            print("PARSER RESULT: ")
-            for i in parser_result:
-                print(f"    {i}")
-            interpreter_result = interpret(parser_result)
-            print("INTERPRETER RESULT:")
-            for result in interpreter_result:
-                if result is not None:
-                    print(result)
+            if arguments.snapshot:
+                # несовместимые с --snapshot параметры отклоняет parse_arguments
+                from snapshot import execute_with_snapshot, snapshot_path
+                interpreter_result, restored = execute_with_snapshot(content_to_compile, snapshot_path(file_path))
+                if verbose:
+                    print(f"SNAPSHOT: {'hit' if restored else 'miss'}")
+                    print("INTERPRETER RESULT:")
+                for result in interpreter_result:
+                    if result is not None:
+                        print(result)
+                timings.append(("execute", time.perf_counter()))
+            else:
+                cache = None
+                parser_result = None
+                if arguments.cache:
+                    cache = ScriptCache(os.path.join(script_dir, CACHE_DIRECTORY), optimized=arguments.optimize)
+                    parser_result = cache.load(content_to_compile)
+                    if verbose:
+                        print(f"CACHE: {'hit' if parser_result is not None else 'miss'}")
+                    timings.append(("cache", time.perf_counter()))
+
+                if parser_result is None:
+                    if source is not None:
+                        lexer_result = run_mapped(source)
+                    else:
+                        lexer_result = run(content_to_compile)
+                    timings.append(("lex", time.perf_counter()))
+                    if "tokens" in arguments.dump:
+                        print("LEXER TOKENS:")
+                        for l in lexer_result:
+                            print(f"    {l}")
+
+                    parser_result = parse(lexer_result)
+                    del lexer_result
+                    timings.append(("parse", time.perf_counter()))
+                    if "ast" in arguments.dump:
+                        print("PARSER RESULT: ")
+                        for i in parser_result:
+                            print(f"    {i}")
+                    if arguments.optimize:
+                        optimizer = Optimizer(report=arguments.report_folds)
+                        parser_result = optimizer.optimize(parser_result)
+                        timings.append(("optimize", time.perf_counter()))
+                        if arguments.report_folds:
+                            print("OPTIMIZER REPORT:")
+                            for message in optimizer.messages:
+                                print(f"    {message}")
+                    if cache is not None:
+                        cache.store(content_to_compile, parser_result)
+
+                engine = arguments.engine
+                if arguments.typecheck:
+                    type_errors = typecheck(parser_result)
+                    if type_errors:
+                        for type_error in type_errors:
+                            print_error(type_error)
+                        exit(1)
+                    engine = "checked"
+                    timings.append(("typecheck", time.perf_counter()))
+
+                timings.append(("first statement", time.perf_counter()))
+                if verbose:
+                    print("INTERPRETER RESULT:")
+                if arguments.stream:
+                    interpret(parser_result, engine=engine, sink=stdout, flush_size=arguments.flush_size)
+                else:
+                    interpreter_result = interpret(parser_result, engine=engine)
+                    for result in interpreter_result:
+                        if result is not None:
+                            print(result)
+                timings.append(("execute", time.perf_counter()))
         except InvalidCharacterError as inv:
-            print(f"{Fore.RED}{colorama.Style.BRIGHT}{inv}{Fore.RESET}")
+            print_error(inv)
             exit(1)
         except Error as e:
-            print(f"{Fore.RED}{colorama.Style.BRIGHT}{e}{Fore.RESET}")
+            print_error(e)
             exit(1)
         except InterpreterErrors as ie:
-            print(f"{Fore.RED}{colorama.Style.BRIGHT}{ie}{Fore.RESET}")
+            print_error(ie)
             exit(1)
         # except Exception as e:
         #     print(f"{Fore.RED}{Style.BRIGHT}Unexpected Error: {e}{Fore.RESET}")
         #     exit(1)
+        finally:
+            # позиции ошибок к этому моменту уже посчитаны, токенам отображение больше не нужно
+            if source is not None:
+                source.close()
 
     else:
-        print("EMPTY")
+        if source is not None:
+            source.close()
+        if verbose:
+            print("EMPTY")
+
+    if arguments.timings:
+        previous = started
+        for phase, moment in timings:
+            if phase == "first statement":
+                print(f"cold start: {(moment - started) * 1000:.3f} ms", file=stderr)
+            else:
+                print(f"{phase}: {(moment - previous) * 1000:.3f} ms", file=stderr)
+            previous = moment
+        print(f"total: {(time.perf_counter() - started) * 1000:.3f} ms", file=stderr)
@@ -0,0 +1,50 @@
+import asyncio
+
+from lexer import *
+from parser import *
+from interpreter import *
+from asynchronous import *
+
+
+class Session:
+    def __init__(self):
+        self.interpreter = Interpreter([])
+
+    @property
+    def variables(self):
+        return self.interpreter.variables
+
+    @property
+    def variable_types(self):
+        return self.interpreter.variable_types
+
+    # Лексер и парсер видят только новый фрагмент, переменные остаются от предыдущих вызовов.
+    # Как и interpret: список результатов или, с sink, число записанных строк.
+    def execute(self, source, sink=None, flush_size=DEFAULT_FLUSH_SIZE):
+        ast = parse(run(source))
+        results = execute_statements(self.interpreter, ast)
+        if sink is None:
+            return list(results)
+        return write_results(results, sink, flush_size)
+
+    async def execute_async(self, source, sink=None, timeout=None, flush_size=DEFAULT_FLUSH_SIZE,
+                            yield_every=DEFAULT_YIELD_STATEMENTS, yield_microseconds=DEFAULT_YIELD_MICROSECONDS, gate=None):
+        async def parse_and_run():
+            ast = await asyncio.to_thread(parse_source, source)
+            execution = AsyncExecution(interpreter_steps(self.interpreter, ast), sink, flush_size,
+                                       yield_every, yield_microseconds, gate)
+            return await execution.run()
+        return await with_timeout(parse_and_run(), timeout)
+
+    # Копия состояния, например после прелюдии: каждый запрос исполняется в своей копии.
+    def fork(self):
+        session = Session()
+        session.interpreter.variables = dict(self.interpreter.variables)
+        session.interpreter.variable_types = dict(self.interpreter.variable_types)
+        return session
+
+    def reset(self):
+        self.interpreter = Interpreter([])
+
+    def __repr__(self):
+        return f"Session(variables={len(self.interpreter.variables)})"
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+
+DEFAULT_FLUSH_SIZE = 8192
+
+
+class OutputSink(ABC):
+    def __init__(self, flush_size=DEFAULT_FLUSH_SIZE):
+        self.flush_size = flush_size
+        self.pieces = []
+        self.size = 0
+
+    def write(self, result):
+        if result is None:
+            return
+        text = f"{result}\n"
+        self.pieces.append(text)
+        self.size += len(text)
+        if self.size >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if self.pieces:
+            text = "".join(self.pieces)
+            self.pieces = []
+            self.size = 0
+            self.emit(text)
+
+    @abstractmethod
+    def emit(self, text):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class StreamSink(OutputSink):
+    def __init__(self, stream, flush_size=DEFAULT_FLUSH_SIZE):
+        super().__init__(flush_size)
+        self.stream = stream
+
+    def emit(self, text):
+        self.stream.write(text)
+        if hasattr(self.stream, "flush"):
+            self.stream.flush()
+
+
+class CallbackSink(OutputSink):
+    def __init__(self, callback, flush_size=DEFAULT_FLUSH_SIZE):
+        super().__init__(flush_size)
+        self.callback = callback
+
+    def emit(self, text):
+        self.callback(text)
+
+
+def make_sink(target, flush_size=DEFAULT_FLUSH_SIZE):
+    if isinstance(target, OutputSink):
+        return target
+    if hasattr(target, "write"):
+        return StreamSink(target, flush_size)
+    if callable(target):
+        return CallbackSink(target, flush_size)
+    raise TypeError(f"Cannot use {type(target).__name__} as an output sink")
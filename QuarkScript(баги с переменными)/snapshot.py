@@ -0,0 +1,176 @@
+import argparse
+import hashlib
+import marshal
+import os
+import struct
+import time
+
+from lexer import *
+from parser import *
+from interpreter import *
+from incremental import IncrementalDocument
+
+SNAPSHOT_SUFFIX = ".qss"
+FORMAT_VERSION = 1
+MAGIC = b"QSS"
+# magic, версия формата, длина префикса в символах, строка и столбец лексера на границе, sha256 префикса
+HEADER = struct.Struct("<3sBQII32s")
+
+
+def prefix_hash(source, length):
+    return hashlib.sha256(source[:length].encode("utf-8")).digest()
+
+
+# Состояние интерпретатора после прелюдии и текст, который его дал. Вместо прелюдии лексер продолжает
+# с сохраненных строки и столбца, поэтому позиции токенов и ошибок в остальном тексте те же, что при полном запуске.
+class Snapshot:
+    def __init__(self, prefix_length, digest, line, column, variables, variable_types):
+        self.prefix_length = prefix_length
+        self.digest = digest
+        self.line = line
+        self.column = column
+        self.variables = variables
+        self.variable_types = variable_types
+
+    def matches(self, source):
+        return len(source) >= self.prefix_length and prefix_hash(source, self.prefix_length) == self.digest
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.prefix_length, self.line, self.column, self.digest)
+        return header + marshal.dumps((self.variables, self.variable_types))
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ValueError("Truncated snapshot")
+        magic, version, prefix_length, line, column, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Incompatible snapshot")
+        variables, variable_types = marshal.loads(data[HEADER.size:])
+        if not isinstance(variables, dict) or not isinstance(variable_types, dict) or variables.keys() != variable_types.keys():
+            raise ValueError("Corrupted snapshot")
+        return cls(prefix_length, digest, line, column, variables, variable_types)
+
+    def save(self, path):
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "rb") as file:
+                return cls.from_bytes(file.read())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+
+    def restore(self):
+        interpreter = Interpreter([])
+        interpreter.variables = dict(self.variables)
+        interpreter.variable_types = dict(self.variable_types)
+        return interpreter
+
+    def __repr__(self):
+        return f"Snapshot(prefix={self.prefix_length}, variables={len(self.variables)})"
+
+
+# Прелюдия - ведущие инструкции без вывода, каждая из которых заканчивается ';'. После ';' парсер
+# не заглядывает в следующий токен, поэтому разбор прелюдии не зависит от текста после нее.
+def prelude_length(document):
+    tokens = document.tokens
+    for index, statement in enumerate(document.statements):
+        if isinstance(statement, StdoutNode) or tokens[document.statement_end(index) - 1].type != TokenKind.SEMI_COLON:
+            return index
+    return len(document.statements)
+
+
+def execute_remaining(interpreter, source, position, line, column):
+    lexer = TableLexer(source)
+    lexer.position = position
+    lexer.line = line
+    lexer.column = column
+    return list(execute_statements(interpreter, parse(lexer.tokenize())))
+
+
+# Полный запуск, по дороге снимающий состояние после прелюдии. Снимок сохраняется до исполнения
+# остальных инструкций: ошибка в них не делает прелюдию недействительной.
+def create_snapshot(source, path=None):
+    document = IncrementalDocument(source)
+    if document.error is not None:
+        raise document.error
+    # граница снимка - начало следующей инструкции: хвост после последней ';' может оказаться
+    # началом комментария или числа, которое допишут, поэтому последняя инструкция в прелюдию не входит
+    count = min(prelude_length(document), len(document.statements) - 1)
+    interpreter = Interpreter(document.statements)
+    list(execute_statements(interpreter, document.statements[:count]))
+
+    if count > 0:
+        first = document.statement_start(count)
+        prefix_length = document.token_start(first)
+        line, column = document.token_line(first), document.tokens[first].column
+    else:
+        prefix_length = 0
+        line, column = 1, 1
+        count = 0
+    snapshot = Snapshot(prefix_length, prefix_hash(source, prefix_length), line, column,
+                        dict(interpreter.variables), dict(interpreter.variable_types))
+    if path is not None:
+        snapshot.save(path)
+    results = list(execute_statements(interpreter, document.statements[count:]))
+    return snapshot, results
+
+
+# Возвращает результаты stdout и признак того, что прелюдия взята из снимка. Если снимка нет,
+# он поврежден или прелюдия изменилась, скрипт исполняется полностью, а снимок перезаписывается.
+def execute_with_snapshot(source, path):
+    snapshot = Snapshot.load(path)
+    if snapshot is not None and snapshot.matches(source):
+        results = execute_remaining(snapshot.restore(), source, snapshot.prefix_length, snapshot.line, snapshot.column)
+        return results, True
+    _, results = create_snapshot(source, path)
+    return results, False
+
+
+def snapshot_path(script_path):
+    return script_path + SNAPSHOT_SUFFIX
+
+
+def benchmark(declarations=50000, repeat=5):
+    lines = [f"var v{index} := {index} * 3 + 1;" for index in range(declarations)]
+    lines += [f"stdout v{declarations - 1} + 1;", "var total := v0 + v1;", "stdout total;"]
+    source = "\n".join(lines) + "\n"
+    path = os.path.join(os.getcwd(), f"benchmark{SNAPSHOT_SUFFIX}")
+
+    try:
+        best_full = best_warm = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            expected = interpret(parse(run(source)))
+            elapsed = time.perf_counter() - started
+            best_full = elapsed if best_full is None else min(best_full, elapsed)
+
+        create_snapshot(source, path)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results, restored = execute_with_snapshot(source, path)
+            elapsed = time.perf_counter() - started
+            best_warm = elapsed if best_warm is None else min(best_warm, elapsed)
+            if not restored or results != expected:
+                raise AssertionError("Warm start differs from full execution")
+        size = os.path.getsize(path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    print(f"{declarations} declarations, snapshot {size / 1024:.1f} KiB")
+    print(f"full run   {best_full * 1000:>10.2f} ms")
+    print(f"warm start {best_warm * 1000:>10.2f} ms  x{best_full / best_warm:.1f}")
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Measure warm starts from an interpreter snapshot.")
+    argument_parser.add_argument("--declarations", type=int, default=50000)
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    arguments = argument_parser.parse_args()
+    benchmark(arguments.declarations, arguments.repeat)
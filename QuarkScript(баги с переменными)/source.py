@@ -0,0 +1,176 @@
+import mmap
+import re
+import sys
+from array import array
+from bisect import bisect_left
+
+from lexer import *
+
+BYTES_TOKEN_PATTERN = re.compile(TOKEN_PATTERN.pattern.encode("utf-8"), re.VERBOSE)
+NEWLINE_PATTERN = re.compile(rb"\n")
+SPACE_PATTERN = re.compile(r"\s+")
+BYTE_OPERATORS = {ord(symbol): kind for symbol, kind in SINGLE_CHAR_OPERATORS.items()}
+
+
+class MappedSource:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # пустой файл нельзя отобразить в память
+            self.data = b""
+        self.newlines = None
+
+    @classmethod
+    def from_bytes(cls, data, path="<bytes>"):
+        source = cls.__new__(cls)
+        source.path = path
+        source.file = None
+        source.data = data
+        source.newlines = None
+        return source
+
+    def __len__(self):
+        return len(self.data)
+
+    # Индекс переводов строки строится при первом запросе позиции, а не при лексировании.
+    def newline_offsets(self):
+        if self.newlines is None:
+            self.newlines = array("Q", [match.start() for match in NEWLINE_PATTERN.finditer(self.data)])
+        return self.newlines
+
+    def position(self, offset):
+        newlines = self.newline_offsets()
+        index = bisect_left(newlines, offset)
+        line_start = newlines[index - 1] + 1 if index else 0
+        column = len(self.data[line_start:offset].decode("utf-8", errors="replace")) + 1
+        return index + 1, column
+
+    def text(self, start=0, end=None):
+        return self.data[start:end].decode("utf-8")
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        if self.file is not None:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"MappedSource(path={self.path}, bytes={len(self.data)})"
+
+
+# Токен помнит только байтовое смещение, строка и столбец вычисляются по индексу при обращении.
+class SourceToken(Token):
+    __slots__ = ("offset", "source")
+
+    def __init__(self, type_, offset, source, value=None):
+        self.type = type_
+        self.value = value
+        self.offset = offset
+        self.source = source
+
+    @property
+    def line(self):
+        return self.source.position(self.offset)[0]
+
+    @property
+    def column(self):
+        return self.source.position(self.offset)[1]
+
+
+class MappedLexer:
+    def __init__(self, source):
+        self.source = source
+        self.position = 0
+
+    def tokenize(self):
+        tokens = []
+        append = tokens.append
+        source = self.source
+        data = source.data
+        length = len(data)
+        position = self.position
+        match_token = BYTES_TOKEN_PATTERN.match
+        operators = BYTE_OPERATORS
+        keywords = KEYWORDS
+
+        while position < length:
+            match = match_token(data, position)
+            if match is None:
+                position = self.tokenize_rare(position, append)
+                continue
+
+            group = match.lastindex
+            end = match.end()
+            if group == 8:
+                append(SourceToken(operators[data[position]], position, source))
+            elif group == 3:
+                if end < length and data[end] >= 0x80:
+                    # идентификатор продолжается не-ASCII буквами
+                    position = self.tokenize_rare(position, append)
+                    continue
+                word = sys.intern(match.group(3).decode("ascii"))
+                if word in keywords:
+                    append(SourceToken(keywords[word], position, source))
+                else:
+                    append(SourceToken(TokenKind.VAR_IDENTIFIER, position, source, word))
+            elif group == 2:
+                append(self.number_token(match.group(2), position))
+            elif group == 4 or group == 5:
+                append(SourceToken(TokenKind.STRING, position, source, match.group(group).decode("utf-8")))
+            elif group == 6:
+                append(SourceToken(TokenKind.DYNAMIC_ASSIGN, position, source))
+            position = end
+
+        self.position = position
+        return tokens
+
+    def number_token(self, lexeme, position):
+        if lexeme.startswith(b"."):
+            lexeme = b"0" + lexeme
+        if b"." in lexeme:
+            return SourceToken(TokenKind.FLOAT, position, self.source, float(lexeme))
+        return SourceToken(TokenKind.INTEGER, position, self.source, int(lexeme))
+
+    # Не-ASCII символы и ошибки: декодируем только остаток текущей строки и разбираем как TableLexer.
+    def tokenize_rare(self, position, append):
+        data = self.source.data
+        line_end = data.find(b"\n", position)
+        rest = data[position:line_end if line_end >= 0 else len(data)].decode("utf-8")
+        char = rest[0]
+
+        if char.isspace():
+            return position + len(SPACE_PATTERN.match(rest).group().encode("utf-8"))
+
+        if char == "." and (len(rest) < 2 or not rest[1].isdigit()):
+            raise InvalidCharacterError(f"'{char}'", *self.source.position(position))
+
+        if char.isdigit() or char == ".":
+            lexeme = NUMBER_PATTERN.match(rest).group()
+            token = number_token(lexeme, 0, 0)
+            append(SourceToken(token.type, position, self.source, token.value))
+            return position + len(lexeme.encode("utf-8"))
+
+        if char == '"' or char == "'":
+            raise SyntaxError(f"Unterminated String", *self.source.position(position))
+
+        if char.isalpha():
+            lexeme = WORD_PATTERN.match(rest, 1).group()
+            lexeme = char + lexeme
+            token = word_token(lexeme, 0, 0)
+            append(SourceToken(token.type, position, self.source, token.value))
+            return position + len(lexeme.encode("utf-8"))
+
+        raise InvalidCharacterError(f"'{char}'", *self.source.position(position))
+
+
+def run_mapped(source):
+    return MappedLexer(source).tokenize()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# модули интерпретатора лежат плоско в родительском каталоге и импортируются по имени, как в run.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+from exception import *
+
+# Небольшие программы, на которых сравниваются движки и проходы: и корректные, и с ошибками разных фаз
+PROGRAMS = [
+    'var a := 2;\nvar b: float = 1.5;\nstdout a * b + 3, -a;',
+    'var p: bool = true;\nvar q: bool = false;\nstdout p + q, q + q;',
+    'var a := 10;\na = a - 4;\nstdout a / 4;',
+    'stdout (1 + 2) * -(3 - 5) / 4.0;',
+    'var t := "a" + (1 + 2) + "b";\nstdout t, t + t;',
+    'stdout 2.0;\nstdout 7;',
+    'stdout "a" - 1;',
+    'var s: string = "x";\nstdout s + 1;',
+    'stdout 1 / 0;',
+    'stdout y;',
+    'var a := 1;\nvar a := 2;',
+    'var a: int = "s";',
+    'var a := 1;\na = "x";',
+    'b = 1;',
+]
+
+
+def outcome(function):
+    try:
+        return "ok", function()
+    except (Error, Exception) as e:
+        return type(e).__name__, str(e)
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from lexer import *
+from parser import *
+from interpreter import *
+from asynchronous import *
+from session import Session
+from samples import PROGRAMS, outcome
+
+ENGINES = ("tree", "vm", "closure", "slots", "checked")
+LONG_SOURCE = "var a := 0;\n" + "a = a + 1;\n" * 20000 + "stdout a;"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_run_async_matches_interpret(source, engine):
+    expected = outcome(lambda: interpret(parse(run(source)), engine=engine))
+    assert outcome(lambda: asyncio.run(run_async(source, engine=engine, yield_every=1))) == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_async_sink_receives_the_output(engine):
+    source = 'var a := 1;\nstdout a;\nstdout "x" + a, 2.0;'
+    queue = asyncio.Queue()
+
+    async def execute():
+        written = await run_async(source, engine=engine, sink=queue, flush_size=1)
+        pieces = []
+        while not queue.empty():
+            pieces.append(queue.get_nowait())
+        return written, "".join(pieces)
+    assert asyncio.run(execute()) == (2, "1\nx1 2.0\n")
+
+
+def test_timeout_stops_a_long_script():
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run_async(LONG_SOURCE, timeout=0.001, yield_every=1))
+
+
+def test_scripts_share_the_event_loop():
+    async def execute():
+        gate = make_gate(2)
+        return await asyncio.gather(*[run_async(f"var a := {index};\nstdout a * 2;", gate=gate, yield_every=1)
+                                      for index in range(50)])
+    assert asyncio.run(execute()) == [[str(index * 2)] for index in range(50)]
+
+
+def test_session_execute_async_keeps_variables():
+    session = Session()
+
+    async def execute():
+        await session.execute_async("var a := 2;")
+        return await session.execute_async("stdout a * 3;")
+    assert asyncio.run(execute()) == ["6"]
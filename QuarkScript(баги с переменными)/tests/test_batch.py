@@ -0,0 +1,29 @@
+import os
+
+from batch import *
+
+
+def write_scripts(directory, count):
+    for index in range(count):
+        with open(os.path.join(directory, f"s{index}.qs"), "w", encoding="utf-8") as file:
+            file.write(f"stdout {index};\n")
+
+
+def test_overlapping_patterns_run_each_file_once(tmp_path):
+    write_scripts(str(tmp_path), 3)
+    directory = str(tmp_path)
+    paths = expand_paths([directory, os.path.join(directory, "*.qs"), os.path.join(directory, "s1.qs")])
+    assert paths == sorted(os.path.join(directory, f"s{index}.qs") for index in range(3))
+
+
+def test_run_batch_keeps_input_order(tmp_path):
+    write_scripts(str(tmp_path), 3)
+    paths = expand_paths([str(tmp_path)])
+    results = list(run_batch(paths, workers=1))
+    assert [result.output for result in results] == ["0\n", "1\n", "2\n"]
+
+
+def test_main_counts_distinct_files(tmp_path, capsys):
+    write_scripts(str(tmp_path), 2)
+    assert main([str(tmp_path), os.path.join(str(tmp_path), "*.qs"), "--workers", "1", "--quiet"]) == 0
+    assert capsys.readouterr().out.startswith("2 files, 2 passed, 0 failed")
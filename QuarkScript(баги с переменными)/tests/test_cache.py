@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from lexer import *
+from parser import *
+from cache import *
+from optimizer import optimize
+from samples import PROGRAMS
+
+SOURCE = 'var a: float = 1.5;\nvar b := -a + 2 * (3 - 1);\nstdout "x" + b + true, -0.0, a / 2;'
+PARSED_PROGRAMS = [source for source in PROGRAMS + [SOURCE] if source != 'stdout y;'] + [
+    "stdout " + "(1 + " * 5000 + "1" + ")" * 5000 + ";",
+    'stdout "a"' + ' + "b"' * 5000 + ";",
+]
+
+
+@pytest.mark.parametrize("source", PARSED_PROGRAMS)
+def test_encode_decode_round_trip(source):
+    ast = parse(run(source))
+    assert repr(decode_ast(encode_ast(ast))) == repr(ast)
+    optimized = optimize(ast)
+    assert repr(decode_ast(encode_ast(optimized))) == repr(optimized)
+
+
+def test_decode_keeps_value_types():
+    decoded = decode_ast(encode_ast(parse(run('stdout true, 1, 1.0, "1";'))))
+    values = [node.value for node in decoded[0].expression.values]
+    assert [type(value) for value in values] == [bool, int, float, str]
+
+
+def test_store_then_load_hits(tmp_path):
+    cache = ScriptCache(str(tmp_path))
+    ast = parse(run(SOURCE))
+    assert cache.load(SOURCE) is None
+    assert cache.store(SOURCE, ast)
+    assert repr(cache.load(SOURCE)) == repr(ast)
+    assert cache.load(SOURCE + " ") is None
+
+
+def test_optimized_entries_are_kept_apart(tmp_path):
+    ScriptCache(str(tmp_path)).store(SOURCE, parse(run(SOURCE)))
+    assert ScriptCache(str(tmp_path), optimized=True).load(SOURCE) is None
+
+
+def rewrite_entry(cache, source, data):
+    path = cache.entry_path(source_hash(source))
+    with open(path, "wb") as file:
+        file.write(data)
+    return path
+
+
+@pytest.mark.parametrize("header", [
+    HEADER.pack(b"XYZ", FORMAT_VERSION, 0, source_hash(SOURCE)),
+    HEADER.pack(MAGIC, FORMAT_VERSION + 1, 0, source_hash(SOURCE)),
+    HEADER.pack(MAGIC, FORMAT_VERSION, 1, source_hash(SOURCE)),
+    HEADER.pack(MAGIC, FORMAT_VERSION, 0, source_hash(SOURCE + " ")),
+])
+def test_header_mismatch_discards_entry(tmp_path, header):
+    cache = ScriptCache(str(tmp_path))
+    cache.store(SOURCE, parse(run(SOURCE)))
+    path = rewrite_entry(cache, SOURCE, header + encode_ast(parse(run(SOURCE))))
+    assert cache.load(SOURCE) is None
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize("payload", [
+    b"",
+    b"\x00garbage",
+    marshal.dumps((1, TAG_BINOP, "PLUS")),
+    marshal.dumps((2, TAG_INT, 1)),
+    marshal.dumps((1, 99)),
+    marshal.dumps((1, TAG_STRING)),
+])
+def test_corrupt_payload_discards_entry(tmp_path, payload):
+    cache = ScriptCache(str(tmp_path))
+    cache.store(SOURCE, parse(run(SOURCE)))
+    path = rewrite_entry(cache, SOURCE, HEADER.pack(MAGIC, FORMAT_VERSION, 0, source_hash(SOURCE)) + payload)
+    assert cache.load(SOURCE) is None
+    assert not os.path.exists(path)
+
+
+def test_truncated_header_discards_entry(tmp_path):
+    cache = ScriptCache(str(tmp_path))
+    cache.store(SOURCE, parse(run(SOURCE)))
+    path = rewrite_entry(cache, SOURCE, MAGIC)
+    assert cache.load(SOURCE) is None
+    assert not os.path.exists(path)
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ScriptCache(str(tmp_path), max_entries=2)
+    sources = ["stdout 1;", "stdout 2;", "stdout 3;"]
+    for second, source in enumerate(sources[:2], 1):
+        cache.store(source, parse(run(source)))
+        # метки времени выставляются явно, чтобы порядок не зависел от разрешения часов файловой системы
+        os.utime(cache.entry_path(source_hash(source)), ns=(second * 10 ** 9, second * 10 ** 9))
+    assert cache.load(sources[0]) is not None
+    cache.store(sources[2], parse(run(sources[2])))
+    assert cache.load(sources[1]) is None
+    assert cache.load(sources[0]) is not None
+    assert cache.load(sources[2]) is not None
+    assert len(os.listdir(tmp_path)) == 2
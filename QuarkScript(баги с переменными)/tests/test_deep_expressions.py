@@ -0,0 +1,28 @@
+
+import pytest
+
+from lexer import *
+from parser import *
+from interpreter import *
+from optimizer import optimize
+
+ENGINES = ("tree", "vm", "closure", "slots")
+
+DEPTH = 20000
+
+DEEP_PROGRAMS = {
+    "sum": ("var x := " + " + ".join(["1"] * DEPTH) + ";\nstdout x;", [str(DEPTH)]),
+    "minus": ("stdout " + "-" * DEPTH + "1;", ["1"]),
+    "parentheses": ("stdout " + "(1 + " * DEPTH + "1" + ")" * DEPTH + ";", [str(DEPTH + 1)]),
+    "concatenation": ('stdout "a"' + ' + "b"' * DEPTH + ";", ["a" + "b" * DEPTH]),
+}
+
+
+@pytest.mark.parametrize("engine", ENGINES + ("checked",))
+@pytest.mark.parametrize("name", sorted(DEEP_PROGRAMS))
+def test_deep_expressions(name, engine):
+    source, expected = DEEP_PROGRAMS[name]
+    ast = parse(run(source))
+    assert repr(ast)
+    assert interpret(ast, engine=engine) == expected
+    assert interpret(optimize(ast), engine=engine) == expected
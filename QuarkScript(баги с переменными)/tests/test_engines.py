@@ -0,0 +1,27 @@
+import pytest
+
+from lexer import *
+from parser import *
+from interpreter import *
+from samples import PROGRAMS, outcome
+
+ENGINES = ("vm", "closure", "slots")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_engine_matches_tree(source, engine):
+    expected = outcome(lambda: interpret(parse(run(source))))
+    assert outcome(lambda: interpret(parse(run(source)), engine=engine)) == expected
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_checked_engine_matches_tree_or_reports_type_errors(source):
+    ast = parse(run(source))
+    type_errors = typecheck(ast)
+    if type_errors:
+        # то, что отсеял статический проход, checked-движок не исполняет
+        with pytest.raises(TypeCheckError):
+            interpret(ast, engine="checked")
+    else:
+        assert outcome(lambda: interpret(ast, engine="checked")) == outcome(lambda: interpret(ast))
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from incremental import IncrementalDocument, full_parse, generate_source
+from samples import PROGRAMS, outcome
+
+EDIT_ALPHABET = ["x", ";", '"', " ", "\n", "1", ".", "+", "(", ")", "var ", "stdout ", ":=", "/", "a", ",", ":", "int", "="]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_edits_match_full_parse(seed):
+    random_generator = random.Random(seed)
+    document = IncrementalDocument(generate_source(40, seed))
+    for _ in range(150):
+        text = document.text
+        offset = random_generator.randrange(len(text) + 1)
+        removed = random_generator.randrange(min(4, len(text) - offset) + 1)
+        inserted = "".join(random_generator.choice(EDIT_ALPHABET) for _ in range(random_generator.randrange(6)))
+        got = outcome(lambda: repr(document.edit(offset, removed, inserted)))
+        assert got == outcome(lambda: repr(full_parse(document.text)))
+        if got[0] != "ok" and random_generator.random() < 0.5:
+            # иногда сразу исправляем текст обратно, иначе документ надолго застревает в ошибке
+            outcome(lambda: document.edit(offset, len(inserted), text[offset:offset + removed]))
+            assert document.text == text
+
+
+def test_incremental_document_opens_with_errors():
+    for source in PROGRAMS + ["var a := ;", 'stdout "open', "var @ := 1;"]:
+        document = IncrementalDocument(source)
+        expected = outcome(lambda: repr(full_parse(source)))
+        if document.error is None:
+            assert ("ok", repr(document.statements)) == expected
+        else:
+            assert (type(document.error).__name__, str(document.error)) == expected
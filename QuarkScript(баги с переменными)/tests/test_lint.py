@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from lexer import *
+from parser import *
+from exception import *
+from lint import check_source, check_paths
+from samples import PROGRAMS
+
+MULTI_ERROR_SOURCE = "\n".join([
+    "var a := 1;",
+    "var := 2;",
+    "stdout a;",
+    "var b : int 3;",
+    "stdout @;",
+    'stdout "open',
+    "var c := (1 + ;",
+    "stdout a $ 2;",
+    "stdout c;",
+])
+
+ALPHABET = ["x", ";", '"', "'", " ", "\n", "1", ".", "+", "(", ")", "var ", "stdout ", ":=", "@", "$", "²", "a", ",", ":",
+            "int", "="]
+
+
+def pipeline_error(text):
+    try:
+        parse(run(text))
+    except Error as e:
+        return e
+    except Exception:
+        pass
+    return None
+
+
+def test_every_diagnostic_is_reported_with_position():
+    result = check_source(MULTI_ERROR_SOURCE)
+    # колонки считаются так же, как в лексере обычного конвейера
+    positions = [(diagnostic.code_line, diagnostic.column) for diagnostic in result.diagnostics]
+    assert positions == [(5, 2), (6, 2), (8, 3), (2, 1), (4, 1), (7, 4)]
+    assert all(isinstance(diagnostic, Error) for diagnostic in result.diagnostics)
+    # из 'stdout @;' остается 'stdout ;', инструкции с ошибками парсера пропускаются
+    assert repr(result.statements) == repr(parse(run("var a := 1;\nstdout a;\nstdout ;\nstdout c;")))
+
+
+def test_lexer_diagnostics_come_first():
+    result = check_source("var := 1;\nstdout 2 @ 3;\nvar b : int 3;\nstdout $;")
+    kinds = [type(diagnostic) for diagnostic in result.diagnostics]
+    assert kinds == [InvalidCharacterError, InvalidCharacterError, Error, Error]
+    assert [diagnostic.code_line for diagnostic in result.diagnostics] == [2, 4, 1, 3]
+
+
+@pytest.mark.parametrize("source", [source for source in PROGRAMS if source != 'stdout y;'] + ["", "// only a comment\n"])
+def test_valid_source_has_no_diagnostics_and_the_same_tree(source):
+    result = check_source(source)
+    assert result.ok
+    assert repr(result.statements) == repr(parse(run(source)))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_first_diagnostic_is_where_the_pipeline_stops(seed):
+    random_generator = random.Random(seed)
+    for _ in range(200):
+        text = random_generator.choice(PROGRAMS)
+        for _ in range(random_generator.randrange(1, 4)):
+            offset = random_generator.randrange(len(text) + 1)
+            inserted = "".join(random_generator.choice(ALPHABET) for _ in range(random_generator.randrange(1, 4)))
+            text = text[:offset] + inserted + text[offset + random_generator.randrange(3):]
+        error = pipeline_error(text)
+        result = check_source(text)
+        if error is not None:
+            assert str(result.diagnostics[0]) == str(error), text
+
+
+def test_check_paths_counts_files_and_diagnostics(tmp_path, capsys):
+    (tmp_path / "good.qs").write_text("stdout 1;\n", encoding="utf-8")
+    (tmp_path / "bad.qs").write_text("stdout @;\nvar := 1;\n", encoding="utf-8")
+    assert check_paths([str(tmp_path), str(tmp_path / "*.qs")], quiet=True) == 1
+    output = capsys.readouterr().out.splitlines()
+    assert len(output) == 3
+    assert output[-1].startswith("2 files checked, 1 with errors, 2 diagnostics")
@@ -0,0 +1,38 @@
+import pytest
+
+from lexer import *
+from parser import *
+from interpreter import *
+from optimizer import optimize
+from nodepool import NodePool
+from samples import PROGRAMS
+
+PARSED_PROGRAMS = [source for source in PROGRAMS if source != 'stdout y;'] + [
+    "var a := 1;\nvar b := 1.0;\nvar c := true;\nstdout a, b, c, a + b, \"1\" + a;",
+    "stdout " + "(1 + " * 3000 + "1" + ")" * 3000 + ";",
+]
+
+
+@pytest.mark.parametrize("source", PARSED_PROGRAMS)
+def test_pool_round_trip_keeps_the_tree(source):
+    ast = parse(run(source))
+    assert repr(NodePool.from_ast(ast).to_ast()) == repr(ast)
+    optimized = optimize(ast)
+    assert repr(NodePool.from_ast(optimized).to_ast()) == repr(optimized)
+
+
+def test_pool_keeps_negative_zero_apart_from_zero():
+    ast = [
+        VariableDeclarationNode("a", None, FloatNumberNode(0.0)),
+        VariableDeclarationNode("b", None, FloatNumberNode(-0.0)),
+        AssignmentNode("a", FloatNumberNode(1.0)),
+        StdoutNode(ConcatenationNode([VariableNode("b"), StringNode("")])),
+    ]
+    assert interpret(ast) == ["-0.0"]
+    assert interpret(NodePool.from_ast(ast).to_ast()) == ["-0.0"]
+
+
+def test_pool_shares_equal_leaves_only():
+    pool = NodePool.from_ast(parse(run("stdout 1, 1, 1.0, true, x, x;")))
+    values = [pool.values[index] for index in range(len(pool)) if not pool.child_indices(index)]
+    assert [(type(value), value) for value in values] == [(int, 1), (float, 1.0), (bool, True), (str, "x")]
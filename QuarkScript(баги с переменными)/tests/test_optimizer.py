@@ -0,0 +1,21 @@
+import pytest
+
+from lexer import *
+from parser import *
+from interpreter import *
+from optimizer import Optimizer, optimize
+from samples import PROGRAMS, outcome
+
+
+@pytest.mark.parametrize("engine", ("tree", "vm", "closure"))
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_optimizer_keeps_results(source, engine):
+    expected = outcome(lambda: interpret(parse(run(source)), engine=engine))
+    assert outcome(lambda: interpret(optimize(parse(run(source))), engine=engine)) == expected
+
+
+def test_optimizer_reports_folds_without_printing(capsys):
+    optimizer = Optimizer(report=True)
+    optimizer.optimize(parse(run("var a := 1 + 2;\na = 5;\na = 6;\nstdout a * 2;")))
+    assert optimizer.messages == ["folded BinOpNode(PLUS) 1, 2 -> 3", "removed dead store a = 5"]
+    assert capsys.readouterr().out == ""
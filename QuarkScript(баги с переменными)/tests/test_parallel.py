@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lexer import *
+from incremental import generate_source
+from parallel import run_parallel
+from samples import PROGRAMS, outcome
+
+
+@pytest.mark.parametrize("min_chunk_size", (1, 7, 64))
+def test_run_parallel_matches_run(min_chunk_size):
+    sources = PROGRAMS + [generate_source(300, 1), 'stdout "a\nb";\nvar x := 1;\n' * 20, "stdout 1;\nvar @ := 2;\n" * 10]
+    with ThreadPoolExecutor(4) as executor:
+        for source in sources:
+            expected = outcome(lambda: [repr(token) for token in run(source)])
+            got = outcome(lambda: [repr(token) for token in run_parallel(source, 4, min_chunk_size, executor=executor)])
+            assert got == expected
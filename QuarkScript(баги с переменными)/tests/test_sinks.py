@@ -0,0 +1,41 @@
+import io
+
+import pytest
+
+from lexer import *
+from parser import *
+from interpreter import *
+from samples import PROGRAMS, outcome
+
+SOURCE = 'var a := 1;\nstdout a;\nstdout "x" + a, 2.0;\nstdout 2.0;'
+
+
+@pytest.mark.parametrize("engine", ("tree", "vm", "closure", "slots"))
+def test_sink_receives_what_interpret_returns(engine):
+    ast = parse(run(SOURCE))
+    expected = interpret(ast, engine=engine)
+    stream = io.StringIO()
+    assert interpret(ast, engine=engine, sink=stream) == len(expected)
+    assert stream.getvalue() == "".join(f"{result}\n" for result in expected)
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_sink_keeps_output_written_before_an_error(source):
+    pieces = []
+    got = outcome(lambda: interpret(parse(run(source)), sink=pieces.append, flush_size=1))
+    expected = outcome(lambda: interpret(parse(run(source))))
+    if expected[0] == "ok":
+        assert got == ("ok", len(expected[1]))
+        assert "".join(pieces) == "".join(f"{result}\n" for result in expected[1])
+    else:
+        assert got == expected
+
+
+def test_sink_flushes_by_size():
+    pieces = []
+    sink = CallbackSink(pieces.append, flush_size=4)
+    for result in ("ab", "c", "de"):
+        sink.write(result)
+    assert pieces == ["ab\nc\n"]
+    sink.close()
+    assert pieces == ["ab\nc\n", "de\n"]
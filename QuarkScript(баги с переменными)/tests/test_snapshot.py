@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from lexer import *
+from parser import *
+from interpreter import *
+from snapshot import *
+from samples import outcome
+
+SOURCE = "var a := 2;\nvar s : string = \"x\";\nvar f := a * 1.5;\nstdout \"v\" + a, s, f;\nvar g := a + 1;\nstdout g;\n"
+
+
+def full_run(source):
+    return outcome(lambda: interpret(parse(run(source))))
+
+
+def warm_run(source, path):
+    restored = []
+
+    def execute():
+        results, hit = execute_with_snapshot(source, path)
+        restored.append(hit)
+        return results
+    return outcome(execute), restored[0] if restored else None
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "script.qs.qss")
+
+
+def test_second_run_restores_the_prelude(path):
+    assert warm_run(SOURCE, path) == (full_run(SOURCE), False)
+    assert warm_run(SOURCE, path) == (full_run(SOURCE), True)
+    assert Snapshot.load(path).variables == {"a": 2, "s": "x", "f": 3.0}
+
+
+def test_edit_after_the_prelude_keeps_the_snapshot(path):
+    warm_run(SOURCE, path)
+    edited = SOURCE.replace("stdout g;", "stdout g * 2;")
+    assert warm_run(edited, path) == (full_run(edited), True)
+
+
+def test_prelude_edit_misses_and_rewrites_the_snapshot(path):
+    warm_run(SOURCE, path)
+    edited = SOURCE.replace("var a := 2;", "var a := 5;")
+    assert warm_run(edited, path) == (full_run(edited), False)
+    assert warm_run(edited, path) == (full_run(edited), True)
+    assert Snapshot.load(path).variables["a"] == 5
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"QSS\x01garbage",
+    HEADER.pack(MAGIC, FORMAT_VERSION + 1, 0, 1, 1, prefix_hash(SOURCE, 0)) + marshal.dumps(({}, {})),
+    HEADER.pack(MAGIC, FORMAT_VERSION, 0, 1, 1, prefix_hash(SOURCE, 0)) + b"\xff\x00",
+    HEADER.pack(MAGIC, FORMAT_VERSION, 0, 1, 1, prefix_hash(SOURCE, 0)) + marshal.dumps(({"a": 1}, {})),
+])
+def test_corrupt_snapshot_falls_back_to_a_full_run(path, data):
+    with open(path, "wb") as file:
+        file.write(data)
+    assert Snapshot.load(path) is None
+    assert warm_run(SOURCE, path) == (full_run(SOURCE), False)
+    assert Snapshot.load(path) is not None
+
+
+# Последняя инструкция прелюдии не попадает в снимок: дописанный текст может продолжить ее число или имя
+@pytest.mark.parametrize("tail", ["", "5;\nstdout b;", "\nstdout b;", " // comment\nstdout b + a;", ".5;\nstdout b;"])
+def test_prelude_ending_at_end_of_file(path, tail):
+    source = "var a := 1;\nvar b := 2;"
+    warm_run(source, path)
+    snapshot = Snapshot.load(path)
+    assert snapshot.prefix_length == source.index("var b")
+    assert warm_run(source + tail, path) == (full_run(source + tail), True)
+
+
+@pytest.mark.parametrize("tail", ["stdout @;\n", "stdout a / 0;\n", "var a := 3;\n", 'stdout "open\n'])
+def test_errors_after_the_prelude_match_a_full_run(path, tail):
+    warm_run(SOURCE, path)
+    edited = SOURCE + tail
+    assert Snapshot.load(path).matches(edited)
+    assert warm_run(edited, path)[0] == full_run(edited)
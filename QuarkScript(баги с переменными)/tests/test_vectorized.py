@@ -0,0 +1,158 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from lexer import *
+from parser import *
+from exception import *
+from interpreter import *
+from vectorized import evaluate_batch
+
+ROWS = 12
+TYPES = {"f": "TYPE_BOOL"}
+
+
+def make_bindings(random_generator):
+    return {
+        "a": np.array([random_generator.randrange(-2, 3) for _ in range(ROWS)]),
+        "b": np.array([random_generator.choice([0, 0.5, -1.5, 2.0]) for _ in range(ROWS)]),
+        "c": np.array([random_generator.random() < 0.5 for _ in range(ROWS)]),
+        "f": np.array([random_generator.random() < 0.5 for _ in range(ROWS)]),
+        "s": np.array([random_generator.choice(["x", "yy"]) for _ in range(ROWS)]),
+        "big": np.array([2 ** 40, 3 ** 30] * (ROWS // 2)),
+    }
+
+
+def literal(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return f'"{value}"'
+    return repr(value)
+
+
+# Та же строка, исполненная обычным interpret: привязки становятся объявлениями перед программой
+def scalar_run(source, row):
+    prelude = "".join(f"var {name}: {TYPES[name][5:].lower()} = {literal(value)}; " if name in TYPES
+                      else f"var {name} := {literal(value)}; " for name, value in row.items())
+    pieces = []
+    try:
+        interpret(parse(run(prelude + source)), sink=pieces.append, flush_size=1)
+    except (Error, Exception) as e:
+        return "".join(pieces), e
+    return "".join(pieces), None
+
+
+def batch_lines(result, row, count):
+    lines = []
+    for output in result.outputs[:count]:
+        if output is not None:
+            value = output[row]
+            lines.append(f"{value.item() if hasattr(value, 'item') else value}\n")
+    return "".join(lines)
+
+
+def assert_rows_match_interpret(source, bindings):
+    result = evaluate_batch(parse(run(source)), bindings, TYPES)
+    for row in range(ROWS):
+        expected_output, expected_error = scalar_run(source, {name: values[row].item() for name, values in bindings.items()})
+        error = result.errors[row]
+        assert (type(error), str(error)) == (type(expected_error), str(expected_error)), (source, row)
+        assert bool(result.failed[row]) == (expected_error is not None)
+        count = len(result.outputs) if error is None else expected_output.count("\n")
+        assert batch_lines(result, row, count) == expected_output, (source, row)
+
+
+def random_expression(random_generator, depth=0):
+    choice = random_generator.randrange(10 if depth < 3 else 5)
+    if choice == 0:
+        return str(random_generator.randrange(4))
+    elif choice == 1:
+        return f"{random_generator.randrange(5)}.{random_generator.randrange(10)}"
+    elif choice == 2:
+        return random_generator.choice(["a", "b", "c", "f", "s", "a", "b"])
+    elif choice == 3:
+        return random_generator.choice(["true", "false", '"q"', "big"])
+    elif choice == 4:
+        return random_generator.choice(["v1", "v2", "a", "b"])
+    elif choice == 5:
+        return f"-{random_expression(random_generator, depth + 1)}"
+    elif choice == 6:
+        return f"({random_expression(random_generator, depth + 1)})"
+    operator_symbol = random_generator.choice("+-*/")
+    return f"{random_expression(random_generator, depth + 1)} {operator_symbol} {random_expression(random_generator, depth + 1)}"
+
+
+def random_program(random_generator):
+    lines = []
+    for index in range(1, random_generator.randrange(2, 6)):
+        kind = random_generator.randrange(6)
+        if kind == 0:
+            lines.append(f"var v{index} := {random_expression(random_generator)};")
+        elif kind == 1:
+            var_type = random_generator.choice(["int", "float", "bool", "string"])
+            lines.append(f"var v{index} : {var_type} = {random_expression(random_generator)};")
+        elif kind == 2:
+            lines.append(f"stdout {random_expression(random_generator)};")
+        elif kind == 3:
+            lines.append(f"stdout {random_expression(random_generator)}, {random_expression(random_generator)};")
+        elif kind == 4:
+            lines.append(f"v{random_generator.randrange(1, 4)} = {random_expression(random_generator)};")
+        else:
+            lines.append(f'stdout "x" + {random_expression(random_generator)} + {random_expression(random_generator)};')
+    return "\n".join(lines)
+
+
+SOURCES = [
+    "stdout a + 1, a * 2.5, -a, a / 2;",
+    "stdout 10 / a;\nstdout a;",
+    "var q := b / a;\nstdout q;",
+    "stdout big * big * big, big * a - big;",
+    "var x := big * big;\nx = x + 1;\nstdout x;",
+    "stdout s + a;",
+    "stdout s * a, s + s;",
+    'stdout "v=" + a + s + b;',
+    "stdout f + f, c + c, c + f;",
+    "var g: bool = f;\ng = c;\nstdout g;",
+    "var i: int = b;",
+    "a = 1.5;\nstdout a;",
+    "stdout 2.0;\nstdout 7;",
+    "stdout y;",
+]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_batch_matches_interpret_row_by_row(source):
+    assert_rows_match_interpret(source, make_bindings(random.Random(3)))
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_random_programs_match_interpret_row_by_row(seed):
+    random_generator = random.Random(seed)
+    for _ in range(25):
+        source = random_program(random_generator)
+        try:
+            parse(run(source))
+        except (Error, Exception):
+            continue
+        assert_rows_match_interpret(source, make_bindings(random_generator))
+
+
+def test_division_by_zero_fails_only_its_rows():
+    result = evaluate_batch(parse(run("stdout 10 / a;")), {"a": [1, 0, 4, 0]})
+    assert result.failed.tolist() == [False, True, False, True]
+    assert all(isinstance(result.errors[row], ZeroDivisionError) for row in (1, 3))
+    assert [result.outputs[0][row] for row in (0, 2)] == ["10.0", "2.5"]
+
+
+def test_int64_overflow_falls_back_to_python_integers():
+    result = evaluate_batch(parse(run("var x := a * a * a;\nstdout x;")), {"a": [2 ** 40, 3]})
+    assert [result.outputs[0][row] for row in range(2)] == [str(2 ** 120), "27"]
+    assert not result.failed.any()
+
+
+def test_strings_are_computed_per_element():
+    result = evaluate_batch(parse(run("stdout s * n;")), {"s": ["ab", "c"], "n": [2, 3]})
+    assert [result.outputs[0][row] for row in range(2)] == ["abab", "ccc"]
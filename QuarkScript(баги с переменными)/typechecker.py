@@ -0,0 +1,194 @@
+from parser import *
+
+ANY_VALUE = frozenset((int, float, str, bool))
+
+# какие python-значения может хранить переменная объявленного типа (bool является подклассом int)
+DECLARED_VALUE_TYPES = {
+    "TYPE_INT": frozenset((int, bool)),
+    "TYPE_FLOAT": frozenset((int, bool, float)),
+    "TYPE_STRING": frozenset((str,)),
+    "TYPE_BOOL": frozenset((bool,)),
+}
+
+INFERRED_TYPES = {
+    int: "TYPE_INT",
+    bool: "TYPE_INT",
+    float: "TYPE_FLOAT",
+    str: "TYPE_STRING",
+}
+
+# тип результата операции зависит только от типов операндов, поэтому его можно узнать на образцах
+SAMPLE_VALUES = {int: 2, float: 2.5, str: "s", bool: True}
+
+LITERAL_TYPES = {
+    IntNumberNode: frozenset((int,)),
+    FloatNumberNode: frozenset((float,)),
+    StringNode: frozenset((str,)),
+    BooleanNode: frozenset((bool,)),
+}
+
+
+def describe(value_types):
+    return " | ".join(sorted(value_type.__name__ for value_type in value_types))
+
+
+def binary_result_types(op, left_types, right_types):
+    result = set()
+    for left_type in left_types:
+        for right_type in right_types:
+            left_value = SAMPLE_VALUES[left_type]
+            right_value = SAMPLE_VALUES[right_type]
+            try:
+                if op == "PLUS":
+                    value = left_value + right_value
+                elif op == "MINUS":
+                    value = left_value - right_value
+                elif op == "MULTIPLY":
+                    value = left_value * right_value
+                elif op == "DIVIDE":
+                    value = left_value / right_value
+                else:
+                    continue
+            except TypeError:
+                continue
+            result.add(type(value))
+    return frozenset(result)
+
+
+# Объявления и присваивания получают resolved_type с объявленным типом переменной и флаг needs_check,
+# выражения - resolved_type с множеством python-типов, которые может вернуть узел.
+class TypeChecker:
+    def __init__(self):
+        self.variables = {}
+        self.variable_types = {}
+        self.errors = []
+
+    def error(self, details):
+        self.errors.append(TypeCheckError(details))
+
+    def check(self, ast):
+        for node in ast:
+            if isinstance(node, VariableDeclarationNode):
+                self.check_declaration(node)
+            elif isinstance(node, AssignmentNode):
+                self.check_assignment(node)
+            elif isinstance(node, StdoutNode):
+                self.check_stdout(node)
+            else:
+                self.infer(node)
+        return self.errors
+
+    def check_stdout(self, node):
+        if isinstance(node.expression, MultiValueNode):
+            for value in node.expression.values:
+                self.infer(value)
+        elif node.expression is not None:
+            self.infer(node.expression)
+
+    def check_declaration(self, node):
+        value_types = self.infer(node.value)
+        node.needs_check = False
+
+        if node.type is None:
+            candidates = {INFERRED_TYPES[value_type] for value_type in value_types}
+            if len(candidates) == 1:
+                node.resolved_type = candidates.pop()
+                allowed = DECLARED_VALUE_TYPES[node.resolved_type]
+            else:
+                # тип выводится только во время исполнения, проверки для этой переменной остаются
+                node.resolved_type = None
+                node.needs_check = True
+                allowed = frozenset().union(*(DECLARED_VALUE_TYPES[candidate] for candidate in candidates))
+        else:
+            node.resolved_type = node.type
+            allowed = DECLARED_VALUE_TYPES[node.type]
+            if not value_types & allowed:
+                self.error(f"Variable '{node.name}' is declared as {node.type} but its value is {describe(value_types)}")
+            elif not value_types <= allowed:
+                node.needs_check = True
+
+        if node.name in self.variables:
+            self.error(f"Variable '{node.name}' already exists")
+            return
+        self.variables[node.name] = allowed
+        self.variable_types[node.name] = node.resolved_type
+
+    def check_assignment(self, node):
+        value_types = self.infer(node.expression)
+        node.needs_check = False
+
+        if node.variable_name not in self.variables:
+            self.error(f"Name '{node.variable_name}' is not defined")
+            node.resolved_type = None
+            return
+
+        node.resolved_type = self.variable_types[node.variable_name]
+        if node.resolved_type is None:
+            node.needs_check = True
+            return
+        allowed = DECLARED_VALUE_TYPES[node.resolved_type]
+        if not value_types & allowed:
+            self.error(f"Cannot assign {describe(value_types)} to variable '{node.variable_name}' of type {node.resolved_type}")
+        elif not value_types <= allowed:
+            node.needs_check = True
+
+    # Типы выводятся в обратном порядке на явном стеке: дети раньше родителя, поэтому ошибки идут
+    # в том же порядке, что при рекурсивном спуске, а глубина выражения ограничена только памятью.
+    def infer(self, node):
+        inferred = []
+        stack = [(node, False)]
+        while stack:
+            node, ready = stack.pop()
+            if ready:
+                value_types = self.combine(node, inferred)
+            elif isinstance(node, (BinOpNode, UnaryOpNode, ConcatenationNode)):
+                stack.append((node, True))
+                for child in reversed(node_children(node)):
+                    stack.append((child, False))
+                continue
+            else:
+                value_types = self.infer_leaf(node)
+            if node is not None:
+                node.resolved_type = value_types
+            inferred.append(value_types)
+        return inferred[0]
+
+    def infer_leaf(self, node):
+        if type(node) in LITERAL_TYPES:
+            return LITERAL_TYPES[type(node)]
+        elif isinstance(node, VariableNode):
+            if node.name not in self.variables:
+                self.error(f"Variable {node.name} is not defined")
+                return ANY_VALUE
+            return self.variables[node.name]
+        return ANY_VALUE
+
+    # тип операции по уже выведенным типам детей, которые лежат на вершине inferred
+    def combine(self, node, inferred):
+        if isinstance(node, BinOpNode):
+            right_types = inferred.pop()
+            left_types = inferred.pop()
+            node.bool_plus = (node.op == "PLUS" and isinstance(node.left, VariableNode)
+                              and isinstance(node.right, VariableNode)
+                              and self.variable_types.get(node.left.name) == "TYPE_BOOL"
+                              and self.variable_types.get(node.right.name) == "TYPE_BOOL")
+            if node.bool_plus:
+                return DECLARED_VALUE_TYPES["TYPE_BOOL"]
+            result = binary_result_types(node.op, left_types, right_types)
+            if not result:
+                self.error(f"Unsupported operand types for {node.op}: {describe(left_types)} and {describe(right_types)}")
+                return ANY_VALUE
+            return result
+        elif isinstance(node, UnaryOpNode):
+            operand_types = inferred.pop()
+            result = frozenset(type(-SAMPLE_VALUES[value_type]) for value_type in operand_types if value_type is not str)
+            if node.op == "MINUS" and not result:
+                self.error(f"Bad operand type for unary {node.op}: {describe(operand_types)}")
+                return ANY_VALUE
+            return result or ANY_VALUE
+        del inferred[len(inferred) - len(node.values):]
+        return LITERAL_TYPES[StringNode]
+
+
+def typecheck(ast):
+    return TypeChecker().check(ast)
@@ -0,0 +1,59 @@
+# Типы QuarkScript и типы Python, которые им соответствуют: общие для всех движков и оптимизатора
+VALUE_TYPES = {
+    "TYPE_INT": int,
+    "TYPE_FLOAT": (int, float),
+    "TYPE_STRING": str,
+    "TYPE_BOOL": bool,
+}
+
+DECLARATION_ERRORS = {
+    "TYPE_INT": "Expected TYPE_INT, got {}",
+    "TYPE_FLOAT": "Expected TYPE_FLOAT, got {}",
+    "TYPE_STRING": "Expected TYPE_STRING, got {}",
+    "TYPE_BOOL": "Expected TYPE_BOOL got {}",
+}
+
+ASSIGNMENT_ERRORS = {
+    "TYPE_INT": "Expected TYPE_INT, got {}",
+    "TYPE_FLOAT": "Expected TYPE_FLOAT, got {}",
+    "TYPE_STRING": "Expected TYPE_STRING, got {}",
+    "TYPE_BOOL": "Excepted TYPE_BOOL, got {}",
+}
+
+
+# bool - подкласс int, поэтому true без аннотации выводится как TYPE_INT
+def infer_type_from_class(python_type):
+    if issubclass(python_type, int):
+        return "TYPE_INT"
+    elif issubclass(python_type, float):
+        return "TYPE_FLOAT"
+    elif issubclass(python_type, str):
+        return "TYPE_STRING"
+    return None
+
+
+def infer_type_from_value(value):
+    if isinstance(value, int):
+        return "TYPE_INT"
+    elif isinstance(value, float):
+        return "TYPE_FLOAT"
+    elif isinstance(value, str):
+        return "TYPE_STRING"
+    return None
+
+
+def value_matches_type(value, var_type):
+    python_types = VALUE_TYPES.get(var_type)
+    return python_types is not None and isinstance(value, python_types)
+
+
+def check_class(var_type, python_type, errors):
+    python_types = VALUE_TYPES.get(var_type)
+    if python_types is not None and not issubclass(python_type, python_types):
+        raise TypeError(errors[var_type].format(python_type))
+
+
+def check_value_type(var_type, value, errors):
+    python_types = VALUE_TYPES.get(var_type)
+    if python_types is not None and not isinstance(value, python_types):
+        raise TypeError(errors[var_type].format(type(value)))
@@ -0,0 +1,255 @@
+import operator
+
+import numpy as np
+
+from parser import *
+from exception import *
+from values import *
+
+PYTHON_TYPES = {"b": bool, "i": int, "u": int, "f": float, "U": str}
+# за этой границей int64 может переполниться, а в Python целые не переполняются
+INT64_SAFE_LIMIT = 2.0 ** 62
+ARITHMETIC = {
+    "PLUS": operator.add,
+    "MINUS": operator.sub,
+    "MULTIPLY": operator.mul,
+}
+
+
+def as_numeric(value):
+    # в NumPy True + True == True, а в Python это 2
+    if isinstance(value, np.ndarray) and value.dtype.kind == "b":
+        return value.astype(np.int64)
+    return value
+
+
+class BatchResult:
+    def __init__(self, outputs, values, errors):
+        self.outputs = outputs
+        self.values = values
+        self.errors = errors
+        self.failed = np.array([error is not None for error in errors.tolist()], dtype=bool)
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __repr__(self):
+        return f"BatchResult(rows={len(self.errors)}, outputs={len(self.outputs)}, failed={int(self.failed.sum())})"
+
+
+# Программа исполняется один раз, но каждое значение - массив по всем наборам переменных.
+# Ошибка, зависящая от значений (деление на ноль), выключает только свои строки через маску alive;
+# ошибка, одинаковая для всех строк (тип, имя), выключает все еще живые строки.
+class BatchInterpreter:
+    def __init__(self, ast, bindings, types=None, size=None):
+        self.ast = ast
+        self.variables = {}
+        self.variable_types = {}
+        for name, values in bindings.items():
+            values = np.asarray(values)
+            if values.dtype.kind == "U":
+                values = values.astype(object)
+            if size is None:
+                size = len(values)
+            elif len(values) != size:
+                raise ValueError(f"Binding '{name}' has {len(values)} rows, expected {size}")
+            self.variables[name] = values
+        if size is None:
+            raise ValueError("size is required when there are no bindings")
+        self.size = size
+        self.alive = np.ones(size, dtype=bool)
+        self.errors = np.full(size, None, dtype=object)
+        # привязанные переменные ведут себя как объявленные через ':=', если тип не задан явно
+        for name, values in self.variables.items():
+            self.variable_types[name] = (types or {}).get(name) or infer_type_from_class(self.element_type(values))
+
+    def element_type(self, value):
+        if not isinstance(value, np.ndarray):
+            return type(value)
+        if value.dtype.kind in PYTHON_TYPES:
+            return PYTHON_TYPES[value.dtype.kind]
+        # object-массивы получаются из однородных операций, поэтому тип берется по первой живой строке
+        rows = np.flatnonzero(self.alive)
+        return type(value[rows[0]]) if len(rows) else object
+
+    def fail(self, mask, error):
+        rows = mask & self.alive
+        self.errors[rows] = error
+        self.alive &= ~rows
+
+    def fail_row(self, row, error):
+        self.errors[row] = error
+        self.alive[row] = False
+
+    def elementwise(self, function, *operands):
+        result = np.zeros(self.size, dtype=object)
+        columns = [operand.tolist() if isinstance(operand, np.ndarray) else None for operand in operands]
+        for row in np.flatnonzero(self.alive).tolist():
+            arguments = [operand if column is None else column[row] for operand, column in zip(operands, columns)]
+            try:
+                result[row] = function(*arguments)
+            except Exception as e:
+                self.fail_row(row, e)
+        return result
+
+    def arithmetic(self, function, left, right):
+        if not isinstance(left, np.ndarray) and not isinstance(right, np.ndarray):
+            return function(left, right)
+        try:
+            with np.errstate(all="ignore"):
+                result = function(as_numeric(left), as_numeric(right))
+        except Exception:
+            # NumPy отказался (строки, большие целые) - считаем по строкам, чтобы ошибки были как у Python
+            return self.elementwise(function, left, right)
+        if result.dtype.kind == "i" and function is not operator.truediv:
+            with np.errstate(all="ignore"):
+                estimate = function(np.asarray(as_numeric(left), dtype=float), np.asarray(as_numeric(right), dtype=float))
+            if np.any(np.abs(estimate[self.alive]) >= INT64_SAFE_LIMIT):
+                return self.elementwise(function, left, right)
+        return result
+
+    def run(self):
+        outputs = []
+        values = []
+        for node in self.ast:
+            if not self.alive.any():
+                break
+            try:
+                if isinstance(node, StdoutNode):
+                    value = self.visit_StdoutNode(node)
+                    values.append(value)
+                    outputs.append(self.broadcast(value))
+                else:
+                    self.visit(node)
+            except (Error, Exception) as e:
+                self.fail(self.alive, e)
+        return BatchResult(outputs, values, self.errors)
+
+    def broadcast(self, value):
+        if value is None or isinstance(value, np.ndarray):
+            return value
+        if isinstance(value, float):
+            return np.full(self.size, value)
+        return np.full(self.size, value, dtype=object)
+
+    def visit(self, node):
+        if isinstance(node, (IntNumberNode, FloatNumberNode, StringNode, BooleanNode)):
+            return node.value
+        elif isinstance(node, BinOpNode):
+            return self.visit_BinOpNode(node)
+        elif isinstance(node, VariableDeclarationNode):
+            return self.visit_VariableDeclarationNode(node)
+        elif isinstance(node, VariableNode):
+            return self.visit_VariableNode(node)
+        elif isinstance(node, ConcatenationNode):
+            return self.visit_ConcatenationNode(node)
+        elif isinstance(node, StdoutNode):
+            return self.visit_StdoutNode(node)
+        elif isinstance(node, UnaryOpNode):
+            return self.visit_UnaryOpNode(node)
+        elif isinstance(node, AssignmentNode):
+            return self.visit_AssignmentNode(node)
+        else:
+            raise Exception(f"No visit_{type(node).__name__} method defined.")
+
+    def visit_BinOpNode(self, node):
+        left_value = self.visit(node.left)
+        right_value = self.visit(node.right)
+        left_type = self.variable_types.get(node.left.name) if isinstance(node.left, VariableNode) else None
+        right_type = self.variable_types.get(node.right.name) if isinstance(node.right, VariableNode) else None
+
+        if node.op == "PLUS" and left_type == "TYPE_BOOL" and right_type == "TYPE_BOOL":
+            if isinstance(left_value, np.ndarray) or isinstance(right_value, np.ndarray):
+                return np.logical_or(left_value, right_value)
+            return left_value or right_value
+        elif node.op in ARITHMETIC:
+            return self.arithmetic(ARITHMETIC[node.op], left_value, right_value)
+        elif node.op == "DIVIDE":
+            if not isinstance(right_value, np.ndarray):
+                if right_value != 0:
+                    return self.arithmetic(operator.truediv, left_value, right_value)
+                raise ZeroDivisionError("Division by zero")
+            zero = np.asarray(right_value == 0, dtype=bool)
+            if zero.any():
+                self.fail(zero, ZeroDivisionError("Division by zero"))
+                # единица того же dtype, чтобы не изменить тип делителя в живых строках
+                right_value = np.where(zero, np.ones(1, dtype=right_value.dtype), right_value)
+            return self.arithmetic(operator.truediv, left_value, right_value)
+        else:
+            raise Exception(f"Unknown binary operator: {node.op}")
+
+    def visit_UnaryOpNode(self, node):
+        value = self.visit(node.node)
+
+        if node.op == "MINUS":
+            if not isinstance(value, np.ndarray):
+                return -value
+            try:
+                return -as_numeric(value)
+            except Exception:
+                return self.elementwise(operator.neg, value)
+        else:
+            raise Exception(f"Unknown unary operator: {node.op}")
+
+    def visit_ConcatenationNode(self, node):
+        return self.join_values([self.visit(value_node) for value_node in node.values], node.separator)
+
+    def join_values(self, values, separator):
+        if not any(isinstance(value, np.ndarray) for value in values):
+            return separator.join([str(value) for value in values])
+        return self.elementwise(lambda *row: separator.join([str(value) for value in row]), *values)
+
+    def visit_VariableNode(self, node):
+        var_name = node.name
+        if var_name in self.variables:
+            return self.variables[var_name]
+        else:
+            raise Exception(f"Variable {var_name} is not defined")
+
+    def check_type(self, var_type, var_value, errors):
+        check_class(var_type, self.element_type(var_value), errors)
+
+    def visit_VariableDeclarationNode(self, node):
+        var_name = node.name
+        var_value = self.visit(node.value)
+
+        if node.type is None:
+            var_type = infer_type_from_class(self.element_type(var_value))
+            if var_type is None:
+                raise Exception(f"InterpreterVarDecErr: Cannot infer type for variable '{var_name}'")
+        else:
+            var_type = node.type
+        self.check_type(var_type, var_value, DECLARATION_ERRORS)
+
+        if var_name in self.variables:
+            raise InterpreterErrors("Invalid Syntax", f"Variable '{var_name}' already exists")
+        self.variables[var_name] = var_value
+        self.variable_types[var_name] = var_type
+        return var_value
+
+    def visit_AssignmentNode(self, node):
+        var_name = node.variable_name
+        var_value = self.visit(node.expression)
+
+        if var_name not in self.variables:
+            raise Exception(f"Name '{var_name}' is not defined")
+        self.check_type(self.variable_types[var_name], var_value, ASSIGNMENT_ERRORS)
+        self.variables[var_name] = var_value
+        return var_value
+
+    def visit_StdoutNode(self, node):
+        if node.expression is None:
+            return None
+        if isinstance(node.expression, MultiValueNode):
+            return self.join_values([self.visit(value_node) for value_node in node.expression.values],
+                                    node.expression.separator)
+        elif isinstance(node.expression, FloatNumberNode):
+            return float(self.visit(node.expression))
+        value = self.visit(node.expression)
+        if not isinstance(value, np.ndarray):
+            return str(value)
+        return self.elementwise(str, value)
+
+
+def evaluate_batch(ast, bindings, types=None, size=None):
+    return BatchInterpreter(ast, bindings, types, size).run()
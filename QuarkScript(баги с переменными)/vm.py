@@ -0,0 +1,112 @@
+from compiler import *
+from values import *
+
+
+class VirtualMachine:
+    def __init__(self):
+        self.variables = {}
+        self.variable_types = {}
+
+    def declare(self, var_name, var_type, var_value):
+        if var_type is None:
+            var_type = infer_type_from_value(var_value)
+            if var_type is None:
+                raise Exception(f"InterpreterVarDecErr: Cannot infer type for variable '{var_name}'")
+        check_value_type(var_type, var_value, DECLARATION_ERRORS)
+
+        if var_name in self.variables:
+            raise InterpreterErrors("Invalid Syntax", f"Variable '{var_name}' already exists")
+        self.variables[var_name] = var_value
+        self.variable_types[var_name] = var_type
+
+    def store(self, var_name, var_value):
+        if var_name not in self.variables:
+            raise Exception(f"Name '{var_name}' is not defined")
+
+        check_value_type(self.variable_types[var_name], var_value, ASSIGNMENT_ERRORS)
+
+        self.variables[var_name] = var_value
+
+    def run(self, code):
+        return list(self.execute(code))
+
+    # код одной инструкции: результат stdout или None
+    def run_statement(self, code):
+        results = self.run(code)
+        return results[0] if results else None
+
+    def execute(self, code):
+        LOAD_CONST = Opcode.LOAD_CONST
+        LOAD_VAR = Opcode.LOAD_VAR
+        BINARY_ADD = Opcode.BINARY_ADD
+        BINARY_ADD_VARS = Opcode.BINARY_ADD_VARS
+        BINARY_SUBTRACT = Opcode.BINARY_SUBTRACT
+        BINARY_MULTIPLY = Opcode.BINARY_MULTIPLY
+        BINARY_DIVIDE = Opcode.BINARY_DIVIDE
+        UNARY_NEGATIVE = Opcode.UNARY_NEGATIVE
+        TO_STR = Opcode.TO_STR
+        JOIN = Opcode.JOIN
+        STDOUT = Opcode.STDOUT
+        DECLARE = Opcode.DECLARE
+        STORE = Opcode.STORE
+        POP_TOP = Opcode.POP_TOP
+
+        variables = self.variables
+        variable_types = self.variable_types
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        # в языке нет переходов, поэтому программа исполняется одним проходом по инструкциям
+        for opcode, argument in code.instructions:
+            if opcode is LOAD_CONST:
+                push(argument)
+            elif opcode is LOAD_VAR:
+                if argument not in variables:
+                    raise Exception(f"Variable {argument} is not defined")
+                push(variables[argument])
+            elif opcode is BINARY_ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif opcode is TO_STR:
+                stack[-1] = str(stack[-1])
+            elif opcode is STDOUT:
+                yield pop()
+            elif opcode is DECLARE:
+                self.declare(argument[0], argument[1], pop())
+            elif opcode is STORE:
+                self.store(argument, pop())
+            elif opcode is BINARY_SUBTRACT:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif opcode is BINARY_MULTIPLY:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif opcode is BINARY_DIVIDE:
+                right = pop()
+                if right != 0:
+                    stack[-1] = stack[-1] / right
+                else:
+                    raise ZeroDivisionError("Division by zero")
+            elif opcode is BINARY_ADD_VARS:
+                right = pop()
+                left = stack[-1]
+                if variable_types.get(argument[0]) == "TYPE_BOOL" and variable_types.get(argument[1]) == "TYPE_BOOL":
+                    stack[-1] = left or right
+                else:
+                    stack[-1] = left + right
+            elif opcode is UNARY_NEGATIVE:
+                stack[-1] = -stack[-1]
+            elif opcode is JOIN:
+                count, separator = argument
+                values = stack[-count:]
+                del stack[-count:]
+                push(separator.join([str(value) for value in values]))
+            elif opcode is POP_TOP:
+                pop()
+            else:
+                raise Exception(argument)
+
+
+def run_bytecode(code):
+    return VirtualMachine().run(code)